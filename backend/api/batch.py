@@ -0,0 +1,183 @@
+"""
+Batched API calls: several sub-requests in one round trip.
+
+    POST /api/batch/
+    {"parallel": true, "requests": [
+        {"id": "patient", "method": "GET", "path": "/api/patients/12/"},
+        {"id": "rooms", "method": "GET", "path": "/api/rooms/?available=true"},
+        {"method": "POST", "path": "/api/appointments/", "body": {...}}
+    ]}
+
+Each sub-request is resolved with the URL resolver and handed straight to
+its view as the user who sent the batch (authentication and middleware run
+once, for the batch itself). Responses come back in request order as
+{"id", "status", "body"}; a JSON body is copied in as it was rendered.
+
+Sub-requests run one after another on the batch's own database connection.
+With "parallel": true, consecutive GET sub-requests run together on a thread
+pool (BATCH_MAX_WORKERS threads with their own database connections, see
+workers.py) while writes still run alone and in order, so a page load takes
+about as long as its slowest read.
+"""
+import logging
+from io import BytesIO
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import Http404
+from django.urls import Resolver404, resolve
+
+from .renderers import dumps
+from .workers import map_in_pool
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = '/api/'
+METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+READ_METHODS = ['GET']
+# Sub-request headers taken from the batch request; conditional headers
+# belong to the batch, not to its parts
+DROPPED_HEADERS = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE', 'HTTP_IF_MATCH',
+                   'HTTP_IF_UNMODIFIED_SINCE', 'HTTP_X_PROFILE')
+
+
+def max_requests():
+    return getattr(settings, 'BATCH_MAX_REQUESTS', 20)
+
+
+def max_workers():
+    return getattr(settings, 'BATCH_MAX_WORKERS', 4)
+
+
+class SubRequest:
+    __slots__ = ('id', 'method', 'path', 'body')
+
+    def __init__(self, id, method, path, body):
+        self.id = id
+        self.method = method
+        self.path = path
+        self.body = body
+
+
+def parse_requests(data):
+    """
+    SubRequests from the batch payload.
+    Raises ValueError when the payload or one of its entries is invalid.
+    """
+    entries = data.get('requests') if isinstance(data, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("'requests' must be a non-empty list")
+    if len(entries) > max_requests():
+        raise ValueError(f'A batch can hold at most {max_requests()} requests')
+
+    parsed = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise ValueError(f'Request {index} must be an object with method and path')
+        method = str(entry.get('method', 'GET')).upper()
+        path = entry.get('path')
+        if method not in METHODS:
+            raise ValueError(f"Request {index}: method must be one of {', '.join(METHODS)}")
+        if not isinstance(path, str) or not path.startswith(API_PREFIX):
+            raise ValueError(f"Request {index}: path must start with {API_PREFIX}")
+        parsed.append(SubRequest(entry.get('id', index), method, path, entry.get('body')))
+    return parsed
+
+
+# -------------------------------
+# Dispatching
+# -------------------------------
+def _build_request(batch_request, sub):
+    path, _, query = sub.path.partition('?')
+    payload = b'' if sub.body is None else dumps(sub.body)
+    environ = {key: value for key, value in batch_request.META.items() if key not in DROPPED_HEADERS}
+    environ.update({
+        'REQUEST_METHOD': sub.method,
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': BytesIO(payload),
+        'wsgi.url_scheme': batch_request.scheme,
+    })
+    request = WSGIRequest(environ)
+    # The batch is already authenticated: DRF views use this user as is
+    request.user = batch_request.user
+    request._force_auth_user = batch_request.user
+    request._force_auth_token = batch_request.auth
+    return request
+
+
+def _error(status, message):
+    return status, dumps({'error': message})
+
+
+def execute(batch_request, sub):
+    """(status code, JSON body bytes) for one sub-request"""
+    request = _build_request(batch_request, sub)
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return _error(404, f'No endpoint at {sub.path}')
+    if match.url_name == 'batch':
+        return _error(400, 'Batches cannot be nested')
+    if iscoroutinefunction(match.func):
+        # Async views (the event stream) return a coroutine and never a complete body
+        return _error(400, 'Async endpoints cannot be batched')
+    request.resolver_match = match
+
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response = response.render()
+        if response.streaming:
+            return _error(400, 'Streaming responses cannot be batched')
+        if not response.content:
+            return response.status_code, b'null'
+        if response.get('Content-Type', '').startswith('application/json'):
+            return response.status_code, response.content
+        return response.status_code, dumps(response.content.decode(response.charset, 'replace'))
+    except Http404:
+        return _error(404, 'Not found')
+    except PermissionDenied:
+        return _error(403, 'Permission denied')
+    except Exception:
+        logger.exception('Batch sub-request %s %s failed', sub.method, sub.path)
+        return _error(500, 'Internal server error')
+
+
+def run_batch(batch_request, subs, parallel=False):
+    """(status, body) per sub-request, in request order"""
+    workers = max_workers() if parallel else 1
+    results = []
+    reads = []
+
+    def flush_reads():
+        if len(reads) > 1 and workers > 1:
+            results.extend(map_in_pool('batch', workers, execute, [(batch_request, sub) for sub in reads]))
+        else:
+            results.extend(execute(batch_request, sub) for sub in reads)
+        reads.clear()
+
+    for sub in subs:
+        if sub.method in READ_METHODS:
+            reads.append(sub)
+            continue
+        # A write waits for the reads before it and runs alone
+        flush_reads()
+        results.append(execute(batch_request, sub))
+    flush_reads()
+    return results
+
+
+def encode_results(subs, results):
+    """The batch response body; sub-response bodies are copied in unchanged"""
+    parts = []
+    for sub, (status, body) in zip(subs, results):
+        head = dumps({'id': sub.id, 'status': status})
+        parts.append(head[:-1] + b',"body":' + body + b'}')
+    return b'{"responses":[' + b','.join(parts) + b']}'
@@ -0,0 +1,240 @@
+"""
+In-memory index of free beds, one per worker process.
+
+    bed_index.next_free('ICU')   # best ICU room with a free bed, or None
+    bed_index.free_beds('ICU')   # free ICU beds
+    bed_index.summary()          # the occupancy totals of the bed dashboards
+
+Every room type keeps a free-list of its rooms with a free bed, sorted the
+way reserve_bed() fills them (fewest free beds first, then room number),
+and running totals of rooms, beds and occupied beds. Answering one of the
+questions above reads the head of a list or a total instead of scanning the
+rooms table; a change moves one room within its list.
+
+The index follows committed changes of this worker: Room saves and deletes,
+and bulk_updated for Room (which beds.py sends for every bed taken or given
+back), applied once the transaction commits (receivers are connected in
+signals.py). Other workers' changes are picked up by reloading the whole
+table when the index is older than BED_INDEX_RECONCILE_SECONDS. It is a hint,
+not a lock: allocation still claims a bed with a conditional UPDATE and
+moves on when the index was out of date.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Room
+
+ROOM_FIELDS = ('pk', 'room_number', 'room_type', 'bed_capacity', 'occupied_beds')
+
+
+class RoomEntry:
+    __slots__ = ('pk', 'room_number', 'room_type', 'bed_capacity', 'occupied_beds')
+
+    def __init__(self, pk, room_number, room_type, bed_capacity, occupied_beds):
+        self.pk = pk
+        self.room_number = room_number
+        self.room_type = room_type
+        self.bed_capacity = bed_capacity
+        self.occupied_beds = occupied_beds
+
+    @property
+    def free_beds(self):
+        return self.bed_capacity - self.occupied_beds
+
+    @property
+    def sort_key(self):
+        return (self.free_beds, self.room_number, self.pk)
+
+    def as_dict(self):
+        return {
+            'id': self.pk,
+            'room_number': self.room_number,
+            'room_type': self.room_type,
+            'bed_capacity': self.bed_capacity,
+            'occupied_beds': self.occupied_beds,
+            'free_beds': self.free_beds,
+        }
+
+
+class BedIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._loaded_at = None
+        # Changes applied while a reload was reading the table, replayed over it
+        self._changes_during_reload = None
+        self._clear()
+
+    def _clear(self):
+        self._rooms = {}          # pk -> RoomEntry
+        self._free = {}           # room_type -> sort keys of its rooms with a free bed
+        self._types = {}          # room_type -> [rooms, beds, occupied beds]
+        self._types_by_name = {}  # room_type.lower() -> room types spelled that way
+
+    # -------------------------------
+    # Updates (callers hold self._lock)
+    # -------------------------------
+    def _add(self, entry):
+        self._rooms[entry.pk] = entry
+        totals = self._types.get(entry.room_type)
+        if totals is None:
+            totals = self._types[entry.room_type] = [0, 0, 0]
+            self._types_by_name.setdefault(entry.room_type.lower(), set()).add(entry.room_type)
+        totals[0] += 1
+        totals[1] += entry.bed_capacity
+        totals[2] += entry.occupied_beds
+        if entry.free_beds > 0:
+            insort(self._free.setdefault(entry.room_type, []), entry.sort_key)
+
+    def _remove(self, pk):
+        entry = self._rooms.pop(pk, None)
+        if entry is None:
+            return
+        totals = self._types[entry.room_type]
+        totals[0] -= 1
+        totals[1] -= entry.bed_capacity
+        totals[2] -= entry.occupied_beds
+        if entry.free_beds > 0:
+            free = self._free[entry.room_type]
+            del free[bisect_left(free, entry.sort_key)]
+        if not totals[0]:
+            del self._types[entry.room_type]
+            self._free.pop(entry.room_type, None)
+            spellings = self._types_by_name[entry.room_type.lower()]
+            spellings.discard(entry.room_type)
+            if not spellings:
+                del self._types_by_name[entry.room_type.lower()]
+
+    def _apply(self, pk, entry):
+        self._remove(pk)
+        if entry is not None:
+            self._add(entry)
+        if self._changes_during_reload is not None:
+            self._changes_during_reload[pk] = entry
+
+    def apply(self, pk, entry):
+        """Replace the room pk with entry (None: the room is gone)"""
+        with self._lock:
+            self._apply(pk, entry)
+
+    def refresh(self, pks):
+        """Re-read the given rooms from the database"""
+        entries = {row[0]: RoomEntry(*row) for row in Room.objects.filter(pk__in=pks).values_list(*ROOM_FIELDS)}
+        with self._lock:
+            for pk in pks:
+                self._apply(pk, entries.get(pk))
+
+    def reconcile(self):
+        """Rebuild the index from the rooms table"""
+        with self._lock:
+            self._changes_during_reload = {}
+        try:
+            rows = list(Room.objects.values_list(*ROOM_FIELDS))
+        except Exception:
+            with self._lock:
+                self._changes_during_reload = None
+            raise
+        with self._lock:
+            changes, self._changes_during_reload = self._changes_during_reload, None
+            self._clear()
+            for row in rows:
+                self._add(RoomEntry(*row))
+            # Commits seen while the table was read may be newer than the rows read
+            for pk, entry in changes.items():
+                self._apply(pk, entry)
+            self._loaded_at = time.monotonic()
+
+    def _ensure_fresh(self):
+        interval = getattr(settings, 'BED_INDEX_RECONCILE_SECONDS', 60)
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < interval:
+            return
+        # Until the first load every reader waits for it; afterwards readers
+        # keep using the current index while one thread reloads it
+        if not self._reload_lock.acquire(blocking=loaded_at is None):
+            return
+        try:
+            if self._loaded_at == loaded_at:
+                self.reconcile()
+        finally:
+            self._reload_lock.release()
+
+    # -------------------------------
+    # Queries
+    # -------------------------------
+    def _spellings(self, room_type):
+        if not room_type:
+            return list(self._free)
+        return self._types_by_name.get(room_type.lower(), ())
+
+    def candidates(self, room_type=None, limit=1, exclude=()):
+        """pks of up to limit rooms with a free bed, best first (any type if no room_type)"""
+        self._ensure_fresh()
+        with self._lock:
+            found = []
+            for spelling in self._spellings(room_type):
+                taken = 0
+                for key in self._free.get(spelling, ()):
+                    if taken == limit:
+                        break
+                    if key[2] not in exclude:
+                        found.append(key)
+                        taken += 1
+            return [key[2] for key in sorted(found)[:limit]]
+
+    def next_free(self, room_type=None):
+        """RoomEntry of the best room with a free bed, or None"""
+        self._ensure_fresh()
+        with self._lock:
+            heads = [self._free[spelling][0] for spelling in self._spellings(room_type) if self._free.get(spelling)]
+            return self._rooms[min(heads)[2]] if heads else None
+
+    def free_beds(self, room_type=None):
+        self._ensure_fresh()
+        with self._lock:
+            if not room_type:
+                spellings = list(self._types)
+            else:
+                spellings = self._types_by_name.get(room_type.lower(), ())
+            return sum(self._types[spelling][1] - self._types[spelling][2] for spelling in spellings)
+
+    def summary(self):
+        """Occupancy totals overall and per room type"""
+        self._ensure_fresh()
+        with self._lock:
+            by_type = [
+                {'room_type': room_type, 'rooms': rooms, 'beds': beds, 'occupied': occupied, 'free': beds - occupied}
+                for room_type, (rooms, beds, occupied) in sorted(self._types.items())
+            ]
+            return {
+                'total_rooms': sum(row['rooms'] for row in by_type),
+                'available_rooms': sum(len(free) for free in self._free.values()),
+                'total_beds': sum(row['beds'] for row in by_type),
+                'occupied_beds': sum(row['occupied'] for row in by_type),
+                'by_room_type': by_type,
+            }
+
+
+bed_index = BedIndex()
+
+
+# -------------------------------
+# Change hooks (connected in signals.py)
+# -------------------------------
+def room_saved(sender, instance, **kwargs):
+    entry = RoomEntry(*(getattr(instance, field) for field in ROOM_FIELDS))
+    transaction.on_commit(lambda: bed_index.apply(entry.pk, entry))
+
+
+def room_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: bed_index.apply(pk, None))
+
+
+def rooms_updated(sender, pks=(), **kwargs):
+    pks = list(pks)
+    transaction.on_commit(lambda: bed_index.refresh(pks))
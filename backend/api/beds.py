@@ -0,0 +1,178 @@
+"""
+Bed allocation.
+
+Every occupancy change is a single conditional UPDATE:
+
+    UPDATE api_room
+       SET is_available = (occupied_beds + 1 < bed_capacity),
+           occupied_beds = occupied_beds + 1
+     WHERE id = %s AND occupied_beds < bed_capacity
+
+The database applies concurrent updates of a row one after another and
+re-checks the WHERE clause against the latest value, so parallel admissions
+can neither lose an increment nor push a room past its capacity, and no lock
+is held while Python code runs. A statement that matched no row means the
+room was full (or already empty, for a release).
+
+reserve_bed() picks the best room with a free bed, optionally of one room
+type, and claims it the same way; when another request took the last bed
+first it moves on to the next candidate. Candidates come from this worker's
+free bed index (bed_index.py) and, once those are exhausted, from the
+database, so an out-of-date index costs a retry but never a wrong answer.
+
+These updates skip Model.save(), so once the transaction commits they send
+bulk_updated for Room (response cache and other listeners) and push the new
+occupancy to the realtime 'rooms' topic.
+"""
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+
+from .bed_index import bed_index
+from .models import Room
+
+# Admission statuses during which the patient holds a bed in admission.room
+BED_HOLDING_STATUSES = ('admitted', 'pending_discharge')
+OCCUPANCY_FIELDS = ['occupied_beds', 'is_available']
+# Rooms read per attempt by reserve_bed(); a new batch is read when all of
+# them were taken by concurrent requests
+RESERVE_CANDIDATES = 10
+
+
+class RoomFull(Exception):
+    def __init__(self, room):
+        self.room = room
+        super().__init__(
+            f'Room {room.room_number} is full ({room.occupied_beds}/{room.bed_capacity} beds occupied)'
+        )
+
+
+def holds_bed(status):
+    return status in BED_HOLDING_STATUSES
+
+
+def _notify(room):
+    from .realtime import room_changed
+    from .signals import bulk_updated
+
+    transaction.on_commit(lambda: bulk_updated.send(sender=Room, pks=[room.pk], fields=OCCUPANCY_FIELDS))
+    room_changed(Room, instance=room, created=False)
+
+
+def _claim(room_id):
+    """Take one bed of the room; False if it has none free"""
+    return Room.objects.filter(pk=room_id, occupied_beds__lt=F('bed_capacity')).update(
+        # Listed first: MySQL evaluates assignments left to right, so this
+        # must read occupied_beds before it is incremented
+        is_available=Case(
+            When(occupied_beds__lt=F('bed_capacity') - 1, then=Value(True)), default=Value(False)
+        ),
+        occupied_beds=F('occupied_beds') + 1,
+    ) == 1
+
+
+def _free(room_id):
+    """Give back one bed of the room; False if none was occupied"""
+    return Room.objects.filter(pk=room_id, occupied_beds__gt=0).update(
+        is_available=Case(
+            When(occupied_beds__lte=F('bed_capacity'), then=Value(True)), default=Value(False)
+        ),
+        occupied_beds=F('occupied_beds') - 1,
+    ) == 1
+
+
+# -------------------------------
+# Single rooms
+# -------------------------------
+def occupy_bed(room):
+    """
+    Take one bed of room. Returns False if the room is full.
+    room's occupancy fields are refreshed either way.
+    """
+    claimed = _claim(room.pk)
+    room.refresh_from_db(fields=OCCUPANCY_FIELDS)
+    if claimed:
+        _notify(room)
+    return claimed
+
+
+def release_bed(room):
+    """Give back one bed of room. Returns False if the room had no occupied bed."""
+    released = _free(room.pk)
+    room.refresh_from_db(fields=OCCUPANCY_FIELDS)
+    if released:
+        _notify(room)
+    return released
+
+
+def available_rooms(room_type=None):
+    """Rooms with a free bed, best candidate first (see reserve_bed)"""
+    rooms = Room.objects.filter(occupied_beds__lt=F('bed_capacity'))
+    if room_type:
+        rooms = rooms.filter(room_type__iexact=room_type)
+    return rooms.order_by(F('bed_capacity') - F('occupied_beds'), 'room_number')
+
+
+def _claimed(room_id):
+    room = Room.objects.get(pk=room_id)
+    _notify(room)
+    return room
+
+
+def reserve_bed(room_type=None):
+    """
+    Find and take a free bed, in a room of room_type if given.
+    Returns the room (with its new occupancy) or None if no bed is free.
+
+    Rooms with the fewest free beds are filled first, so that whole rooms
+    stay free for patients who need one.
+    """
+    taken = set()
+    for room_id in bed_index.candidates(room_type, RESERVE_CANDIDATES):
+        if _claim(room_id):
+            return _claimed(room_id)
+        taken.add(room_id)
+    while True:
+        candidate_ids = list(
+            available_rooms(room_type).exclude(pk__in=taken).values_list('pk', flat=True)[:RESERVE_CANDIDATES]
+        )
+        if not candidate_ids:
+            return None
+        for room_id in candidate_ids:
+            if _claim(room_id):
+                return _claimed(room_id)
+            taken.add(room_id)
+
+
+def find_room(room_type=None):
+    """The room reserve_bed() would take a bed in, without taking it; None if no bed is free"""
+    entry = bed_index.next_free(room_type)
+    if entry is not None:
+        room = Room.objects.filter(pk=entry.pk, occupied_beds__lt=F('bed_capacity')).first()
+        if room is not None:
+            return room
+    return available_rooms(room_type).first()
+
+
+# -------------------------------
+# Admissions
+# -------------------------------
+def move_admission(old_room, old_status, new_room, new_status):
+    """
+    Update occupancy for an admission going from (old_room, old_status) to
+    (new_room, new_status): the new bed is taken before the old one is given
+    back. Raises RoomFull, with nothing changed, if the new room is full,
+    also when the admission is only being assigned to it (no bed held yet).
+    Call inside the transaction that saves the admission.
+    """
+    before = old_room if old_room is not None and holds_bed(old_status) else None
+    after = new_room if new_room is not None and holds_bed(new_status) else None
+    if after is None and new_room is not None and new_room.pk != getattr(old_room, 'pk', None):
+        new_room.refresh_from_db(fields=OCCUPANCY_FIELDS + ['bed_capacity'])
+        if not new_room.has_space():
+            raise RoomFull(new_room)
+    if getattr(before, 'pk', None) == getattr(after, 'pk', None):
+        return
+    if after is not None and not occupy_bed(after):
+        raise RoomFull(after)
+    if before is not None:
+        release_bed(before)
@@ -0,0 +1,148 @@
+"""
+Bulk archive / restore / update actions shared by the patient and staff ViewSets
+"""
+from datetime import datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .permissions import IsAdminUser
+from .signals import bulk_updated
+
+# Keep each UPDATE ... WHERE id IN (...) statement to a reasonable size
+UPDATE_BATCH_SIZE = 1000
+
+
+class BulkRequestError(Exception):
+    pass
+
+
+class BulkActionsMixin:
+    """
+    Adds to a ModelViewSet whose model has an is_archived flag:
+        POST <prefix>/bulk-archive/   Body: {"ids": [1, 2]} or {"filter": {...}}
+        POST <prefix>/bulk-restore/   Body: {"ids": [1, 2]} or {"filter": {...}}
+        POST <prefix>/bulk-update/    Body: {"ids": [...] or "filter": {...}, "changes": {...}}
+    Each runs as queryset update()s inside one transaction and returns the affected count.
+    """
+    # filter key -> ORM lookup accepted in {"filter": {...}}
+    bulk_filter_fields = {}
+    # fields that may be changed through bulk-update
+    bulk_update_fields = ()
+
+    def _bulk_model(self):
+        return self.queryset.model
+
+    def _parse_value(self, lookup, value):
+        model = self._bulk_model()
+        field = model._meta.get_field(lookup.split('__')[0])
+        if lookup.endswith('__in'):
+            if not isinstance(value, list):
+                raise ValidationError(f'{lookup} expects a list')
+            return [field.to_python(v) for v in value]
+        value = field.to_python(value)
+        if isinstance(value, datetime) and timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
+
+    def _bulk_queryset(self, request):
+        """Build the target queryset from "ids" or "filter" in the request body"""
+        model = self._bulk_model()
+        ids = request.data.get('ids')
+        filters = request.data.get('filter')
+
+        if ids:
+            if not isinstance(ids, list):
+                raise BulkRequestError('ids must be a list')
+            try:
+                ids = [int(pk) for pk in ids]
+            except (TypeError, ValueError):
+                raise BulkRequestError('ids must be integers')
+            return model.objects.filter(pk__in=ids)
+
+        if filters:
+            if not isinstance(filters, dict):
+                raise BulkRequestError('filter must be an object')
+            lookups = {}
+            for key, value in filters.items():
+                if key not in self.bulk_filter_fields:
+                    allowed = ', '.join(sorted(self.bulk_filter_fields)) or 'none'
+                    raise BulkRequestError(f"Unsupported filter '{key}'. Allowed: {allowed}")
+                lookup = self.bulk_filter_fields[key]
+                try:
+                    lookups[lookup] = self._parse_value(lookup, value)
+                except ValidationError as e:
+                    raise BulkRequestError(f"Invalid value for '{key}': {' '.join(e.messages)}")
+            return model.objects.filter(**lookups)
+
+        raise BulkRequestError('Provide either "ids" or "filter"')
+
+    def _bulk_apply(self, queryset, changes):
+        """Apply changes with batched UPDATE ... WHERE id IN (...) and notify receivers"""
+        model = self._bulk_model()
+        # update() skips auto_now, so keep updated_at moving for models that have it
+        try:
+            if getattr(model._meta.get_field('updated_at'), 'auto_now', False):
+                changes = {**changes, 'updated_at': timezone.now()}
+        except FieldDoesNotExist:
+            pass
+
+        with transaction.atomic():
+            pks = list(queryset.values_list('pk', flat=True))
+            updated = 0
+            for start in range(0, len(pks), UPDATE_BATCH_SIZE):
+                batch = pks[start:start + UPDATE_BATCH_SIZE]
+                updated += model.objects.filter(pk__in=batch).update(**changes)
+            if pks:
+                transaction.on_commit(lambda: bulk_updated.send(
+                    sender=model, pks=pks, fields=list(changes)
+                ))
+        return updated
+
+    def _bulk_response(self, request, build_changes, restrict=None):
+        try:
+            queryset = self._bulk_queryset(request)
+            if restrict:
+                queryset = queryset.filter(**restrict)
+            changes = build_changes()
+        except BulkRequestError as e:
+            return Response({'status': 'error', 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        updated = self._bulk_apply(queryset, changes)
+        return Response({'status': 'success', 'updated': updated}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='bulk-archive', permission_classes=[IsAdminUser])
+    def bulk_archive(self, request):
+        """Archive many records at once (soft delete)"""
+        return self._bulk_response(request, lambda: {'is_archived': True}, restrict={'is_archived': False})
+
+    @action(detail=False, methods=['post'], url_path='bulk-restore', permission_classes=[IsAdminUser])
+    def bulk_restore(self, request):
+        """Restore many archived records at once"""
+        return self._bulk_response(request, lambda: {'is_archived': False}, restrict={'is_archived': True})
+
+    @action(detail=False, methods=['post'], url_path='bulk-update', permission_classes=[IsAdminUser])
+    def bulk_update(self, request):
+        """Set the same field values on many records"""
+        def build_changes():
+            changes = request.data.get('changes')
+            if not changes or not isinstance(changes, dict):
+                raise BulkRequestError('changes must be a non-empty object')
+            model = self._bulk_model()
+            cleaned = {}
+            for name, value in changes.items():
+                if name not in self.bulk_update_fields:
+                    allowed = ', '.join(self.bulk_update_fields) or 'none'
+                    raise BulkRequestError(f"Field '{name}' cannot be bulk updated. Allowed: {allowed}")
+                field = model._meta.get_field(name)
+                try:
+                    cleaned[name] = field.clean(value, None)
+                except ValidationError as e:
+                    raise BulkRequestError(f"Invalid value for '{name}': {' '.join(e.messages)}")
+            return cleaned
+
+        return self._bulk_response(request, build_changes)
@@ -0,0 +1,195 @@
+"""
+Columnar (Arrow / Parquet) export of prediction records joined with the
+70 model features and admission outcomes, for offline model evaluation.
+
+Rows are fetched as tuples from chunked values_list() queries and transposed
+straight into typed Arrow arrays (booleans bit-packed, floats as float32),
+so no per-row dicts or model instances are built.
+"""
+import os
+from datetime import datetime, time, timedelta
+
+from django.db import models
+from django.db.models import Exists, OuterRef, Subquery
+from django.utils import timezone
+
+from .features import MODEL_FEATURES
+from .models import Admission, Patient, PredictionRecord
+
+CHUNK_SIZE = 50000
+PARTITIONS = ('none', 'year', 'month', 'day')
+FORMATS = ('parquet', 'arrow')
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError('pyarrow is required for columnar exports (pip install pyarrow)')
+    return pyarrow
+
+
+def _arrow_type(pa, field):
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(field, models.FloatField):
+        return pa.float32()
+    if isinstance(field, models.IntegerField):
+        return pa.int32()
+    raise TypeError(f'No Arrow type mapping for {field.__class__.__name__}')
+
+
+def export_columns(pa):
+    """Return [(column name, ORM lookup, Arrow type)] in output order"""
+    timestamp = pa.timestamp('us', tz='UTC')
+    columns = [
+        ('prediction_id', 'id', pa.int64()),
+        ('patient_id', 'patient_id', pa.int64()),
+        ('predicted_by_id', 'predicted_by_id', pa.int64()),
+        ('risk_level', 'risk_level', pa.int8()),
+        ('prediction_date', 'prediction_date', timestamp),
+        ('readmitted', 'readmitted', pa.bool_()),
+        ('next_admission_date', 'next_admission_date', timestamp),
+        ('next_admission_status', 'next_admission_status', pa.string()),
+        ('latest_admission_status', 'latest_admission_status', pa.string()),
+    ]
+    for feature, field in MODEL_FEATURES:
+        columns.append((feature, f'patient__{field}', _arrow_type(pa, Patient._meta.get_field(field))))
+    return columns
+
+
+def _start_of_day(value):
+    """Aware datetime for a date (midnight, current timezone) or datetime"""
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.min)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def prediction_queryset(start_date=None, end_date=None):
+    """PredictionRecords annotated with the admission outcomes following each prediction"""
+    admissions_after = Admission.objects.filter(
+        patient_id=OuterRef('patient_id'),
+        admission_date__gt=OuterRef('prediction_date'),
+    ).order_by('admission_date')
+    latest_admission = Admission.objects.filter(
+        patient_id=OuterRef('patient_id'),
+    ).order_by('-admission_date')
+
+    queryset = PredictionRecord.objects.annotate(
+        readmitted=Exists(admissions_after),
+        next_admission_date=Subquery(admissions_after.values('admission_date')[:1]),
+        next_admission_status=Subquery(admissions_after.values('status')[:1]),
+        latest_admission_status=Subquery(latest_admission.values('status')[:1]),
+    )
+    if start_date:
+        queryset = queryset.filter(prediction_date__gte=_start_of_day(start_date))
+    if end_date:
+        queryset = queryset.filter(prediction_date__lt=_start_of_day(end_date))
+    return queryset.order_by('prediction_date', 'id')
+
+
+def iter_record_batches(queryset, chunk_size=CHUNK_SIZE):
+    """Yield pyarrow.RecordBatch objects built column-wise from value tuples"""
+    pa = _require_pyarrow()
+    columns = export_columns(pa)
+    schema = pa.schema([(name, arrow_type) for name, _, arrow_type in columns])
+    rows = queryset.values_list(*[lookup for _, lookup, _ in columns]).iterator(chunk_size=chunk_size)
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield _to_batch(pa, schema, chunk)
+            chunk = []
+    if chunk:
+        yield _to_batch(pa, schema, chunk)
+
+
+def _to_batch(pa, schema, chunk):
+    arrays = [
+        pa.array(values, type=field.type)
+        for values, field in zip(zip(*chunk), schema)
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_file(sink, queryset, file_format='parquet', chunk_size=CHUNK_SIZE):
+    """
+    Write one Parquet or Arrow IPC file to a path or binary file object,
+    batch by batch. Returns the number of rows written.
+    """
+    pa = _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, arrow_type) for name, _, arrow_type in export_columns(pa)])
+    written = 0
+    if file_format == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        write = writer.write_batch
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+        write = writer.write_batch
+    try:
+        for batch in iter_record_batches(queryset, chunk_size=chunk_size):
+            write(batch)
+            written += batch.num_rows
+    finally:
+        writer.close()
+    return written
+
+
+def _period_bounds(period_date, partition):
+    """Aware [start, end) datetimes for the period containing period_date"""
+    if partition == 'year':
+        start = period_date.replace(month=1, day=1)
+        end = start.replace(year=start.year + 1)
+    elif partition == 'month':
+        start = period_date.replace(day=1)
+        end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    else:
+        start = period_date
+        end = start + timedelta(days=1)
+    return _start_of_day(start), _start_of_day(end)
+
+
+def _period_label(period_date, partition):
+    if partition == 'year':
+        return period_date.strftime('%Y')
+    if partition == 'month':
+        return period_date.strftime('%Y-%m')
+    return period_date.isoformat()
+
+
+def export_predictions(output_dir, file_format='parquet', partition='none',
+                       start_date=None, end_date=None, chunk_size=CHUNK_SIZE):
+    """
+    Export prediction features to output_dir.
+    With partitioning, one file per period is written under
+    prediction_<partition>=<label>/ (Hive-style directories).
+    Returns a list of {path, rows}.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Unsupported format '{file_format}'. Use one of: {', '.join(FORMATS)}")
+    if partition not in PARTITIONS:
+        raise ValueError(f"Unsupported partition '{partition}'. Use one of: {', '.join(PARTITIONS)}")
+
+    extension = 'parquet' if file_format == 'parquet' else 'arrow'
+    os.makedirs(output_dir, exist_ok=True)
+    base = prediction_queryset(start_date, end_date)
+
+    if partition == 'none':
+        path = os.path.join(output_dir, f'predictions.{extension}')
+        return [{'path': path, 'rows': write_file(path, base, file_format, chunk_size)}]
+
+    results = []
+    for period_date in base.dates('prediction_date', partition):
+        period_start, period_end = _period_bounds(period_date, partition)
+        queryset = base.filter(prediction_date__gte=period_start, prediction_date__lt=period_end)
+        directory = os.path.join(output_dir, f'prediction_{partition}={_period_label(period_date, partition)}')
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'part-0.{extension}')
+        results.append({'path': path, 'rows': write_file(path, queryset, file_format, chunk_size)})
+    return results
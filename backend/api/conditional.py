@@ -0,0 +1,108 @@
+"""
+Conditional GET support (ETag / Last-Modified) for resources with an updated_at column.
+
+Validators are computed from a single Max('updated_at') + Count aggregate for
+lists, or from the row's updated_at for details, and a 304 Not Modified is
+returned before anything is serialized.
+
+When the serialized rows also show fields of related rows (a schedule's
+user name), the related models' change versions (response_cache.py) go into
+the ETag. Such changes don't move updated_at, so those responses carry no
+Last-Modified and are validated by ETag only.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+CACHE_CONTROL = 'private, no-cache'
+
+
+def _make_etag(*parts):
+    digest = hashlib.md5('|'.join(str(p) for p in parts).encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(digest)
+
+
+def _related_versions(related_models):
+    from .response_cache import model_versions
+
+    return model_versions(related_models) if related_models else ''
+
+
+def list_validators(request, queryset, date_field='updated_at', related_models=()):
+    """
+    (etag, last_modified datetime) for a filtered queryset.
+    related_models: models whose rows the serialized output also shows.
+    """
+    aggregate = queryset.aggregate(last_modified=Max(date_field), count=Count('pk'))
+    last_modified = aggregate['last_modified']
+    etag = _make_etag(
+        queryset.model._meta.label, request.path, request.META.get('QUERY_STRING', ''),
+        aggregate['count'], last_modified.isoformat() if last_modified else '',
+        _related_versions(related_models),
+    )
+    return etag, None if related_models else last_modified
+
+
+def detail_validators(request, obj, date_field='updated_at', related_models=()):
+    """(etag, last_modified datetime) for a single row"""
+    last_modified = getattr(obj, date_field)
+    etag = _make_etag(
+        obj._meta.label, obj.pk, request.path, request.META.get('QUERY_STRING', ''),
+        last_modified.isoformat() if last_modified else '', _related_versions(related_models),
+    )
+    return etag, None if related_models else last_modified
+
+
+def not_modified_response(request, etag, last_modified):
+    """Return a 304/412 response if the client's validators still match, otherwise None"""
+    django_request = getattr(request, '_request', request)
+    return get_conditional_response(
+        django_request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin answering list/retrieve with 304 Not Modified when the
+    client's If-None-Match / If-Modified-Since validators are still current.
+    """
+    conditional_date_field = 'updated_at'
+    # Models whose rows the serializer also shows (see module docstring)
+    conditional_related_models = ()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, last_modified = list_validators(
+            request, queryset, self.conditional_date_field, self.conditional_related_models
+        )
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = super().list(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = detail_validators(
+            request, instance, self.conditional_date_field, self.conditional_related_models
+        )
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), etag, last_modified)
@@ -0,0 +1,250 @@
+"""
+Bootstrap payloads for the role dashboards.
+
+    GET /api/dashboard/<admin|doctor|nurse|pharmacy>/
+    GET /api/dashboard/doctor/?widgets=stats,today_appointments
+
+A dashboard is a set of widgets computed for the signed-in user in one
+request, instead of the page gathering them from several list endpoints.
+Every widget makes a fixed number of queries (aggregates, or lists read
+through projections), whatever the size of the tables; bed occupancy comes
+from the worker's free bed index (bed_index.py). Widgets don't depend
+on each other, so they run together on a thread pool (DASHBOARD_WORKERS
+threads with their own database connections, see workers.py); the response
+reports how long each one took. ?widgets= computes only the named widgets,
+for pages that show a few of them. The view caches the payload per user for
+DASHBOARD_CACHE_SECONDS, unless a widget failed.
+"""
+import logging
+from time import perf_counter
+
+from django.conf import settings
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from . import projections, querysets
+from .bed_index import bed_index
+from .models import (
+    Admission, Appointment, Doctor, Medicine, Nurse, Patient, Payment, PharmacyStaff, PredictionRecord,
+    Prescription, PrescriptionItem, Room, Schedule
+)
+from .serializers import MedicineSerializer
+from .workers import map_in_pool
+
+logger = logging.getLogger(__name__)
+
+# URL role -> User.role allowed to open it
+DASHBOARD_ROLES = {
+    'admin': 'admin',
+    'doctor': 'doctor',
+    'nurse': 'nurse',
+    'pharmacy': 'pharmacy_staff',
+}
+PROFILE_MODELS = {'doctor': Doctor, 'nurse': Nurse, 'pharmacy': PharmacyStaff}
+# Changes to these invalidate cached dashboards (see response_cache)
+DEPENDENCIES = (
+    Patient, Doctor, Nurse, PharmacyStaff, Admission, Appointment, Payment, PredictionRecord, Room, Schedule,
+    Medicine, Prescription, PrescriptionItem,
+)
+PENDING_PRESCRIPTION_STATUSES = ['pending', 'partially_dispensed']
+RECENT_LIMIT = 10
+# Shown for a failed widget; the exception itself is only logged
+WIDGET_ERROR = 'This widget could not be loaded'
+
+
+def can_view(user, role):
+    if role == 'admin':
+        return user.role == 'admin' or user.is_superuser
+    return user.role == DASHBOARD_ROLES[role]
+
+
+def get_profile(role, user):
+    """The Doctor/Nurse/PharmacyStaff row of the user, None for admin or if missing"""
+    model = PROFILE_MODELS.get(role)
+    if model is None:
+        return None
+    return model.objects.filter(user=user).first()
+
+
+def hospital_stats():
+    """Hospital-wide counts shown on the admin dashboard (and dashboard-stats)"""
+    from .stats_counters import read_counters
+
+    counters = read_counters([
+        'patients_all', 'doctors_all', 'nurses_all', 'admissions_active', 'payments_all', 'patients_high_risk',
+    ])
+    return {
+        'total_patients': counters['patients_all'],
+        'total_doctors': counters['doctors_all'],
+        'total_nurses': counters['nurses_all'],
+        'active_admissions': counters['admissions_active'],
+        # Depends on the current date, so it is counted rather than kept as a counter
+        'today_appointments': Appointment.objects.filter(
+            appointment_date__date=timezone.now().date()
+        ).count(),
+        'total_payments': counters['payments_all'],
+        'high_risk_patients': counters['patients_high_risk'],
+    }
+
+
+# -------------------------------
+# Widgets: function(user, profile) -> data
+# -------------------------------
+def _admin_stats(user, profile):
+    return hospital_stats()
+
+
+def _bed_occupancy(user, profile):
+    # Read from the worker's free bed index, no query
+    return bed_index.summary()
+
+
+def _today_appointments(user, profile):
+    appointments = querysets.appointments().filter(appointment_date__date=timezone.localdate())
+    if profile is not None:
+        appointments = appointments.filter(doctor=profile)
+    return projections.APPOINTMENTS.serialize(appointments.order_by('appointment_date'))
+
+
+def _active_admissions(field):
+    """Widget listing the patients currently admitted under the profile (doctor or nurse)"""
+    def widget(user, profile):
+        admissions = querysets.admissions().filter(status='admitted', **{field: profile})
+        return projections.ADMISSIONS.serialize(admissions.order_by('-admission_date'))
+    return widget
+
+
+def _today_schedule(user, profile):
+    shifts = querysets.schedules().filter(user=user, date=timezone.localdate())
+    return projections.SCHEDULES.serialize(shifts.order_by('start_time'))
+
+
+def _doctor_stats(user, doctor):
+    today = timezone.localdate()
+    admissions = Admission.objects.filter(doctor=doctor).aggregate(
+        total_patients=Count('patient', distinct=True),
+        active_admissions=Count('pk', filter=Q(status='admitted')),
+    )
+    appointments = Appointment.objects.filter(doctor=doctor).aggregate(
+        total_appointments=Count('pk'),
+        today_appointments=Count('pk', filter=Q(appointment_date__date=today)),
+    )
+    return {**admissions, **appointments}
+
+
+def _nurse_stats(user, nurse):
+    return Admission.objects.filter(nurse=nurse).aggregate(
+        total_patients=Count('patient', distinct=True),
+        active_admissions=Count('pk', filter=Q(status='admitted')),
+        total_admissions=Count('pk'),
+        discharged=Count('pk', filter=Q(status='discharged')),
+    )
+
+
+def _doctor_pending_prescriptions(user, doctor):
+    prescriptions = querysets.prescriptions().filter(doctor=doctor, status__in=PENDING_PRESCRIPTION_STATUSES)
+    return projections.PRESCRIPTIONS_COMPACT.serialize(prescriptions.order_by('-prescribed_date'))
+
+
+def _pharmacy_stats(user, profile):
+    today = timezone.localdate()
+    stats = Prescription.objects.aggregate(
+        pending_prescriptions=Count('pk', filter=Q(status__in=PENDING_PRESCRIPTION_STATUSES)),
+        dispensed_today=Count('pk', filter=Q(status='dispensed', dispensed_date__date=today)),
+    )
+    stats['low_stock_medicines'] = Medicine.objects.filter(stock_quantity__lte=F('reorder_level')).count()
+    return stats
+
+
+def _pending_prescriptions(user, profile):
+    # Full items with medicine details: the pharmacy dispenses from this list
+    prescriptions = querysets.prescriptions().filter(status__in=PENDING_PRESCRIPTION_STATUSES)
+    return projections.PRESCRIPTIONS.serialize(prescriptions.order_by('-prescribed_date'))
+
+
+def _recently_dispensed(user, profile):
+    prescriptions = querysets.prescriptions().filter(status='dispensed').order_by('-dispensed_date')
+    return projections.PRESCRIPTIONS_COMPACT.serialize(prescriptions[:RECENT_LIMIT])
+
+
+def _low_stock_medicines(user, profile):
+    medicines = Medicine.objects.filter(stock_quantity__lte=F('reorder_level')).order_by('stock_quantity', 'name')
+    return MedicineSerializer(medicines, many=True).data
+
+
+WIDGETS = {
+    'admin': {
+        'stats': _admin_stats,
+        'beds': _bed_occupancy,
+        'today_appointments': _today_appointments,
+        'low_stock_medicines': _low_stock_medicines,
+    },
+    'doctor': {
+        'stats': _doctor_stats,
+        'today_appointments': _today_appointments,
+        'active_admissions': _active_admissions('doctor'),
+        'pending_prescriptions': _doctor_pending_prescriptions,
+        'today_schedule': _today_schedule,
+    },
+    'nurse': {
+        'stats': _nurse_stats,
+        'active_admissions': _active_admissions('nurse'),
+        'beds': _bed_occupancy,
+        'today_schedule': _today_schedule,
+    },
+    'pharmacy': {
+        'stats': _pharmacy_stats,
+        'pending_prescriptions': _pending_prescriptions,
+        'recently_dispensed': _recently_dispensed,
+        'low_stock_medicines': _low_stock_medicines,
+    },
+}
+
+
+# -------------------------------
+# Running a dashboard
+# -------------------------------
+def _run_widget(name, widget, user, profile):
+    """(name, data, error message, milliseconds)"""
+    start = perf_counter()
+    try:
+        data, error = widget(user, profile), None
+    except Exception:
+        logger.exception('Dashboard widget %s failed', name)
+        data, error = None, WIDGET_ERROR
+    return name, data, error, round((perf_counter() - start) * 1000, 2)
+
+
+def parse_widgets(role, value):
+    """Widget names from a comma separated ?widgets= value (None: all); ValueError if one is unknown"""
+    if not value:
+        return None
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in WIDGETS[role]]
+    if unknown:
+        raise ValueError(f"Unknown {role} widget '{unknown[0]}'. Use any of: {', '.join(WIDGETS[role])}")
+    return names
+
+
+def build_dashboard(role, user, profile=None, names=None):
+    """Payload of one role dashboard for user, only the widgets in names if given"""
+    widgets = WIDGETS[role]
+    tasks = [(name, widget, user, profile) for name, widget in widgets.items() if names is None or name in names]
+    workers = getattr(settings, 'DASHBOARD_WORKERS', 4)
+    start = perf_counter()
+    if workers > 1 and len(tasks) > 1:
+        results = map_in_pool('dashboard', workers, _run_widget, tasks)
+    else:
+        results = [_run_widget(*task) for task in tasks]
+
+    payload = {
+        'role': role,
+        'profile_id': profile.pk if profile is not None else None,
+        'widgets': {name: data for name, data, _, _ in results},
+        'timings_ms': {name: elapsed for name, _, _, elapsed in results},
+        'total_ms': round((perf_counter() - start) * 1000, 2),
+    }
+    errors = {name: error for name, _, error, _ in results if error is not None}
+    if errors:
+        payload['errors'] = errors
+    return payload
@@ -0,0 +1,100 @@
+"""
+Delta sync (?updated_since=) for list endpoints.
+
+Clients keep a local copy of a list and ask only for what changed:
+
+    GET /api/appointments/?updated_since=2025-12-08T10:00:00Z
+
+    {
+        "updated": [...rows created or updated since then...],
+        "deleted": [ids deleted, or no longer matching the list's filters],
+        "server_time": "2025-12-08T10:05:00.123456Z"
+    }
+
+Pass server_time back as the next updated_since. updated_at (and a
+tombstone's deleted_at) is stamped when the row is saved, before its
+transaction commits, so a row saved just before a sync may only become
+visible after it. server_time is therefore the time the queries started
+minus DELTA_SYNC_OVERLAP_SECONDS, which should exceed the longest write
+transaction: consecutive syncs overlap, and clients apply rows and deletes
+by id, so a row that comes again is simply applied again.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Admission, Appointment, DeletedRecord, Medicine, Patient, Payment, Prescription, Schedule
+
+# Models whose deletes are recorded as DeletedRecord tombstones (see signals.py)
+TRACKED_MODELS = (Patient, Appointment, Admission, Payment, Prescription, Schedule, Medicine)
+
+
+def parse_since(value):
+    """Aware datetime from an ISO date or datetime string, or None if invalid"""
+    parsed = parse_datetime(value) if len(value) > 10 else None
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            return None
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def record_deletion(sender, instance, **kwargs):
+    """post_delete receiver writing a tombstone for the deleted row"""
+    DeletedRecord.objects.create(model_label=sender._meta.label_lower, object_id=instance.pk)
+
+
+def deleted_ids(model, since):
+    return list(
+        DeletedRecord.objects
+        .filter(model_label=model._meta.label_lower, deleted_at__gt=since)
+        .values_list('object_id', flat=True)
+        .distinct()
+    )
+
+
+class DeltaSyncMixin:
+    """
+    ViewSet mixin: list(?updated_since=...) returns only the rows that changed
+    since that time plus the ids the client should drop.
+    The model needs an indexed updated_at (auto_now) column.
+    """
+    delta_date_field = 'updated_at'
+
+    def list(self, request, *args, **kwargs):
+        raw_since = request.query_params.get('updated_since')
+        if raw_since is None:
+            return super().list(request, *args, **kwargs)
+
+        since = parse_since(raw_since)
+        if since is None:
+            return Response(
+                {'status': 'error', 'message': 'updated_since must be an ISO date or datetime'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        server_time = timezone.now() - timedelta(seconds=getattr(settings, 'DELTA_SYNC_OVERLAP_SECONDS', 30))
+        model = self.get_queryset().model
+        changed_filter = {f'{self.delta_date_field}__gt': since}
+        queryset = self.filter_queryset(self.get_queryset())
+
+        updated = queryset.filter(**changed_filter)
+        # Rows that changed but fell out of this list (archived, status moved on, ...)
+        left_list = (
+            model.objects.filter(**changed_filter)
+            .exclude(pk__in=queryset.values('pk'))
+            .values_list('pk', flat=True)
+        )
+
+        return Response({
+            'updated': self.get_serializer(updated, many=True).data,
+            'deleted': deleted_ids(model, since) + list(left_list),
+            'server_time': server_time,
+        })
@@ -0,0 +1,220 @@
+"""
+Streaming CSV / NDJSON exports for analysts.
+Rows are read with a server-side cursor (values_list().iterator()) and encoded
+chunk by chunk, so memory use does not grow with the size of the table.
+"""
+import csv
+from datetime import date, datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Patient, Admission, Appointment, Payment
+
+CURSOR_CHUNK_SIZE = 2000
+ROWS_PER_YIELD = 500
+
+TRUE_VALUES = ['true', '1']
+FALSE_VALUES = ['false', '0']
+
+
+# Each export: model, (output column, ORM lookup) pairs, date field for
+# ?start_date/?end_date, and query params mapped to equality filters.
+EXPORTS = {
+    'patients': {
+        'model': Patient,
+        'columns': [(f.attname, f.attname) for f in Patient._meta.concrete_fields],
+        'date_field': 'created_at',
+        'filters': {
+            'archived': 'is_archived',
+            'gender': 'gender',
+            'insurance_status': 'insurance_status',
+            'handicapped': 'handicapped',
+        },
+    },
+    'admissions': {
+        'model': Admission,
+        'columns': [
+            ('id', 'id'),
+            ('patient_id', 'patient_id'),
+            ('patient_name', 'patient__name'),
+            ('doctor_id', 'doctor_id'),
+            ('doctor_name', 'doctor__user__username'),
+            ('nurse_id', 'nurse_id'),
+            ('nurse_name', 'nurse__user__username'),
+            ('room_id', 'room_id'),
+            ('room_number', 'room__room_number'),
+            ('admission_date', 'admission_date'),
+            ('discharge_date', 'discharge_date'),
+            ('status', 'status'),
+            ('requires_inpatient', 'requires_inpatient'),
+            ('doctor_notes', 'doctor_notes'),
+        ],
+        'date_field': 'admission_date',
+        'filters': {
+            'patient': 'patient_id',
+            'doctor': 'doctor_id',
+            'room': 'room_id',
+            'status': 'status',
+        },
+    },
+    'appointments': {
+        'model': Appointment,
+        'columns': [
+            ('id', 'id'),
+            ('patient_id', 'patient_id'),
+            ('patient_name', 'patient__name'),
+            ('doctor_id', 'doctor_id'),
+            ('doctor_name', 'doctor__user__username'),
+            ('appointment_date', 'appointment_date'),
+            ('reason', 'reason'),
+            ('status', 'status'),
+            ('notes', 'notes'),
+            ('completed_at', 'completed_at'),
+            ('created_at', 'created_at'),
+            ('updated_at', 'updated_at'),
+        ],
+        'date_field': 'appointment_date',
+        'filters': {
+            'patient': 'patient_id',
+            'doctor': 'doctor_id',
+            'status': 'status',
+        },
+    },
+    'payments': {
+        'model': Payment,
+        'columns': [
+            ('id', 'id'),
+            ('patient_id', 'patient_id'),
+            ('patient_name', 'patient__name'),
+            ('payment_type', 'payment_type'),
+            ('admission_id', 'admission_id'),
+            ('procedure_cost', 'procedure_cost'),
+            ('daily_care_cost', 'daily_care_cost'),
+            ('total_before_discount', 'total_before_discount'),
+            ('discount_percent', 'discount_percent'),
+            ('final_amount', 'final_amount'),
+            ('method', 'method'),
+            ('payment_date', 'payment_date'),
+            ('notes', 'notes'),
+        ],
+        'date_field': 'payment_date',
+        'filters': {
+            'patient': 'patient_id',
+            'payment_type': 'payment_type',
+            'method': 'method',
+        },
+    },
+}
+
+
+def _parse_filter_value(model, lookup, value):
+    """Convert 'true'/'false' query strings for boolean model fields"""
+    field = model._meta.get_field(lookup.removesuffix('_id'))
+    if isinstance(field, models.BooleanField):
+        lowered = value.lower()
+        if lowered in TRUE_VALUES:
+            return True
+        if lowered in FALSE_VALUES:
+            return False
+        raise ValueError(f"Invalid boolean '{value}' for {lookup}")
+    return value
+
+
+def build_export_queryset(resource, params):
+    """
+    Build the filtered values_list queryset for an export.
+    Raises ValueError for an unknown resource or an unparseable date.
+    """
+    spec = EXPORTS.get(resource)
+    if spec is None:
+        raise ValueError(f"Unknown export '{resource}'. Choose one of: {', '.join(EXPORTS)}")
+
+    queryset = spec['model'].objects.all()
+
+    for param, lookup in spec['filters'].items():
+        value = params.get(param)
+        if value not in (None, ''):
+            queryset = queryset.filter(**{lookup: _parse_filter_value(spec['model'], lookup, value)})
+
+    date_field = spec['date_field']
+    for param, lookup in (('start_date', 'gte'), ('end_date', 'lte')):
+        value = params.get(param)
+        if not value:
+            continue
+        try:
+            parsed = parse_date(value) if len(value) == 10 else parse_datetime(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValueError(f"Invalid {param} '{value}'. Use YYYY-MM-DD or an ISO datetime.")
+        if isinstance(parsed, datetime):
+            if timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed)
+            queryset = queryset.filter(**{f'{date_field}__{lookup}': parsed})
+        else:
+            queryset = queryset.filter(**{f'{date_field}__date__{lookup}': parsed})
+
+    lookups = [lookup for _, lookup in spec['columns']]
+    return queryset.order_by('pk').values_list(*lookups)
+
+
+def export_columns(resource):
+    return [column for column, _ in EXPORTS[resource]['columns']]
+
+
+class _Echo:
+    """File-like object whose write() just returns the value, for csv.writer"""
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(columns, rows):
+    """Yield CSV text in blocks of ROWS_PER_YIELD rows"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+
+    block = []
+    for row in rows:
+        block.append(writer.writerow([_csv_value(v) for v in row]))
+        if len(block) >= ROWS_PER_YIELD:
+            yield ''.join(block)
+            block = []
+    if block:
+        yield ''.join(block)
+
+
+def iter_ndjson(columns, rows):
+    """Yield newline-delimited JSON objects in blocks of ROWS_PER_YIELD rows"""
+    encoder = DjangoJSONEncoder()
+    block = []
+    for row in rows:
+        block.append(encoder.encode(dict(zip(columns, row))) + '\n')
+        if len(block) >= ROWS_PER_YIELD:
+            yield ''.join(block)
+            block = []
+    if block:
+        yield ''.join(block)
+
+
+def stream_export(resource, file_format, params, chunk_size=CURSOR_CHUNK_SIZE):
+    """Return (content generator, content type) for the requested export"""
+    queryset = build_export_queryset(resource, params)
+    rows = queryset.iterator(chunk_size=chunk_size)
+    columns = export_columns(resource)
+
+    if file_format == 'csv':
+        return iter_csv(columns, rows), 'text/csv'
+    if file_format == 'ndjson':
+        return iter_ndjson(columns, rows), 'application/x-ndjson'
+    raise ValueError(f"Unsupported format '{file_format}'. Use 'csv' or 'ndjson'.")
@@ -0,0 +1,98 @@
+"""
+Mapping between the readmission model's 70 input features and Patient fields
+"""
+from django.db import models
+
+from .models import Patient
+
+# (model feature name, Patient field) in the EXACT column order used for training
+MODEL_FEATURES = [
+    ('num_lab_procedures', 'num_lab_procedures'),
+    ('num_medications', 'num_medications'),
+    ('time_in_hospital', 'time_in_hospital'),
+    ('number_inpatient', 'number_inpatient'),
+    ('num_procedures', 'num_procedures'),
+    ('discharge_disposition_id', 'discharge_disposition_id'),
+    ('number_diagnoses', 'number_diagnoses'),
+    ('admission_type_id', 'admission_type_id'),
+    ('admission_source_id', 'admission_source_id'),
+    ('gender_Male', 'gender_Male'),
+    ('number_outpatient', 'number_outpatient'),
+    ('number_emergency', 'number_emergency'),
+    ('race_Caucasian', 'race_Caucasian'),
+    ('age_[70-80)', 'age_70_80'),
+    ('age_[60-70)', 'age_60_70'),
+    ('insulin_Steady', 'insulin_Steady'),
+    ('change_No', 'change_No'),
+    ('age_[80-90)', 'age_80_90'),
+    ('insulin_No', 'insulin_No'),
+    ('age_[50-60)', 'age_50_60'),
+    ('metformin_Steady', 'metformin_Steady'),
+    ('metformin_No', 'metformin_No'),
+    ('diabetesMed_Yes', 'diabetesMed_Yes'),
+    ('glipizide_No', 'glipizide_No'),
+    ('age_[40-50)', 'age_40_50'),
+    ('insulin_Up', 'insulin_Up'),
+    ('diag_2_276', 'diag_2_276'),
+    ('A1Cresult_>8', 'A1Cresult_gt8'),
+    ('glyburide_No', 'glyburide_No'),
+    ('glipizide_Steady', 'glipizide_Steady'),
+    ('diag_3_250', 'diag_3_250'),
+    ('diag_1_428', 'diag_1_428'),
+    ('diag_2_428', 'diag_2_428'),
+    ('glyburide_Steady', 'glyburide_Steady'),
+    ('diag_3_276', 'diag_3_276'),
+    ('diag_2_427', 'diag_2_427'),
+    ('diag_3_428', 'diag_3_428'),
+    ('diag_3_401', 'diag_3_401'),
+    ('diag_3_427', 'diag_3_427'),
+    ('A1Cresult_Norm', 'A1Cresult_Norm'),
+    ('pioglitazone_No', 'pioglitazone_No'),
+    ('pioglitazone_Steady', 'pioglitazone_Steady'),
+    ('rosiglitazone_No', 'rosiglitazone_No'),
+    ('diag_1_414', 'diag_1_414'),
+    ('rosiglitazone_Steady', 'rosiglitazone_Steady'),
+    ('diag_2_496', 'diag_2_496'),
+    ('diag_3_414', 'diag_3_414'),
+    ('diag_3_496', 'diag_3_496'),
+    ('diag_2_599', 'diag_2_599'),
+    ('age_[30-40)', 'age_30_40'),
+    ('diag_1_410', 'diag_1_410'),
+    ('diag_2_403', 'diag_2_403'),
+    ('glimepiride_No', 'glimepiride_No'),
+    ('diag_2_250', 'diag_2_250'),
+    ('diag_1_486', 'diag_1_486'),
+    ('diag_3_585', 'diag_3_585'),
+    ('glimepiride_Steady', 'glimepiride_Steady'),
+    ('diag_3_403', 'diag_3_403'),
+    ('age_[90-100)', 'age_90_100'),
+    ('diag_1_786', 'diag_1_786'),
+    ('diag_3_599', 'diag_3_599'),
+    ('diag_1_491', 'diag_1_491'),
+    ('diag_1_427', 'diag_1_427'),
+    ('diag_2_707', 'diag_2_707'),
+    ('diag_1_276', 'diag_1_276'),
+    ('diag_2_411', 'diag_2_411'),
+    ('diag_1_584', 'diag_1_584'),
+    ('diag_2_585', 'diag_2_585'),
+    ('max_glu_serum_Norm', 'max_glu_serum_Norm'),
+    ('diag_2_425', 'diag_2_425'),
+]
+
+# Patient fields stored as booleans (one-hot encoded features)
+BOOLEAN_FEATURE_FIELDS = {
+    field for _, field in MODEL_FEATURES
+    if isinstance(Patient._meta.get_field(field), models.BooleanField)
+}
+
+
+def patient_feature_row(patient):
+    """Build the {feature: [value]} dict expected by predict_readmission for one patient"""
+    row = {}
+    for feature, field in MODEL_FEATURES:
+        value = getattr(patient, field)
+        if field in BOOLEAN_FEATURE_FIELDS:
+            row[feature] = [int(value)]
+        else:
+            row[feature] = [value or 0]
+    return row
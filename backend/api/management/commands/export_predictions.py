@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from api.columnar_export import CHUNK_SIZE, FORMATS, PARTITIONS, export_predictions
+
+
+class Command(BaseCommand):
+    help = 'Exports prediction records with the 70 model features and admission outcomes to Parquet/Arrow'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='exports/predictions', help='Output directory')
+        parser.add_argument('--format', dest='file_format', choices=FORMATS, default='parquet')
+        parser.add_argument('--partition', choices=PARTITIONS, default='none',
+                            help='Write one file per prediction period')
+        parser.add_argument('--start-date', help='Only predictions on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--end-date', help='Only predictions before this date (YYYY-MM-DD)')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        dates = {}
+        for option in ('start_date', 'end_date'):
+            value = options[option]
+            if value:
+                dates[option] = parse_date(value)
+                if dates[option] is None:
+                    raise CommandError(f"Invalid --{option.replace('_', '-')} '{value}', use YYYY-MM-DD")
+
+        try:
+            results = export_predictions(
+                options['output'],
+                file_format=options['file_format'],
+                partition=options['partition'],
+                chunk_size=options['chunk_size'],
+                **dates,
+            )
+        except (ValueError, RuntimeError) as e:
+            raise CommandError(str(e))
+
+        total = 0
+        for result in results:
+            total += result['rows']
+            self.stdout.write(f"{result['path']}: {result['rows']} rows")
+        self.stdout.write(self.style.SUCCESS(f'\nExport complete! {total} rows in {len(results)} file(s)'))
@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import DeletedRecord
+
+
+class Command(BaseCommand):
+    help = 'Deletes delta-sync tombstones older than --days (clients older than that must do a full reload)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = DeletedRecord.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} tombstones older than {options["days"]} days'))
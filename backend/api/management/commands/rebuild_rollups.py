@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from api.rollups import BUILDERS, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Backfills or refreshes the daily rollup tables (admissions/occupancy, appointments, revenue)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end-date', help='Last day to rebuild, inclusive (YYYY-MM-DD, default today)')
+        parser.add_argument('--days', type=int, default=2,
+                            help='Without --start-date, rebuild this many days up to --end-date (default 2)')
+        parser.add_argument('--table', dest='tables', action='append', choices=list(BUILDERS),
+                            help='Only rebuild this table (repeatable)')
+        parser.add_argument('--chunk-days', type=int, default=31, help='Days rebuilt per transaction')
+
+    def handle(self, *args, **options):
+        dates = {}
+        for option in ('start_date', 'end_date'):
+            value = options[option]
+            if value:
+                dates[option] = parse_date(value)
+                if dates[option] is None:
+                    raise CommandError(f"Invalid --{option.replace('_', '-')} '{value}', use YYYY-MM-DD")
+
+        end = dates.get('end_date') or timezone.localdate()
+        start = dates.get('start_date') or end - timedelta(days=options['days'] - 1)
+        if start > end:
+            raise CommandError('--start-date must not be after --end-date')
+
+        totals = {}
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=options['chunk_days'] - 1), end)
+            for table, written in rebuild(chunk_start, chunk_end, options['tables']).items():
+                totals[table] = totals.get(table, 0) + written
+            chunk_start = chunk_end + timedelta(days=1)
+
+        for table, written in totals.items():
+            self.stdout.write(f'{table}: {written} rows')
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rollups for {start} to {end}'))
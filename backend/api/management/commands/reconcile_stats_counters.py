@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from api.stats_counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recounts the dashboard counters from the source tables and fixes any drift (run periodically, e.g. nightly cron)'
+
+    def handle(self, *args, **options):
+        drifted = reconcile_counters()
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All counters match'))
+            return
+        for key, (stored, actual) in sorted(drifted.items()):
+            if stored is None:
+                self.stdout.write(f'{key}: created with {actual}')
+            else:
+                self.stdout.write(self.style.WARNING(f'{key}: stored {stored}, actual {actual} (fixed)'))
@@ -0,0 +1,333 @@
+"""
+Per-request instrumentation and a Prometheus metrics endpoint.
+
+RequestMetricsMiddleware times every request. Through a database execute
+wrapper it also counts the request's queries, their total time and the
+slowest one, and it times DRF rendering and the response size. Numbers are
+aggregated in-process per route (the URL name: patient-list, predict-patient,
+weekly-schedule, ...) and method, and served at GET /api/metrics/ in
+Prometheus text format together with the response cache and single-flight
+counters.
+
+Code can time its own stages (ML inference, payment calculation):
+
+    with metrics.stage('ml'):
+        risk = predict_readmission(features_df)
+
+Each worker process keeps its own numbers; Prometheus aggregates instances.
+"""
+import bisect
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+
+from . import slow_queries
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 10240, 102400, 1048576, 10485760)
+
+_local = threading.local()
+
+
+class RequestStats:
+    """What one request did; the execute wrapper and stage() write into it"""
+    __slots__ = ('queries', 'db_time', 'slowest_query', 'slowest_sql', 'render_started', 'render_time', 'stages')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.slowest_query = 0.0
+        self.slowest_sql = None
+        self.render_started = None
+        self.render_time = 0.0
+        self.stages = None
+
+    def record_query(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook"""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - start
+            self.queries += 1
+            self.db_time += elapsed
+            if elapsed > self.slowest_query:
+                self.slowest_query = elapsed
+                self.slowest_sql = sql
+
+
+def current_stats():
+    """RequestStats of the request running on this thread, or None"""
+    return getattr(_local, 'stats', None)
+
+
+@contextmanager
+def stage(name):
+    """Add the time spent in the block to the current request's named stage"""
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        stats = current_stats()
+        if stats is not None:
+            if stats.stages is None:
+                stats.stages = {}
+            stats.stages[name] = stats.stages.get(name, 0.0) + perf_counter() - start
+
+
+# -------------------------------
+# Aggregation
+# -------------------------------
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {self.sum:.6g}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class RouteMetrics:
+    __slots__ = ('duration', 'db', 'queries', 'render', 'size', 'statuses', 'stages', 'slowest_query')
+
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.db = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.render = Histogram(DURATION_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.statuses = {}
+        self.stages = {}
+        self.slowest_query = 0.0
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, method, status_code, duration, size, stats):
+        with self._lock:
+            metrics = self._routes.get((route, method))
+            if metrics is None:
+                metrics = self._routes[(route, method)] = RouteMetrics()
+            metrics.duration.observe(duration)
+            metrics.size.observe(size)
+            metrics.statuses[status_code] = metrics.statuses.get(status_code, 0) + 1
+            if stats is None:
+                return
+            metrics.db.observe(stats.db_time)
+            metrics.queries.observe(stats.queries)
+            metrics.render.observe(stats.render_time)
+            if stats.slowest_query > metrics.slowest_query:
+                metrics.slowest_query = stats.slowest_query
+            if stats.stages:
+                for name, seconds in stats.stages.items():
+                    total = metrics.stages.setdefault(name, [0.0, 0])
+                    total[0] += seconds
+                    total[1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return sorted(self._routes.items())
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+registry = Registry()
+
+
+# -------------------------------
+# Middleware
+# -------------------------------
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route or 'unnamed'
+
+
+def _size(response):
+    return 0 if response.streaming else len(response.content)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records per-request query count, DB time, render time, total time and
+    response size into the registry (disabled with REQUEST_METRICS_ENABLED =
+    False), and watches for slow queries with slow_queries.SlowQueryWatcher
+    (disabled with SLOW_QUERY_THRESHOLD_MS <= 0).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_METRICS_ENABLED', True)
+        # SLOW_QUERY_THRESHOLD_MS <= 0 turns the slow-query log off
+        threshold = slow_queries.threshold_seconds()
+        self.slow_threshold = threshold if threshold > 0 else None
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled and self.slow_threshold is None:
+            return self.get_response(request)
+        return self._instrumented(request, self.get_response)
+
+    def _instrumented(self, request, get_response):
+        # Same as connection.execute_wrapper(), minus the context manager overhead
+        hooks = []
+        stats = None
+        if self.enabled:
+            stats = RequestStats()
+            hooks.append(stats.record_query)
+        if self.slow_threshold is not None:
+            hooks.append(slow_queries.SlowQueryWatcher(self.slow_threshold, lambda: _route(request)))
+        previous, _local.stats = current_stats(), stats
+        wrappers = connection.execute_wrappers
+        wrappers.extend(hooks)
+        start = perf_counter()
+        try:
+            response = get_response(request)
+        finally:
+            del wrappers[-len(hooks):]
+            _local.stats = previous
+        if stats is not None:
+            registry.record(
+                _route(request), request.method, response.status_code,
+                perf_counter() - start, _size(response), stats,
+            )
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled and self.slow_threshold is None:
+            return await self.get_response(request)
+        # Under ASGI, sync views, template-response middleware and DRF
+        # rendering run through sync_to_async(thread_sensitive=True), i.e. on
+        # the thread of the outermost sync caller. Calling the rest of the
+        # chain from a sync thread that holds the execute wrapper puts all of
+        # the request's queries on that thread, under the wrapper.
+        return await sync_to_async(self._instrumented)(request, async_to_sync(self.get_response))
+
+    def process_template_response(self, request, response):
+        # DRF renders after the view returns; time it with a post-render callback
+        stats = current_stats()
+        if stats is not None:
+            stats.render_started = perf_counter()
+
+            def rendered(response):
+                stats.render_time = perf_counter() - stats.render_started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+
+# -------------------------------
+# Prometheus exposition
+# -------------------------------
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{_label(value)}"' for name, value in labels.items())
+
+
+def render_prometheus():
+    from .response_cache import cache_stats
+    from .single_flight import single_flight_stats
+
+    routes = registry.snapshot()
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(samples)
+
+    def histograms(name, attribute):
+        for (route, method), metrics in routes:
+            yield from getattr(metrics, attribute).samples(name, _labels(route=route, method=method))
+
+    family('hms_requests_total', 'counter', 'Requests handled, by route, method and status code', (
+        f'hms_requests_total{{{_labels(route=route, method=method, status=code)}}} {count}'
+        for (route, method), metrics in routes for code, count in sorted(metrics.statuses.items())
+    ))
+    family('hms_request_duration_seconds', 'histogram', 'Time spent handling the request',
+           histograms('hms_request_duration_seconds', 'duration'))
+    family('hms_request_db_seconds', 'histogram', 'Time spent in SQL queries per request',
+           histograms('hms_request_db_seconds', 'db'))
+    family('hms_request_queries', 'histogram', 'SQL queries per request',
+           histograms('hms_request_queries', 'queries'))
+    family('hms_request_render_seconds', 'histogram', 'Time spent rendering DRF responses',
+           histograms('hms_request_render_seconds', 'render'))
+    family('hms_response_size_bytes', 'histogram', 'Response body size (0 for streams)',
+           histograms('hms_response_size_bytes', 'size'))
+    family('hms_slowest_query_seconds', 'gauge', 'Slowest single SQL query seen on the route', (
+        f'hms_slowest_query_seconds{{{_labels(route=route, method=method)}}} {metrics.slowest_query:.6g}'
+        for (route, method), metrics in routes
+    ))
+    family('hms_request_stage_seconds', 'summary', 'Time spent in named stages (ml, payment_calculation, ...)', (
+        sample
+        for (route, method), metrics in routes for name, (seconds, count) in sorted(metrics.stages.items())
+        for sample in (
+            f'hms_request_stage_seconds_sum{{{_labels(route=route, method=method, stage=name)}}} {seconds:.6g}',
+            f'hms_request_stage_seconds_count{{{_labels(route=route, method=method, stage=name)}}} {count}',
+        )
+    ))
+    family('hms_response_cache_requests_total', 'counter', 'Response cache lookups by view and result', (
+        f'hms_response_cache_requests_total{{{_labels(view=view, result=result)}}} {counts[result]}'
+        for view, counts in cache_stats().items() for result in ('hits', 'misses')
+    ))
+    family('hms_single_flight_requests_total', 'counter', 'Coalesced aggregate requests by view and outcome', (
+        f'hms_single_flight_requests_total{{{_labels(view=view, outcome=outcome)}}} {count}'
+        for view, counts in single_flight_stats().items() for outcome, count in counts.items()
+    ))
+    return '\n'.join(lines) + '\n'
+
+
+def _authorized(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        return settings.DEBUG
+    return request.headers.get('Authorization', '') == f'Bearer {token}'
+
+
+def metrics_endpoint(request):
+    """
+    Prometheus scrape endpoint
+    GET /api/metrics/
+    Authorization: Bearer <METRICS_TOKEN> (open when METRICS_TOKEN is unset and DEBUG is on)
+    """
+    if not _authorized(request):
+        return JsonResponse({'error': 'Set METRICS_TOKEN and send it as a Bearer token'}, status=403)
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
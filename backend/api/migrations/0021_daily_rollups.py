@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_stat_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAdmissionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('room_type', models.CharField(blank=True, max_length=50)),
+                ('admissions', models.PositiveIntegerField(default=0)),
+                ('discharges', models.PositiveIntegerField(default=0)),
+                ('occupied_beds', models.PositiveIntegerField(default=0)),
+                ('bed_capacity', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['date', 'room_type'],
+                'unique_together': {('date', 'room_type')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRevenueRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('method', models.CharField(max_length=50)),
+                ('payments', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'ordering': ['date', 'method'],
+                'unique_together': {('date', 'method')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyAppointmentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('cancelled', models.PositiveIntegerField(default=0)),
+                ('no_show', models.PositiveIntegerField(default=0)),
+                ('doctor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='api.doctor')),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('date', 'doctor')},
+            },
+        ),
+    ]
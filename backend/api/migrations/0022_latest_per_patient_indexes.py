@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='admission',
+            index=models.Index(fields=['patient', '-admission_date'], name='api_admissi_patient_1f27c7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='predictionrecord',
+            index=models.Index(fields=['patient', '-prediction_date'], name='api_predict_patient_b5a84e_idx'),
+        ),
+    ]
@@ -177,7 +177,7 @@ class Patient(models.Model):
 
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -224,17 +224,14 @@ class Room(models.Model):
         return self.occupied_beds < self.bed_capacity
     
     def occupy_bed(self):
-        if self.has_space():
-            self.occupied_beds += 1
-            if self.occupied_beds >= self.bed_capacity:
-                self.is_available = False
-            self.save()
+        """Take one bed (atomic, see beds.py); False if the room is full"""
+        from .beds import occupy_bed
+        return occupy_bed(self)
     
     def release_bed(self):
-        if self.occupied_beds > 0:
-            self.occupied_beds -= 1
-            self.is_available = True
-            self.save()
+        """Give back one bed (atomic, see beds.py); False if none was occupied"""
+        from .beds import release_bed
+        return release_bed(self)
 
 
 # -------------------------------
@@ -264,6 +261,12 @@ class Admission(models.Model):
     # Procedures performed during this admission (accumulated across examinations)
     procedures = models.ManyToManyField('Procedure', blank=True, related_name='admissions')
 
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        # Latest admission per patient (prediction admission_status, timeline)
+        indexes = [models.Index(fields=['patient', '-admission_date'])]
+
     def get_length_of_stay(self):
         """Calculate number of days patient stayed"""
         if self.discharge_date:
@@ -326,6 +329,7 @@ class Payment(models.Model):
     method = models.CharField(max_length=50)  # Cash, Card, Insurance
     payment_date = models.DateTimeField(auto_now_add=True)
     notes = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.patient.name} - {self.payment_type} - ${self.final_amount}"
@@ -353,7 +357,7 @@ class Appointment(models.Model):
     notes = models.TextField(blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
-    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True, db_index=True)
 
     class Meta:
         ordering = ['-appointment_date']
@@ -381,6 +385,7 @@ class PredictionRecord(models.Model):
 
     class Meta:
         ordering = ['-prediction_date']  # Most recent first
+        indexes = [models.Index(fields=['patient', '-prediction_date'])]
 
     def __str__(self):
         risk_text = "HIGH RISK" if self.risk_level == 1 else "LOW RISK"
@@ -405,7 +410,7 @@ class Schedule(models.Model):
     is_available = models.BooleanField(default=True)  # Can be marked unavailable (sick leave, etc.)
     notes = models.TextField(blank=True)  # Admin notes or special instructions
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     is_locked = models.BooleanField(default=False)  # Lock past schedules from editing
 
     class Meta:
@@ -541,7 +546,7 @@ class Medicine(models.Model):
     requires_prescription = models.BooleanField(default=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['name']
@@ -580,7 +585,7 @@ class Prescription(models.Model):
     notes = models.TextField(blank=True, help_text="Doctor's notes or special instructions")
     is_paid = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['-prescribed_date']
@@ -590,6 +595,9 @@ class Prescription(models.Model):
 
     def get_total_cost(self):
         """Calculate total cost of all medicines in prescription"""
+        # Querysets can annotate items_total_cost to compute this in the database
+        if hasattr(self, 'items_total_cost'):
+            return self.items_total_cost
         total = sum(item.get_total_price() for item in self.items.all())
         return total
 
@@ -648,3 +656,85 @@ class PrescriptionItem(models.Model):
             self.prescription.update_status()
 
 
+
+
+# -------------------------------
+# Deleted Record (tombstones for delta sync)
+# -------------------------------
+class DeletedRecord(models.Model):
+    """Remembers deleted rows so ?updated_since= clients can drop them locally"""
+    model_label = models.CharField(max_length=100)  # e.g. "api.appointment"
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-deleted_at']
+        indexes = [models.Index(fields=['model_label', 'deleted_at'])]
+
+    def __str__(self):
+        return f"{self.model_label} #{self.object_id} deleted {self.deleted_at}"
+
+
+# -------------------------------
+# Stat Counter (dashboard statistics)
+# -------------------------------
+class StatCounter(models.Model):
+    """Incrementally maintained row counts read by the dashboard endpoints (see stats_counters.py)"""
+    key = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+
+# -------------------------------
+# Daily Rollups (time-series reporting, see rollups.py)
+# -------------------------------
+class DailyAdmissionRollup(models.Model):
+    """Admissions, discharges and midnight bed census for one day and room type"""
+    date = models.DateField()
+    room_type = models.CharField(max_length=50, blank=True)  # '' = no room assigned
+    admissions = models.PositiveIntegerField(default=0)
+    discharges = models.PositiveIntegerField(default=0)
+    occupied_beds = models.PositiveIntegerField(default=0)  # patients in a bed at the end of the day
+    bed_capacity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['date', 'room_type']
+        unique_together = ('date', 'room_type')
+
+    def __str__(self):
+        return f"{self.date} {self.room_type or 'No room'}: {self.admissions} admitted, {self.occupied_beds}/{self.bed_capacity} beds"
+
+
+class DailyAppointmentRollup(models.Model):
+    """Appointment outcomes for one day and doctor"""
+    date = models.DateField()
+    doctor = models.ForeignKey(Doctor, on_delete=models.SET_NULL, null=True, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    cancelled = models.PositiveIntegerField(default=0)
+    no_show = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['date']
+        unique_together = ('date', 'doctor')
+
+    def __str__(self):
+        return f"{self.date} doctor {self.doctor_id}: {self.total} appointments, {self.no_show} no-shows"
+
+
+class DailyRevenueRollup(models.Model):
+    """Payments and revenue (Payment.final_amount) for one day and payment method"""
+    date = models.DateField()
+    method = models.CharField(max_length=50)
+    payments = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['date', 'method']
+        unique_together = ('date', 'method')
+
+    def __str__(self):
+        return f"{self.date} {self.method}: {self.payments} payments, ${self.revenue}"
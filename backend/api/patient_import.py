@@ -0,0 +1,240 @@
+"""
+Bulk patient import from CSV / NDJSON files sent by referral partners
+"""
+import csv
+import io
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, models, transaction
+
+from .models import Patient
+from .signals import bulk_updated
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 5000
+
+# Columns the importer never takes from the file
+READ_ONLY_FIELDS = {'id', 'created_at', 'updated_at'}
+
+# Age bucket one-hot fields derived from the numeric age (same ranges as the ML features)
+AGE_BUCKETS = (
+    ('age_30_40', 30, 40),
+    ('age_40_50', 40, 50),
+    ('age_50_60', 50, 60),
+    ('age_60_70', 60, 70),
+    ('age_70_80', 70, 80),
+    ('age_80_90', 80, 90),
+    ('age_90_100', 90, None),
+)
+
+TRUE_STRINGS = {'true', 't', '1', 'yes', 'y'}
+FALSE_STRINGS = {'false', 'f', '0', 'no', 'n', ''}
+
+IMPORT_FIELDS = {
+    field.name: field
+    for field in Patient._meta.concrete_fields
+    if field.name not in READ_ONLY_FIELDS
+}
+
+# One-hot fields build_patient() fills in from gender and age when the file lacks them
+DERIVED_FIELDS = {'gender_Male'} | {bucket for bucket, _, _ in AGE_BUCKETS}
+
+
+def upsert_fields(row):
+    """
+    Fields overwritten when the row matches an existing NHS number: the
+    columns the file provides (plus the derived one-hot fields). Columns the
+    file leaves out keep the patient's current values instead of the defaults.
+    """
+    return tuple(
+        name for name in IMPORT_FIELDS
+        if name != 'nhs_number' and (name in row or name in DERIVED_FIELDS)
+    ) + ('updated_at',)
+
+
+def detect_format(uploaded_file, requested_format=None):
+    """Return 'csv' or 'ndjson' from the explicit format or the file name"""
+    if requested_format:
+        return requested_format.lower()
+    name = (uploaded_file.name or '').lower()
+    if name.endswith(('.ndjson', '.jsonl', '.json')):
+        return 'ndjson'
+    return 'csv'
+
+
+def iter_rows(uploaded_file, file_format):
+    """
+    Yield (row_number, dict) pairs one line at a time.
+    The upload is wrapped in a text stream so only the current line is held in memory.
+    """
+    stream = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+
+    if file_format == 'csv':
+        for row_number, row in enumerate(csv.DictReader(stream), start=1):
+            yield row_number, row
+    elif file_format == 'ndjson':
+        row_number = 0
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            row_number += 1
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield row_number, ValueError(f'Invalid JSON: {e}')
+                continue
+            if not isinstance(row, dict):
+                yield row_number, ValueError('Each line must be a JSON object')
+                continue
+            yield row_number, row
+
+
+def _to_bool(value):
+    if isinstance(value, bool) or value is None:
+        return bool(value)
+    if isinstance(value, (int, float)):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in TRUE_STRINGS:
+        return True
+    if text in FALSE_STRINGS:
+        return False
+    raise ValidationError(f"'{value}' is not a valid boolean.")
+
+
+def build_patient(row):
+    """
+    Validate a raw row against the Patient model fields.
+    Returns (Patient, None) on success or (None, errors_dict) on failure.
+    """
+    values = {}
+    errors = {}
+
+    for name, field in IMPORT_FIELDS.items():
+        if name not in row:
+            continue
+        raw = row[name]
+        if isinstance(raw, str):
+            raw = raw.strip()
+        try:
+            if isinstance(field, models.BooleanField):
+                values[name] = _to_bool(raw)
+            else:
+                if raw == '':
+                    raw = None
+                values[name] = field.clean(raw, None)
+        except ValidationError as e:
+            errors[name] = e.messages
+
+    # Required demographic fields (no model default)
+    for name in ('name', 'age', 'gender', 'contact'):
+        if values.get(name) in (None, '') and name not in errors:
+            errors[name] = ['This field is required.']
+
+    if errors:
+        return None, errors
+
+    # Derive one-hot fields the file did not provide explicitly
+    if 'gender_Male' not in row:
+        values['gender_Male'] = values['gender'] == 'male'
+    age = values['age']
+    for bucket, low, high in AGE_BUCKETS:
+        if bucket not in row:
+            values[bucket] = age >= low and (high is None or age < high)
+
+    return Patient(**values), None
+
+
+def _flush(batch, report, written):
+    """
+    Write one chunk in its own transaction, upserting on NHS number.
+    Adds the written pks and fields to written.
+    """
+    # Within a chunk the last row for an NHS number wins, matching upsert semantics
+    deduped = {}
+    for row_number, patient, fields in batch:
+        key = patient.nhs_number or ('row', row_number)
+        deduped[key] = (row_number, patient, fields)
+
+    rows = list(deduped.values())
+    # NDJSON lines may carry different keys; upsert each set of columns on its own
+    by_fields = {}
+    for row_number, patient, fields in rows:
+        by_fields.setdefault(fields, []).append(patient)
+    try:
+        with transaction.atomic():
+            for fields, patients in by_fields.items():
+                Patient.objects.bulk_create(
+                    patients,
+                    update_conflicts=True,
+                    unique_fields=['nhs_number'],
+                    update_fields=fields,
+                )
+    except DatabaseError as e:
+        for row_number, _, _ in rows:
+            report['errors'].append({'row': row_number, 'errors': {'non_field_errors': [str(e)]}})
+        report['failed'] += len(rows)
+        return
+
+    report['imported'] += len(rows)
+    report['duplicates_in_file'] += len(batch) - len(rows)
+    written['pks'].extend(patient.pk for _, patient, _ in rows if patient.pk is not None)
+    written['fields'].update(*by_fields)
+
+
+def import_patients(uploaded_file, file_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream-parse the upload, validate rows and bulk upsert them chunk by chunk.
+    Returns a per-row report: {total_rows, imported, failed, duplicates_in_file, errors}.
+    """
+    chunk_size = max(1, min(int(chunk_size), MAX_CHUNK_SIZE))
+    report = {
+        'total_rows': 0,
+        'imported': 0,
+        'failed': 0,
+        'duplicates_in_file': 0,
+        'errors': [],
+    }
+    batch = []
+    written = {'pks': [], 'fields': set()}
+
+    if file_format not in ('csv', 'ndjson'):
+        raise ValueError(f"Unsupported format '{file_format}'. Use 'csv' or 'ndjson'.")
+
+    try:
+        for row_number, row in iter_rows(uploaded_file, file_format):
+            report['total_rows'] += 1
+
+            if isinstance(row, Exception):
+                report['failed'] += 1
+                report['errors'].append({'row': row_number, 'errors': {'non_field_errors': [str(row)]}})
+                continue
+
+            patient, errors = build_patient(row)
+            if errors:
+                report['failed'] += 1
+                report['errors'].append({'row': row_number, 'errors': errors})
+                continue
+
+            batch.append((row_number, patient, upsert_fields(row)))
+            if len(batch) >= chunk_size:
+                _flush(batch, report, written)
+                batch = []
+    except (csv.Error, UnicodeDecodeError) as e:
+        # Unreadable file content: keep what was already imported and stop here
+        report['errors'].append({
+            'row': report['total_rows'] + 1,
+            'errors': {'non_field_errors': [f'File could not be read past this row: {e}']}
+        })
+
+    if batch:
+        _flush(batch, report, written)
+
+    if report['imported']:
+        # bulk_create skips save() signals; let counters and other listeners
+        # catch up once for the whole file (a counter recount scans the table)
+        bulk_updated.send(sender=Patient, pks=written['pks'], fields=sorted(written['fields']))
+
+    return report
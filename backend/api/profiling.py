@@ -0,0 +1,170 @@
+"""
+Opt-in cProfile run of a single request, for admins.
+
+Send "X-Profile: 1" (or add ?profile=1) to any endpoint as an admin user and
+that one request runs under cProfile. The raw profile is saved to
+PROFILE_DIR/<id>.prof (open it with pstats or snakeviz). The response
+carries:
+
+    X-Profile-Id:  <id>, for GET /api/profiles/<id>/
+    X-Profile-Top: the project's top functions by cumulative time
+
+Requests without the flag pay one header and one query-string lookup.
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import uuid
+from time import perf_counter
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils import timezone
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEADER_TOP_FUNCTIONS = 5
+SUMMARY_TOP_FUNCTIONS = 40
+PROFILE_ID = re.compile(r'^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$')
+
+# cProfile can't run two profilers on one thread; keep profiled requests serial
+_lock = threading.Lock()
+
+
+def profile_dir():
+    return str(getattr(settings, 'PROFILE_DIR', os.path.join(settings.BASE_DIR, 'profiles')))
+
+
+def _requested(request):
+    return request.headers.get('X-Profile') in ('1', 'true') or request.GET.get('profile') in ('1', 'true')
+
+
+def _is_admin(request):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        # API clients use JWTs, which DRF only checks inside the view
+        from rest_framework.exceptions import AuthenticationFailed
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        try:
+            authenticated = JWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        user = authenticated[0] if authenticated else None
+    return user is not None and user.is_authenticated and getattr(user, 'role', None) == 'admin'
+
+
+def _function_label(function):
+    filename, line, name = function
+    return f'{os.path.basename(filename)}:{line}({name})' if line else name
+
+
+def top_functions(stats, limit, project_only=True):
+    """
+    [(cumulative seconds, own seconds, calls, 'file:line(function)')] by cumulative time.
+    project_only skips Django/DRF/stdlib frames, leaving the views, serializers
+    and helpers of this project.
+    """
+    rows = [
+        (cumulative, own, calls, _function_label(function))
+        for function, (_, calls, own, cumulative, _) in stats.stats.items()
+        if not project_only or function[0].startswith(PROJECT_DIR)
+    ]
+    rows.sort(reverse=True)
+    return rows[:limit]
+
+
+def _save(profiler, request, response, elapsed):
+    profile_id = f"{timezone.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    profiler.dump_stats(os.path.join(directory, f'{profile_id}.prof'))
+
+    stats = pstats.Stats(profiler)
+    report = io.StringIO()
+    print(f'{request.method} {request.get_full_path()} -> {response.status_code} in {elapsed:.3f}s', file=report)
+    summary = pstats.Stats(profiler, stream=report)
+    summary.sort_stats('cumulative').print_stats(SUMMARY_TOP_FUNCTIONS)
+    summary.sort_stats('tottime').print_stats(SUMMARY_TOP_FUNCTIONS)
+    with open(os.path.join(directory, f'{profile_id}.txt'), 'w') as f:
+        f.write(report.getvalue())
+
+    return profile_id, top_functions(stats, HEADER_TOP_FUNCTIONS)
+
+
+class ProfilerMiddleware:
+    """Runs flagged requests from admins under cProfile (see module docstring)"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not _requested(request):
+            return self.get_response(request)
+        return self._profiled(request, self.get_response)
+
+    async def __acall__(self, request):
+        if not _requested(request):
+            return await self.get_response(request)
+        # cProfile only sees its own thread. Sync views run on the thread of
+        # the outermost sync caller (as in metrics.RequestMetricsMiddleware),
+        # so profile a sync thread that calls the rest of the chain.
+        return await sync_to_async(self._profiled)(request, async_to_sync(self.get_response))
+
+    def _profiled(self, request, get_response):
+        if not _is_admin(request):
+            return JsonResponse({'error': 'Profiling is only available to admin users'}, status=403)
+
+        with _lock:
+            profiler = cProfile.Profile()
+            start = perf_counter()
+            profiler.enable()
+            try:
+                response = get_response(request)
+                # DRF responses render lazily; include rendering in the profile
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+            finally:
+                profiler.disable()
+            elapsed = perf_counter() - start
+
+        profile_id, top = _save(profiler, request, response, elapsed)
+        response['X-Profile-Id'] = profile_id
+        response['X-Profile-Top'] = '; '.join(f'{label} {cumulative:.4f}s' for cumulative, _, _, label in top)
+        return response
+
+
+def read_profile(profile_id):
+    """Text summary of a saved profile, or None"""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(profile_dir(), f'{profile_id}.txt')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return f.read()
+
+
+def profile_path(profile_id):
+    """Path of the raw .prof file, or None"""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(profile_dir(), f'{profile_id}.prof')
+    return path if os.path.exists(path) else None
+
+
+def list_profiles(limit=50):
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    ids = sorted((name[:-len('.prof')] for name in os.listdir(directory) if name.endswith('.prof')), reverse=True)
+    return ids[:limit]
@@ -0,0 +1,285 @@
+"""
+Serializer-free read path for hot list endpoints.
+
+    APPOINTMENTS = Projection(AppointmentSerializer)
+    data = APPOINTMENTS.serialize(queryset)
+
+A Projection reads the fields of an existing ModelSerializer once and
+compiles them into a .values() projection (joined sources become lookups:
+patient.name -> patient__name) plus a row -> dict function generated for that
+serializer. Lists then skip model instances and DRF's per-field machinery
+while producing the serializer's exact output: same keys, same order, same
+value formatting (non-trivial fields still go through the DRF field's
+to_representation).
+
+Sources that aren't columns (model methods and properties,
+SerializerMethodFields) are given as computed={name: (columns, function)}.
+Nested serializers get their own Projection through nested={name: ...};
+many-to-many primary keys and nested lists are loaded with one extra query
+each. api/tests.py checks byte parity with the serializers (python manage.py
+test); check_fast_read.py also times both.
+"""
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+from rest_framework.settings import api_settings
+
+from .serializers import (
+    AdmissionSerializer, AppointmentSerializer, MedicineSerializer, PrescriptionCompactSerializer,
+    PrescriptionItemCompactSerializer, PrescriptionItemSerializer, PrescriptionSerializer, ScheduleSerializer
+)
+
+# Fields whose to_representation returns database values unchanged
+_PASS_THROUGH = (
+    serializers.CharField, serializers.EmailField, serializers.IntegerField, serializers.BooleanField,
+    serializers.ReadOnlyField, serializers.SerializerMethodField, PrimaryKeyRelatedField,
+)
+
+
+def _iso_format(field, default):
+    return str(getattr(field, 'format', default)).lower() == ISO_8601
+
+
+def _iso(value, tz):
+    return value.isoformat()
+
+
+def _datetime_converter(field):
+    # DateTimeField.to_representation without looking the timezone up per value
+    def convert(value, tz):
+        if tz is None or value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(tz).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def _converter(field):
+    """
+    None when the value can be used as is, else a function(value, tz) giving
+    the field's to_representation
+    """
+    kind = type(field)
+    if kind in _PASS_THROUGH:
+        return None
+    if kind is serializers.ChoiceField and all(isinstance(key, str) for key in field.choices):
+        return None
+    if kind is serializers.DateTimeField and _iso_format(field, api_settings.DATETIME_FORMAT) \
+            and not hasattr(field, 'timezone'):
+        return _datetime_converter(field)
+    if (kind is serializers.DateField and _iso_format(field, api_settings.DATE_FORMAT)) or \
+            (kind is serializers.TimeField and _iso_format(field, api_settings.TIME_FORMAT)):
+        return _iso
+    return lambda value, tz: field.to_representation(value)
+
+
+def _column(model, source):
+    """
+    (.values() lookup, lookups of nullable relations on the way) for a dotted
+    serializer source, or (None, None) if the source isn't a column
+    """
+    parts = source.split('.')
+    nullable = ['__'.join(parts[:index + 1]) for index in range(len(parts) - 1)]
+    if len(parts) > 1 and parts[-1] in ('id', 'pk'):
+        # admission.id -> admission_id: read the foreign key instead of joining
+        parts = parts[:-2] + [parts[-2] + '_id']
+    opts = model._meta
+    for index, part in enumerate(parts):
+        try:
+            field = opts.get_field(part)  # also accepts attnames such as admission_id
+        except FieldDoesNotExist:
+            return None, None
+        if field.many_to_many or field.one_to_many:
+            return None, None
+        if index < len(parts) - 1:
+            if not field.is_relation:
+                return None, None
+            opts = field.related_model._meta
+    # A lookup that may come back NULL breaks the attribute path
+    nullable = [lookup for lookup in nullable if _is_nullable(model, lookup)]
+    return '__'.join(parts), nullable
+
+
+def _is_nullable(model, lookup):
+    opts = model._meta
+    for part in lookup.split('__'):
+        field = opts.get_field(part)
+        if field.null:
+            return True
+        opts = field.related_model._meta
+    return False
+
+
+SKIP = object()
+
+
+def _omit(row, names):
+    # DRF leaves out fields whose attribute path hits None (SkipField)
+    for name in names:
+        if row[name] is SKIP:
+            del row[name]
+    return row
+
+
+class Projection:
+    def __init__(self, serializer_class, computed=None, nested=None):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.computed = computed or {}
+        self.nested = nested or {}
+        self._transform = None
+
+    # -------------------------------
+    # Compilation
+    # -------------------------------
+    def _compile_fields(self, prefix, columns, related, namespace):
+        """Source of a dict display for one row, adding what it reads to columns/related"""
+        pk = self.model._meta.pk.attname
+        columns.add(prefix + pk)
+        items, skippable = [], []
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            var = f'v{len(namespace)}'
+            converter = _converter(field)
+
+            if name in self.computed:
+                sources, function = self.computed[name]
+                columns.update(prefix + source for source in sources)
+                namespace[f'{var}_f'] = function
+                call = f"{var}_f({', '.join(f'row[{prefix + source!r}]' for source in sources)})"
+                expression = self._converted(call, var, converter, namespace)
+
+            elif prefix and (isinstance(field, (ManyRelatedField, serializers.ListSerializer))):
+                raise ImproperlyConfigured(f'{self.serializer_class.__name__}.{name}: lists are only read at the top level')
+
+            elif name in self.nested:
+                child, foreign_key = self.nested[name], prefix + field.source.replace('.', '__')
+                if isinstance(field, serializers.ListSerializer):
+                    # Reverse foreign key list, loaded in one query after the rows
+                    related[name] = ('children', child, self.model._meta.get_field(field.source).field.name)
+                    expression = f'related[{name!r}].get(row[{prefix + pk!r}], [])'
+                else:
+                    columns.add(foreign_key)
+                    child_expression = child._compile_fields(foreign_key + '__', columns, related, namespace)
+                    expression = f'(None if row[{foreign_key!r}] is None else {child_expression})'
+
+            elif isinstance(field, ManyRelatedField):
+                related[name] = ('many', field.source, None)
+                expression = f'related[{name!r}].get(row[{prefix + pk!r}], [])'
+
+            elif isinstance(field, serializers.BaseSerializer):
+                raise ImproperlyConfigured(f'{self.serializer_class.__name__}.{name}: pass a Projection in nested=')
+
+            else:
+                column, nullable = _column(self.model, field.source)
+                if column is None:
+                    raise ImproperlyConfigured(
+                        f'{self.serializer_class.__name__}.{name} (source {field.source!r}) is not a column; '
+                        'pass it in computed='
+                    )
+                columns.add(prefix + column)
+                expression = self._converted(f'row[{prefix + column!r}]', var, converter, namespace)
+                if nullable and not field.allow_null:
+                    # e.g. doctor_name when doctor is NULL: DRF skips the key
+                    columns.update(prefix + lookup for lookup in nullable)
+                    broken = ' or '.join(f'row[{prefix + lookup!r}] is None' for lookup in nullable)
+                    expression = f'(SKIP if {broken} else {expression})'
+                    skippable.append(name)
+
+            items.append(f'{name!r}: {expression}')
+        display = '{' + ', '.join(items) + '}'
+        return f'_omit({display}, {tuple(skippable)!r})' if skippable else display
+
+    @staticmethod
+    def _converted(value, var, converter, namespace):
+        if converter is None:
+            return value
+        namespace[var] = converter
+        return f'(None if ({var}_x := {value}) is None else {var}({var}_x, tz))'
+
+    def _compile(self):
+        columns, related, namespace = set(), {}, {'SKIP': SKIP, '_omit': _omit}
+        source = f'def transform(row, related, tz):\n    return {self._compile_fields("", columns, related, namespace)}\n'
+        exec(compile(source, f'<projection {self.serializer_class.__name__}>', 'exec'), namespace)
+        self._transform = (namespace['transform'], sorted(columns), related)
+
+    # -------------------------------
+    # Reading
+    # -------------------------------
+    def _related(self, related, pks):
+        loaded = {name: defaultdict(list) for name in related}
+        if not pks:
+            return loaded
+        for name, (kind, target, foreign_key) in related.items():
+            grouped = loaded[name]
+            if kind == 'many':
+                # Same query shape (and order) as prefetch_related on the relation
+                field = self.model._meta.get_field(target)
+                reverse = field.related_query_name()
+                owners = field.related_model._default_manager.filter(**{f'{reverse}__in': pks})
+                for owner, pk in owners.values_list(reverse, 'pk'):
+                    grouped[owner].append(pk)
+            else:
+                children = target.model._default_manager.filter(**{f'{foreign_key}__in': pks})
+                for owner, row in target._rows(children, extra=foreign_key):
+                    grouped[owner].append(row)
+        return loaded
+
+    def _rows(self, queryset, extra=None):
+        if self._transform is None:
+            self._compile()
+        transform, columns, related = self._transform
+        values = list(queryset.prefetch_related(None).values(*columns, *([extra] if extra else [])))
+        pk = self.model._meta.pk.attname
+        loaded = self._related(related, [row[pk] for row in values]) if related else {}
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        if extra:
+            return [(row[extra], transform(row, loaded, tz)) for row in values]
+        return [transform(row, loaded, tz) for row in values]
+
+    def serialize(self, queryset):
+        """Same list of dicts as serializer_class(queryset, many=True).data"""
+        return self._rows(queryset)
+
+
+# -------------------------------
+# Hot endpoints
+# -------------------------------
+def _full_name(first_name, last_name, username):
+    # ScheduleSerializer.get_user_full_name
+    return f"{first_name} {last_name}" if first_name else username
+
+
+def _total_price(quantity, price_per_unit):
+    # PrescriptionItem.get_total_price
+    return price_per_unit * quantity
+
+
+APPOINTMENTS = Projection(AppointmentSerializer)
+
+ADMISSIONS = Projection(AdmissionSerializer)
+
+SCHEDULES = Projection(ScheduleSerializer, computed={
+    'user_full_name': (('user__first_name', 'user__last_name', 'user__username'), _full_name),
+})
+
+_MEDICINE = Projection(MedicineSerializer, computed={
+    'is_low_stock': (('stock_quantity', 'reorder_level'), lambda stock, reorder: stock <= reorder),
+})
+
+# Prescription querysets must be annotated with items_total_cost (querysets.prescriptions())
+_TOTAL_COST = {'total_cost': (('items_total_cost',), lambda total: total)}
+_ITEM_TOTAL_PRICE = {'total_price': (('quantity', 'medicine__price_per_unit'), _total_price)}
+
+PRESCRIPTIONS = Projection(PrescriptionSerializer, computed=_TOTAL_COST, nested={
+    'items': Projection(PrescriptionItemSerializer, computed=_ITEM_TOTAL_PRICE, nested={'medicine_details': _MEDICINE}),
+})
+
+PRESCRIPTIONS_COMPACT = Projection(PrescriptionCompactSerializer, computed=_TOTAL_COST, nested={
+    'items': Projection(PrescriptionItemCompactSerializer, computed=_ITEM_TOTAL_PRICE),
+})
@@ -0,0 +1,109 @@
+"""
+Base querysets with the joins and prefetches their serializers need.
+
+Each function returns a fresh queryset that loads every relation the matching
+serializer dereferences (patient.name, doctor.user.username, room.room_number,
+many-to-many ids, ...) in a fixed number of queries, however many rows are
+listed. Viewsets and function views start from these instead of .objects.all().
+"""
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, OuterRef, Prefetch, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import (
+    Admission, Appointment, Doctor, Nurse, Payment, PharmacyStaff, PredictionRecord,
+    Prescription, PrescriptionItem, Schedule, ShiftSwapRequest, UnavailabilityRequest
+)
+
+
+def doctors():
+    return Doctor.objects.select_related('user')
+
+
+def nurses():
+    return Nurse.objects.select_related('user')
+
+
+def pharmacy_staff():
+    return PharmacyStaff.objects.select_related('user')
+
+
+def appointments():
+    return Appointment.objects.select_related('patient', 'doctor__user').prefetch_related('procedures')
+
+
+def admissions():
+    return (
+        Admission.objects
+        .select_related('patient', 'doctor__user', 'nurse__user', 'room')
+        .prefetch_related('procedures')
+    )
+
+
+def payments():
+    return Payment.objects.select_related('patient').prefetch_related('procedures', 'appointments')
+
+
+def latest_admission_status(patient_ref='patient_id'):
+    """Subquery: status of the most recent admission of the outer row's patient"""
+    latest = Admission.objects.filter(patient_id=OuterRef(patient_ref)).order_by('-admission_date', '-pk')
+    return Subquery(latest.values('status')[:1])
+
+
+def predictions():
+    # latest_admission_status feeds PredictionRecordSerializer.admission_status
+    return (
+        PredictionRecord.objects
+        .select_related('patient', 'predicted_by')
+        .annotate(latest_admission_status=latest_admission_status())
+    )
+
+
+def latest_predictions(queryset=None):
+    """Only each patient's most recent prediction"""
+    queryset = predictions() if queryset is None else queryset
+    latest = PredictionRecord.objects.filter(patient_id=OuterRef('patient_id')).order_by('-prediction_date', '-pk')
+    return queryset.filter(pk=Subquery(latest.values('pk')[:1]))
+
+
+def schedules():
+    return Schedule.objects.select_related('user')
+
+
+def shift_swap_requests():
+    return ShiftSwapRequest.objects.select_related(
+        'requester', 'recipient', 'reviewed_by', 'requester_shift__user', 'recipient_shift__user'
+    )
+
+
+def unavailability_requests():
+    return UnavailabilityRequest.objects.select_related('user', 'reviewed_by')
+
+
+def prescription_items():
+    return PrescriptionItem.objects.select_related('medicine')
+
+
+def prescription_total_cost():
+    """Subquery: sum of quantity * unit price over the outer prescription's items"""
+    totals = (
+        PrescriptionItem.objects
+        .filter(prescription=OuterRef('pk'))
+        .order_by()
+        .values('prescription')
+        .annotate(total=Sum(F('quantity') * F('medicine__price_per_unit')))
+        .values('total')
+    )
+    money = DecimalField(max_digits=10, decimal_places=2)
+    return Coalesce(Subquery(totals, output_field=money), Value(Decimal('0')), output_field=money)
+
+
+def prescriptions():
+    # items_total_cost feeds Prescription.get_total_cost
+    return (
+        Prescription.objects
+        .select_related('patient', 'doctor__user', 'admission', 'appointment', 'dispensed_by__user')
+        .prefetch_related(Prefetch('items', queryset=prescription_items()))
+        .annotate(items_total_cost=prescription_total_cost())
+    )
@@ -0,0 +1,249 @@
+"""
+Live push channel for the dashboards.
+
+Model save hooks publish small deltas to topics after the transaction commits;
+clients receive them over Server-Sent Events (GET /api/events/) or a
+WebSocket (/ws/events/, routed in core/asgi.py) instead of polling.
+
+Topics:
+    prescriptions  - prescription created/updated/deleted (status, patient, doctor)
+    admissions     - admission created/updated/deleted (status, patient, room)
+    rooms          - room occupancy changes
+    counters       - dashboard counter deltas (see stats_counters.py)
+
+The broker is in-memory (one process). REALTIME_BROKER in settings may point
+at another class with the same subscribe/unsubscribe/publish interface, e.g.
+one backed by Redis pub/sub when running several workers.
+"""
+import asyncio
+import json
+import threading
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+TOPICS = ('prescriptions', 'admissions', 'rooms', 'counters')
+QUEUE_SIZE = 100
+KEEPALIVE_SECONDS = 15
+
+
+class Subscription:
+    """One client's bounded queue, fed from any thread"""
+
+    def __init__(self, topics, loop):
+        self.topics = frozenset(topics)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def _put(self, message):
+        # A slow client loses its oldest messages rather than growing without bound
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    def deliver(self, message):
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class InMemoryBroker:
+    """Process-local pub/sub; publish() is safe to call from sync request threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+
+    def subscribe(self, topics):
+        subscription = Subscription(topics, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, topic, payload):
+        message = {'topic': topic, 'sent_at': timezone.now(), **payload}
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if topic in s.topics]
+        for subscription in subscriptions:
+            try:
+                subscription.deliver(message)
+            except RuntimeError:
+                # The subscriber's event loop has gone away
+                self.unsubscribe(subscription)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(getattr(settings, 'REALTIME_BROKER', 'api.realtime.InMemoryBroker'))()
+    return _broker
+
+
+def publish_on_commit(topic, payload):
+    """Publish once the current transaction commits, so clients never see rolled-back changes"""
+    transaction.on_commit(lambda: get_broker().publish(topic, payload))
+
+
+# -------------------------------
+# Save/delete hooks (connected in signals.py)
+# -------------------------------
+def _event(kwargs):
+    if 'created' not in kwargs:
+        return 'deleted'
+    return 'created' if kwargs['created'] else 'updated'
+
+
+def prescription_changed(sender, instance, **kwargs):
+    publish_on_commit('prescriptions', {
+        'event': _event(kwargs),
+        'id': instance.pk,
+        'data': {'status': instance.status, 'patient': instance.patient_id, 'doctor': instance.doctor_id},
+    })
+
+
+def admission_changed(sender, instance, **kwargs):
+    publish_on_commit('admissions', {
+        'event': _event(kwargs),
+        'id': instance.pk,
+        'data': {'status': instance.status, 'patient': instance.patient_id, 'room': instance.room_id},
+    })
+
+
+def room_changed(sender, instance, **kwargs):
+    publish_on_commit('rooms', {
+        'event': _event(kwargs),
+        'id': instance.pk,
+        'data': {
+            'room_number': instance.room_number,
+            'room_type': instance.room_type,
+            'occupied_beds': instance.occupied_beds,
+            'bed_capacity': instance.bed_capacity,
+            'is_available': instance.is_available,
+        },
+    })
+
+
+# -------------------------------
+# Transports
+# -------------------------------
+def parse_topics(raw):
+    """Requested topics (comma separated), defaulting to all; None if any is unknown"""
+    topics = [t.strip() for t in (raw or '').split(',') if t.strip()] or list(TOPICS)
+    return topics if all(t in TOPICS for t in topics) else None
+
+
+@sync_to_async
+def authenticate_token(raw_token):
+    """User for a JWT access token, or None"""
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+    from rest_framework.exceptions import AuthenticationFailed
+
+    if not raw_token:
+        return None
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+def _bearer_token(request):
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return header[len('Bearer '):]
+    # EventSource cannot set headers, so the token may come as a query parameter
+    return request.GET.get('token')
+
+
+def _sse(message):
+    return f"event: {message['topic']}\ndata: {json.dumps(message, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def event_stream(request):
+    """
+    Server-Sent Events stream of dashboard updates
+    GET /api/events/?topics=prescriptions,admissions,rooms,counters&token=<access token>
+
+    Needs an ASGI server (uvicorn core.asgi:application). Under WSGI, e.g.
+    manage.py runserver, Django would buffer the endless stream in a worker
+    thread and never send a byte, so the endpoint answers 501 instead.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'The event stream needs the ASGI server (uvicorn core.asgi:application)'}, status=501)
+    user = await authenticate_token(_bearer_token(request))
+    if user is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided or are invalid'}, status=401)
+    topics = parse_topics(request.GET.get('topics'))
+    if topics is None:
+        return JsonResponse({'error': f"Unknown topic. Use any of: {', '.join(TOPICS)}"}, status=400)
+
+    broker = get_broker()
+
+    async def stream():
+        subscription = broker.subscribe(topics)
+        try:
+            yield f": subscribed to {','.join(topics)}\n\n"
+            while True:
+                try:
+                    message = await subscription.get(timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield _sse(message)
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+    return response
+
+
+async def websocket_application(scope, receive, send):
+    """
+    ASGI WebSocket endpoint: /ws/events/?topics=...&token=<access token>
+    Sends one JSON text frame per message; client frames are ignored.
+    """
+    if (await receive())['type'] != 'websocket.connect':
+        return
+    params = parse_qs(scope.get('query_string', b'').decode())
+    user = await authenticate_token(params.get('token', [None])[0])
+    topics = parse_topics(params.get('topics', [None])[0])
+    if user is None or topics is None:
+        await send({'type': 'websocket.close', 'code': 4401 if user is None else 4400})
+        return
+
+    await send({'type': 'websocket.accept'})
+    broker = get_broker()
+    subscription = broker.subscribe(topics)
+
+    async def pump():
+        while True:
+            message = await subscription.get()
+            await send({'type': 'websocket.send', 'text': json.dumps(message, cls=DjangoJSONEncoder)})
+
+    pump_task = asyncio.create_task(pump())
+    try:
+        while (await receive())['type'] != 'websocket.disconnect':
+            pass
+    finally:
+        pump_task.cancel()
+        broker.unsubscribe(subscription)
@@ -0,0 +1,75 @@
+"""
+Fast JSON encoding for API responses.
+
+FastJSONRenderer (the DRF default renderer, see REST_FRAMEWORK in settings)
+and FastJsonResponse (used by the function views) encode with orjson when it
+is installed and JSON_BACKEND is 'orjson', and with the standard library
+otherwise. Both produce the same JSON as the classes they replace:
+
+- datetimes, dates and times go through the original encoder, so
+  timezone-aware values keep Django's/DRF's format;
+- Decimal money values become strings in JsonResponse payloads (as with
+  DjangoJSONEncoder) and floats in raw DRF data (as with DRF's encoder);
+  serializer DecimalFields are already strings;
+- U+2028/U+2029 are escaped like DRF does.
+"""
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+_ORJSON_OPTIONS = 0
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def backend():
+    """'orjson' or 'stdlib', whichever will actually be used"""
+    if orjson is not None and getattr(settings, 'JSON_BACKEND', 'orjson') == 'orjson':
+        return 'orjson'
+    return 'stdlib'
+
+
+def _escape_line_separators(content):
+    return content.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+def dumps(data, encoder_class=DjangoJSONEncoder):
+    """Compact UTF-8 JSON bytes; encoder_class handles types JSON doesn't know"""
+    if backend() == 'orjson':
+        return orjson.dumps(data, default=encoder_class().default, option=_ORJSON_OPTIONS)
+    return json.dumps(data, cls=encoder_class, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer with the orjson fast path for compact output"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        # Pretty-printed, ASCII-only and non-compact output stay on the stdlib path
+        if backend() != 'orjson' or indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        return _escape_line_separators(dumps(data, self.encoder_class))
+
+
+class FastJsonResponse(JsonResponse):
+    """Drop-in JsonResponse that encodes with dumps()"""
+
+    def __init__(self, data, encoder=DjangoJSONEncoder, safe=True, json_dumps_params=None, **kwargs):
+        if json_dumps_params:
+            # Custom formatting (indent, sort_keys, ...) needs the stdlib encoder
+            super().__init__(data, encoder, safe, json_dumps_params, **kwargs)
+            return
+        if safe and not isinstance(data, dict):
+            raise TypeError('In order to allow non-dict objects to be serialized set the safe parameter to False.')
+        kwargs.setdefault('content_type', 'application/json')
+        super(JsonResponse, self).__init__(content=dumps(data, encoder), **kwargs)
@@ -0,0 +1,177 @@
+"""
+Read-through response cache for reference-style GET endpoints.
+
+    @cache_response(Medicine)
+    def list(self, request, *args, **kwargs): ...
+
+Cached entries are keyed by view, path, query parameters, the user's role and
+the current version of every model the response depends on. Saves, deletes
+and queryset updates (the bulk_updated signal) bump a model's version after
+commit, so stale entries are never read again and simply expire. Only 200
+responses are stored, and not those marked Cache-Control: no-store.
+
+The backend is whatever CACHES['default'] is (locmem, file or Redis, see
+settings.CACHE_URL). Hit/miss counts are kept per process.
+"""
+import hashlib
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from .signals import bulk_updated
+
+KEY_PREFIX = 'response-cache'
+REPLAYED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control')
+# Saves touching only these fields don't change any cached response
+# (simplejwt updates last_login on every sign-in)
+IGNORED_UPDATE_FIELDS = frozenset({'last_login'})
+
+_stats_lock = threading.Lock()
+_stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+_watched = set()
+
+
+def _version_key(model):
+    return f'{KEY_PREFIX}:version:{model._meta.label_lower}'
+
+
+def bump_version(model):
+    """Invalidate every cached response depending on model"""
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Never reuse a version number if the key was evicted
+        cache.set(key, time.time_ns(), None)
+
+
+def _bump_on_commit(sender, update_fields=None, **kwargs):
+    if update_fields and IGNORED_UPDATE_FIELDS.issuperset(update_fields):
+        return
+    transaction.on_commit(lambda: bump_version(sender))
+
+
+def _watch(model):
+    if model in _watched:
+        return
+    _watched.add(model)
+    uid = f'response_cache_{model._meta.label_lower}'
+    post_save.connect(_bump_on_commit, sender=model, dispatch_uid=f'{uid}_post_save')
+    post_delete.connect(_bump_on_commit, sender=model, dispatch_uid=f'{uid}_post_delete')
+    bulk_updated.connect(_bump_on_commit, sender=model, dispatch_uid=f'{uid}_bulk_updated')
+
+
+def _versions(models):
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    for key, value in missing.items():
+        if not cache.add(key, value, None):
+            # Another worker initialised it first
+            value = cache.get(key, value)
+        versions[key] = value
+    return [versions[key] for key in keys]
+
+
+def model_versions(models):
+    """Current change versions of models, e.g. for ETags; their changes bump them from now on"""
+    for model in models:
+        _watch(model)
+    return _versions(models)
+
+
+def _record(name, hit):
+    with _stats_lock:
+        _stats[name]['hits' if hit else 'misses'] += 1
+
+
+def cache_stats():
+    """{view name: {hits, misses, hit_rate}} for this process"""
+    with _stats_lock:
+        return {
+            name: {**counts, 'hit_rate': round(counts['hits'] / (counts['hits'] + counts['misses']), 4)}
+            for name, counts in sorted(_stats.items())
+        }
+
+
+def _find_request(args):
+    for arg in args:
+        if hasattr(arg, 'query_params'):
+            return arg
+    raise TypeError('cache_response needs a DRF request argument')
+
+
+def _cache_key(name, request, models, vary):
+    parts = [
+        name,
+        request.path,
+        sorted(request.query_params.lists()),
+        getattr(request.user, 'role', '') or ('superuser' if request.user.is_superuser else ''),
+        _versions(models),
+        vary(request) if vary else '',
+    ]
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'{KEY_PREFIX}:{name}:{digest}'
+
+
+def _replay(request, entry):
+    """Response for a cache entry, answering 304 if the client's validators match"""
+    headers = entry['headers']
+    if 'ETag' in headers or 'Last-Modified' in headers:
+        not_modified = get_conditional_response(
+            getattr(request, '_request', request),
+            etag=headers.get('ETag'),
+            last_modified=parse_http_date_safe(headers['Last-Modified']) if 'Last-Modified' in headers else None,
+        )
+        if not_modified is not None:
+            return not_modified
+    return Response(entry['data'], status=entry['status'], headers=headers)
+
+
+def cache_response(*models, timeout=None, vary=None):
+    """
+    Decorator for GET viewset actions and @api_view functions.
+    models: every model whose changes should invalidate the response.
+    vary: optional callable(request) adding to the key (e.g. today's date).
+    """
+    for model in models:
+        _watch(model)
+
+    def decorator(view):
+        name = view.__qualname__
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            request = _find_request(args)
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+
+            key = _cache_key(name, request, models, vary)
+            entry = cache.get(key)
+            if entry is not None:
+                _record(name, hit=True)
+                return _replay(request, entry)
+
+            _record(name, hit=False)
+            response = view(*args, **kwargs)
+            if (response.status_code == 200 and isinstance(response, Response)
+                    and 'no-store' not in response.get('Cache-Control', '')):
+                cache.set(key, {
+                    'data': response.data,
+                    'status': response.status_code,
+                    'headers': {h: response[h] for h in REPLAYED_HEADERS if h in response},
+                }, settings.RESPONSE_CACHE_TIMEOUT if timeout is None else timeout)
+            return response
+
+        return wrapper
+
+    return decorator
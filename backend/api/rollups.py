@@ -0,0 +1,312 @@
+"""
+Daily rollup tables for time-series reporting.
+
+Each fact table holds one row per local day and dimension (room type, doctor,
+payment method). Days are rebuilt from the source tables, either in bulk by
+the rebuild_rollups management command (backfill / nightly catch-up) or one
+day at a time by the save/delete hooks in signals.py after each commit, so
+the current day stays live. The report endpoints only read rollups.
+
+A rebuild upserts the rows it computed on (date, dimension) and then deletes
+the keys that are no longer present, so two commits refreshing the same day
+at once both succeed (the later one wins) instead of one failing on the
+unique constraint. Refreshes after a commit never fail the request that
+made the change: errors are logged and the rebuild_rollups command can catch
+up later.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import (
+    Admission, Appointment, DailyAdmissionRollup, DailyAppointmentRollup,
+    DailyRevenueRollup, Payment, Room
+)
+
+logger = logging.getLogger(__name__)
+
+INTERVALS = {
+    'day': F,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def _day_start(day):
+    """Aware datetime for local midnight at the start of day"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _days(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+# -------------------------------
+# Builders (source tables -> rollups), start and end days inclusive
+# -------------------------------
+def build_admissions(start, end):
+    range_start, range_end = _day_start(start), _day_start(end + timedelta(days=1))
+    rows = defaultdict(lambda: {'admissions': 0, 'discharges': 0, 'occupied_beds': 0})
+
+    admitted = (
+        Admission.objects.filter(admission_date__gte=range_start, admission_date__lt=range_end)
+        .annotate(day=TruncDate('admission_date'))
+        .values('day', 'room__room_type')
+        .annotate(count=Count('id'))
+    )
+    for row in admitted:
+        rows[(row['day'], row['room__room_type'] or '')]['admissions'] = row['count']
+
+    discharged = (
+        Admission.objects.filter(discharge_date__gte=range_start, discharge_date__lt=range_end)
+        .annotate(day=TruncDate('discharge_date'))
+        .values('day', 'room__room_type')
+        .annotate(count=Count('id'))
+    )
+    for row in discharged:
+        rows[(row['day'], row['room__room_type'] or '')]['discharges'] = row['count']
+
+    # Midnight census: a stay occupies a bed at the end of every day from its
+    # admission day up to the day before discharge (or today if still open)
+    today = timezone.localdate()
+    stays = (
+        Admission.objects.filter(room__isnull=False, admission_date__lt=range_end)
+        .exclude(status='pending')
+        .filter(Q(discharge_date__isnull=True) | Q(discharge_date__gte=range_start))
+        .values_list('admission_date', 'discharge_date', 'room__room_type')
+    )
+    for admission_date, discharge_date, room_type in stays:
+        first = max(timezone.localdate(admission_date), start)
+        if discharge_date is not None:
+            last = timezone.localdate(discharge_date) - timedelta(days=1)
+        else:
+            last = today
+        for day in _days(first, min(last, end)):
+            rows[(day, room_type)]['occupied_beds'] += 1
+
+    # Capacity is the room inventory at rebuild time; every room type gets a
+    # row per day so occupancy rates have a denominator
+    capacity = dict(Room.objects.values('room_type').annotate(beds=Sum('bed_capacity')).values_list('room_type', 'beds'))
+    keys = set(rows) | {(day, room_type) for room_type in capacity for day in _days(start, min(end, today))}
+
+    return DailyAdmissionRollup, [
+        DailyAdmissionRollup(date=day, room_type=room_type, bed_capacity=capacity.get(room_type, 0), **rows[(day, room_type)])
+        for day, room_type in keys
+    ]
+
+
+def build_appointments(start, end):
+    range_start, range_end = _day_start(start), _day_start(end + timedelta(days=1))
+    grouped = (
+        Appointment.objects.filter(appointment_date__gte=range_start, appointment_date__lt=range_end)
+        .annotate(day=TruncDate('appointment_date'))
+        .values('day', 'doctor')
+        .annotate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status='completed')),
+            cancelled=Count('id', filter=Q(status='cancelled')),
+            no_show=Count('id', filter=Q(status='no_show')),
+        )
+    )
+    return DailyAppointmentRollup, [
+        DailyAppointmentRollup(
+            date=row['day'], doctor_id=row['doctor'], total=row['total'],
+            completed=row['completed'], cancelled=row['cancelled'], no_show=row['no_show'],
+        )
+        for row in grouped
+    ]
+
+
+def build_revenue(start, end):
+    range_start, range_end = _day_start(start), _day_start(end + timedelta(days=1))
+    grouped = (
+        Payment.objects.filter(payment_date__gte=range_start, payment_date__lt=range_end)
+        .annotate(day=TruncDate('payment_date'))
+        .values('day', 'method')
+        .annotate(payments=Count('id'), revenue=Sum('final_amount'))
+    )
+    return DailyRevenueRollup, [
+        DailyRevenueRollup(date=row['day'], method=row['method'], payments=row['payments'], revenue=row['revenue'] or 0)
+        for row in grouped
+    ]
+
+
+BUILDERS = {
+    'admissions': build_admissions,
+    'appointments': build_appointments,
+    'revenue': build_revenue,
+}
+
+
+# Rollup table -> its dimension, unique together with the date
+DIMENSIONS = {
+    DailyAdmissionRollup: 'room_type',
+    DailyAppointmentRollup: 'doctor',
+    DailyRevenueRollup: 'method',
+}
+
+
+def _write(model, objects, start, end):
+    """Make the rows of start..end (inclusive) exactly objects, by upsert"""
+    dimension = model._meta.get_field(DIMENSIONS[model])
+    values = [field.name for field in model._meta.concrete_fields if field.name not in ('id', 'date', dimension.name)]
+    keyed = [obj for obj in objects if getattr(obj, dimension.attname) is not None]
+    if keyed:
+        model.objects.bulk_create(
+            keyed, batch_size=1000, update_conflicts=True,
+            unique_fields=['date', dimension.name], update_fields=values,
+        )
+    # NULL never conflicts (e.g. appointments of a deleted doctor): update
+    # the day's row in place, dropping duplicates left by a concurrent rebuild
+    for obj in objects:
+        if getattr(obj, dimension.attname) is not None:
+            continue
+        pks = list(model.objects.filter(date=obj.date, **{f'{dimension.name}__isnull': True}).values_list('pk', flat=True))
+        if not pks:
+            obj.save()
+            continue
+        model.objects.filter(pk=pks[0]).update(**{name: getattr(obj, name) for name in values})
+        model.objects.filter(pk__in=pks[1:]).delete()
+
+    present = {(obj.date, getattr(obj, dimension.attname)) for obj in objects}
+    stale = [
+        pk for pk, day, value in model.objects.filter(date__gte=start, date__lte=end).values_list('pk', 'date', dimension.attname)
+        if (day, value) not in present
+    ]
+    if stale:
+        model.objects.filter(pk__in=stale).delete()
+
+
+def rebuild(start, end, tables=None):
+    """Replace the rollup rows for start..end (inclusive). Returns {table: rows written}"""
+    written = {}
+    for table in tables or BUILDERS:
+        model, objects = BUILDERS[table](start, end)
+        with transaction.atomic():
+            _write(model, objects, start, end)
+        written[table] = len(objects)
+    return written
+
+
+def refresh_days_on_commit(table, days):
+    """
+    Rebuild the given local days of one rollup table once the current
+    transaction commits. A failure is logged, never raised into the request.
+    """
+    days = sorted({day for day in days if day is not None})
+
+    def refresh():
+        for day in days:
+            try:
+                rebuild(day, day, [table])
+            except Exception:
+                logger.exception('Could not refresh the %s rollup of %s', table, day)
+
+    if days:
+        transaction.on_commit(refresh, robust=True)
+
+
+# -------------------------------
+# Save/delete receivers (connected in signals.py)
+# -------------------------------
+def _local_day(value):
+    return timezone.localdate(value) if value else None
+
+
+def admission_changed(sender, instance, **kwargs):
+    days = {_local_day(instance.admission_date), _local_day(instance.discharge_date)}
+    if instance.room_id and instance.status != 'pending':
+        days.add(timezone.localdate())
+    refresh_days_on_commit('admissions', days)
+
+
+def appointment_changed(sender, instance, **kwargs):
+    refresh_days_on_commit('appointments', [_local_day(instance.appointment_date)])
+
+
+def payment_changed(sender, instance, **kwargs):
+    refresh_days_on_commit('revenue', [_local_day(instance.payment_date)])
+
+
+ROLLUP_RECEIVERS = {
+    Admission: admission_changed,
+    Appointment: appointment_changed,
+    Payment: payment_changed,
+}
+
+
+# -------------------------------
+# Reports (read rollups only)
+# -------------------------------
+REPORTS = {
+    'admissions': {
+        'model': DailyAdmissionRollup,
+        'dimension': 'room_type',
+        'values': {'admissions': Sum('admissions'), 'discharges': Sum('discharges')},
+    },
+    'occupancy': {
+        'model': DailyAdmissionRollup,
+        'dimension': 'room_type',
+        'values': {
+            'bed_days': Sum('occupied_beds'),
+            'capacity_bed_days': Sum('bed_capacity'),
+            'days': Count('date', distinct=True),
+        },
+    },
+    'appointments': {
+        'model': DailyAppointmentRollup,
+        'dimension': 'doctor',
+        'values': {
+            'total': Sum('total'), 'completed': Sum('completed'),
+            'cancelled': Sum('cancelled'), 'no_show': Sum('no_show'),
+        },
+    },
+    'revenue': {
+        'model': DailyRevenueRollup,
+        'dimension': 'method',
+        'values': {'payments': Sum('payments'), 'revenue': Sum('revenue')},
+    },
+}
+
+
+def _derive(metric, row):
+    """Add rates to an aggregated row"""
+    if metric == 'occupancy':
+        row['average_occupied_beds'] = round(row['bed_days'] / row['days'], 2) if row['days'] else 0
+        row['occupancy_rate'] = round(row['bed_days'] / row['capacity_bed_days'], 4) if row['capacity_bed_days'] else None
+    elif metric == 'appointments':
+        attended_or_missed = row['total'] - row['cancelled']
+        row['no_show_rate'] = round(row['no_show'] / attended_or_missed, 4) if attended_or_missed else None
+    elif metric == 'revenue':
+        row['revenue'] = float(row['revenue'] or 0)
+    return row
+
+
+def report(metric, start, end, interval='day', group_by=False, dimension_value=None):
+    """
+    Aggregate a rollup table into one row per period (and per dimension when
+    group_by is set). start and end are inclusive dates.
+    """
+    if metric not in REPORTS:
+        raise ValueError(f"Unknown report '{metric}'. Use one of: {', '.join(REPORTS)}")
+    if interval not in INTERVALS:
+        raise ValueError(f"Unsupported interval '{interval}'. Use one of: {', '.join(INTERVALS)}")
+
+    spec = REPORTS[metric]
+    dimension = spec['dimension']
+    queryset = spec['model'].objects.filter(date__gte=start, date__lte=end)
+    if dimension_value is not None:
+        queryset = queryset.filter(**{dimension: dimension_value})
+
+    queryset = queryset.annotate(period=INTERVALS[interval]('date'))
+    group = ['period', dimension] if group_by else ['period']
+    rows = queryset.values(*group).annotate(**spec['values']).order_by(*group)
+    return [_derive(metric, dict(row)) for row in rows]
@@ -0,0 +1,144 @@
+"""
+Bulk sample rows for the query-budget and projection checks.
+
+    seed(10, 1)          # 10 rows of every resource, tagged qbudget1
+    null_relations()     # a few rows with every nullable relation cleared
+    projection_cases()   # (label, queryset, serializer class, projection)
+
+Used by api/tests.py and by check_query_budget.py, check_fast_read.py and
+benchmark_streaming.py, which run it inside a transaction they roll back.
+"""
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from . import projections, querysets
+from .models import (
+    Admission, Appointment, Doctor, Medicine, Nurse, Patient, Payment, PharmacyStaff,
+    PredictionRecord, Prescription, PrescriptionItem, Procedure, Room, Schedule,
+    ShiftSwapRequest, UnavailabilityRequest, User
+)
+from .serializers import (
+    AdmissionSerializer, AppointmentSerializer, PrescriptionCompactSerializer, PrescriptionSerializer,
+    ScheduleSerializer
+)
+
+PREFIX = 'qbudget'
+
+
+def seed(n, round_number):
+    """Add n rows of every resource (plus their relations)"""
+    tag = f'{PREFIX}{round_number}'
+
+    def users(role):
+        return User.objects.bulk_create([User(username=f'{tag}_{role}_{i}', role=role, first_name='Q') for i in range(n)])
+
+    doctors = Doctor.objects.bulk_create([Doctor(user=u, specialty='General') for u in users('doctor')])
+    nurses = Nurse.objects.bulk_create([Nurse(user=u, department='Ward') for u in users('nurse')])
+    pharmacists = PharmacyStaff.objects.bulk_create(
+        [PharmacyStaff(user=u, license_number=f'{tag}-{i}') for i, u in enumerate(users('pharmacy_staff'))]
+    )
+    patients = Patient.objects.bulk_create(
+        [Patient(name=f'{tag} patient {i}', age=40, gender='male', contact='0') for i in range(n)]
+    )
+    rooms = Room.objects.bulk_create([Room(room_number=f'{tag[-6:]}{i}', bed_capacity=2) for i in range(n)])
+    procedures = Procedure.objects.bulk_create(
+        [Procedure(name=f'{tag} procedure {i}', cost=Decimal('10'), procedure_type='other') for i in range(n)]
+    )
+    medicines = Medicine.objects.bulk_create([
+        Medicine(name=f'{tag} medicine {i}', category='other', dosage_form='Tablet', strength='1mg',
+                 price_per_unit=Decimal('1.50'), stock_quantity=100)
+        for i in range(n)
+    ])
+
+    appointment_date = timezone.now()
+    appointments = Appointment.objects.bulk_create([
+        Appointment(patient=patients[i], doctor=doctors[i], appointment_date=appointment_date, reason='check')
+        for i in range(n)
+    ])
+    Appointment.procedures.through.objects.bulk_create([
+        Appointment.procedures.through(appointment=a, procedure=procedures[i]) for i, a in enumerate(appointments)
+    ])
+    admissions = Admission.objects.bulk_create([
+        Admission(patient=patients[i], doctor=doctors[i], nurse=nurses[i], room=rooms[i], status='admitted')
+        for i in range(n)
+    ])
+    Admission.procedures.through.objects.bulk_create([
+        Admission.procedures.through(admission=a, procedure=procedures[i]) for i, a in enumerate(admissions)
+    ])
+    payments = Payment.objects.bulk_create([
+        Payment(patient=patients[i], admission=admissions[i], final_amount=Decimal('10'), method='Cash')
+        for i in range(n)
+    ])
+    Payment.procedures.through.objects.bulk_create([
+        Payment.procedures.through(payment=p, procedure=procedures[i]) for i, p in enumerate(payments)
+    ])
+    Payment.appointments.through.objects.bulk_create([
+        Payment.appointments.through(payment=p, appointment=appointments[i]) for i, p in enumerate(payments)
+    ])
+    PredictionRecord.objects.bulk_create([
+        PredictionRecord(patient=patients[i], predicted_by=doctors[i].user, risk_level=i % 2) for i in range(n)
+    ])
+
+    week = date(2030, 1, 1)
+    schedules = Schedule.objects.bulk_create([
+        Schedule(user=doctors[i].user, date=week + timedelta(days=i % 7), shift='morning',
+                 start_time=time(7), end_time=time(15))
+        for i in range(n)
+    ] + [
+        Schedule(user=nurses[i].user, date=week + timedelta(days=i % 7), shift='morning',
+                 start_time=time(7), end_time=time(15))
+        for i in range(n)
+    ])
+    ShiftSwapRequest.objects.bulk_create([
+        ShiftSwapRequest(requester=doctors[i].user, requester_shift=schedules[i],
+                         recipient=nurses[i].user, recipient_shift=schedules[n + i], reason='swap')
+        for i in range(n)
+    ])
+    UnavailabilityRequest.objects.bulk_create([
+        UnavailabilityRequest(user=nurses[i].user, start_date=week, end_date=week, reason='leave')
+        for i in range(n)
+    ])
+
+    prescriptions = Prescription.objects.bulk_create([
+        Prescription(patient=patients[i], doctor=doctors[i], admission=admissions[i],
+                     appointment=appointments[i], dispensed_by=pharmacists[i])
+        for i in range(n)
+    ])
+    PrescriptionItem.objects.bulk_create([
+        PrescriptionItem(prescription=p, medicine=medicines[(i + k) % n], quantity=2, dosage_instructions='daily')
+        for i, p in enumerate(prescriptions) for k in range(2)
+    ])
+
+
+def null_relations():
+    """Clear the nullable relations of the first rows: DRF renders None or leaves the key out"""
+    Appointment.objects.filter(pk__in=Appointment.objects.order_by('pk').values('pk')[:3]).update(doctor=None)
+    Admission.objects.filter(pk__in=Admission.objects.order_by('pk').values('pk')[:3]).update(
+        doctor=None, nurse=None, room=None
+    )
+    Prescription.objects.filter(pk__in=Prescription.objects.order_by('pk').values('pk')[:3]).update(
+        doctor=None, admission=None, appointment=None, dispensed_by=None
+    )
+
+
+def projection_cases():
+    """(label, queryset, serializer class, projection) as the views build them"""
+    return [
+        ('appointments/active',
+         querysets.appointments().exclude(status__in=['completed', 'cancelled', 'no_show']),
+         AppointmentSerializer, projections.APPOINTMENTS),
+        ('dashboard active_admissions',
+         querysets.admissions().filter(status='admitted').order_by('-admission_date'),
+         AdmissionSerializer, projections.ADMISSIONS),
+        ('schedules/weekly',
+         querysets.schedules().filter(date__range=[date(2030, 1, 1), date(2030, 1, 7)]).order_by('date', 'shift'),
+         ScheduleSerializer, projections.SCHEDULES),
+        ('prescriptions/pending',
+         querysets.prescriptions().filter(status__in=['pending', 'partially_dispensed']).order_by('-prescribed_date'),
+         PrescriptionSerializer, projections.PRESCRIPTIONS),
+        ('prescriptions/pending?compact',
+         querysets.prescriptions().filter(status__in=['pending', 'partially_dispensed']).order_by('-prescribed_date'),
+         PrescriptionCompactSerializer, projections.PRESCRIPTIONS_COMPACT),
+    ]
@@ -13,19 +13,24 @@ from rest_framework.response import Response
 from .models import Schedule, ShiftSwapRequest, UnavailabilityRequest, User, Appointment, Doctor
 from .serializers import ShiftSwapRequestSerializer, UnavailabilityRequestSerializer, ScheduleSerializer
 from .permissions import IsAdminUser, IsAdminDoctorOrNurse
+from . import projections, querysets
+from .conditional import list_validators, not_modified_response, set_validators
+from .response_cache import cache_response
+from .single_flight import single_flight
+from .signals import bulk_updated
 
 
 # -------------------------------
 # Shift Swap Request ViewSet
 # -------------------------------
 class ShiftSwapRequestViewSet(viewsets.ModelViewSet):
-    queryset = ShiftSwapRequest.objects.all()
+    queryset = querysets.shift_swap_requests()
     serializer_class = ShiftSwapRequestSerializer
     permission_classes = [IsAdminDoctorOrNurse]
 
     def get_queryset(self):
         """Filter by user role"""
-        queryset = ShiftSwapRequest.objects.all()
+        queryset = querysets.shift_swap_requests()
         user = self.request.user
 
         # Non-admin users only see their own requests
@@ -150,13 +155,13 @@ class ShiftSwapRequestViewSet(viewsets.ModelViewSet):
 # Unavailability Request ViewSet
 # -------------------------------
 class UnavailabilityRequestViewSet(viewsets.ModelViewSet):
-    queryset = UnavailabilityRequest.objects.all()
+    queryset = querysets.unavailability_requests()
     serializer_class = UnavailabilityRequestSerializer
     permission_classes = [IsAdminDoctorOrNurse]
 
     def get_queryset(self):
         """Filter by user role"""
-        queryset = UnavailabilityRequest.objects.all()
+        queryset = querysets.unavailability_requests()
         user = self.request.user
 
         # Non-admin users only see their own requests
@@ -183,7 +188,11 @@ class UnavailabilityRequestViewSet(viewsets.ModelViewSet):
 
         # Mark all affected schedules as unavailable
         affected_schedules = unavail_request.get_affected_schedules()
-        affected_schedules.update(is_available=False)
+        affected_ids = list(affected_schedules.values_list('pk', flat=True))
+        # update() skips auto_now, so bump updated_at for ETag/Last-Modified validators
+        affected_schedules.update(is_available=False, updated_at=timezone.now())
+        # ...and skips post_save, so tell cache/counter listeners explicitly
+        bulk_updated.send(sender=Schedule, pks=affected_ids, fields=['is_available', 'updated_at'])
 
         # Update request status
         unavail_request.status = 'approved'
@@ -224,6 +233,8 @@ class UnavailabilityRequestViewSet(viewsets.ModelViewSet):
 # -------------------------------
 @api_view(['GET'])
 @permission_classes([IsAdminDoctorOrNurse])
+@cache_response(Schedule, User, vary=lambda request: timezone.localdate())  # default week follows today
+@single_flight()
 def get_weekly_schedule(request):
     """
     Get weekly schedule for a specific week
@@ -241,17 +252,23 @@ def get_weekly_schedule(request):
     end_date = start_date + timedelta(days=6)
 
     # Get all schedules for the week
-    schedules = Schedule.objects.filter(
+    schedules = querysets.schedules().filter(
         date__range=[start_date, end_date]
     ).order_by('date', 'shift')
 
-    serializer = ScheduleSerializer(schedules, many=True)
+    # Answer 304 Not Modified if nothing in this week changed since the client's copy
+    etag, last_modified = list_validators(request, schedules, related_models=(User,))
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
 
-    return Response({
+    response = Response({
         'start_date': start_date,
         'end_date': end_date,
-        'schedules': serializer.data
+        # Same output as ScheduleSerializer, read straight from .values()
+        'schedules': projections.SCHEDULES.serialize(schedules)
     })
+    return set_validators(response, etag, last_modified)
 
 
 @api_view(['POST'])
@@ -479,7 +496,7 @@ def my_schedule(request):
         start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
         end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
 
-    schedules = Schedule.objects.filter(
+    schedules = querysets.schedules().filter(
         user=user,
         date__range=[start_date, end_date]
     ).order_by('date', 'start_time')
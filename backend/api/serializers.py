@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from . import beds
 from .models import (
     User, Patient, Doctor, Nurse, Appointment, Admission, Payment,
     PredictionRecord, Procedure, Room, Schedule, ShiftSwapRequest,
@@ -138,60 +140,39 @@ class AdmissionSerializer(serializers.ModelSerializer):
         procedures = validated_data.pop('procedures', [])
         room = validated_data.get('room', None)
 
-        # Check if room has space before creating admission
-        if room and not room.has_space():
-            raise serializers.ValidationError({
-                'room': f'Room {room.room_number} is full ({room.occupied_beds}/{room.bed_capacity} beds occupied)'
-            })
+        with transaction.atomic():
+            # Take the bed first: the conditional update fails if the room is full
+            try:
+                beds.move_admission(None, None, room, validated_data.get('status', 'pending'))
+            except beds.RoomFull as e:
+                raise serializers.ValidationError({'room': str(e)})
 
-        admission = Admission.objects.create(**validated_data)
-        if procedures:
-            admission.procedures.set(procedures)
-
-        # Occupy bed if room is assigned and status is 'admitted'
-        if room and admission.status == 'admitted':
-            room.occupy_bed()
+            admission = Admission.objects.create(**validated_data)
+            if procedures:
+                admission.procedures.set(procedures)
 
         return admission
 
     def update(self, instance, validated_data):
         """Custom update to handle ManyToMany procedures field, room changes, and discharge"""
         procedures = validated_data.pop('procedures', None)
-        old_room = instance.room
-        old_status = instance.status
         new_room = validated_data.get('room', instance.room)
         new_status = validated_data.get('status', instance.status)
 
-        # Check if new room has space
-        if new_room and new_room != old_room and not new_room.has_space():
-            raise serializers.ValidationError({
-                'room': f'Room {new_room.room_number} is full ({new_room.occupied_beds}/{new_room.bed_capacity} beds occupied)'
-            })
-
-        # Handle room changes
-        if old_room != new_room:
-            # Release old room if it was occupied
-            if old_room and old_status == 'admitted':
-                old_room.release_bed()
-            # Occupy new room if status is admitted
-            if new_room and new_status == 'admitted':
-                new_room.occupy_bed()
-
-        # Handle status change to 'admitted' (occupy room if not already occupied)
-        elif old_status != 'admitted' and new_status == 'admitted' and new_room:
-            new_room.occupy_bed()
-
-        # Handle discharge (release room)
-        elif new_status == 'discharged' and old_room and old_status == 'admitted':
-            old_room.release_bed()
-
-        # Update instance
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
+        with transaction.atomic():
+            # Occupy the new bed and release the old one (room change, admit, discharge)
+            try:
+                beds.move_admission(instance.room, instance.status, new_room, new_status)
+            except beds.RoomFull as e:
+                raise serializers.ValidationError({'room': str(e)})
+
+            # Update instance
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
 
-        if procedures is not None:
-            instance.procedures.set(procedures)
+            if procedures is not None:
+                instance.procedures.set(procedures)
 
         return instance
 
@@ -216,19 +197,21 @@ class PredictionRecordSerializer(serializers.ModelSerializer):
     admission_status = serializers.SerializerMethodField()
     is_currently_admitted = serializers.SerializerMethodField()
 
+    def _latest_admission_status(self, obj):
+        # Querysets can annotate latest_admission_status to avoid a query per row
+        if hasattr(obj, 'latest_admission_status'):
+            return obj.latest_admission_status
+        latest_admission = obj.patient.admission_set.order_by('-admission_date').first()
+        return latest_admission.status if latest_admission else None
+
     def get_admission_status(self, obj):
         """Get the most recent admission status for this patient"""
-        latest_admission = obj.patient.admission_set.order_by('-admission_date').first()
-        if latest_admission:
-            return latest_admission.status
-        return None
+        return self._latest_admission_status(obj)
 
     def get_is_currently_admitted(self, obj):
         """Check if patient is currently admitted (not discharged)"""
-        latest_admission = obj.patient.admission_set.order_by('-admission_date').first()
-        if latest_admission and latest_admission.status != 'discharged':
-            return True
-        return False
+        latest_status = self._latest_admission_status(obj)
+        return latest_status is not None and latest_status != 'discharged'
 
     class Meta:
         model = PredictionRecord
@@ -326,6 +309,22 @@ class PrescriptionItemSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class PrescriptionItemCompactSerializer(serializers.ModelSerializer):
+    """Item with the medicine's name and price only (pharmacy queue)"""
+    medicine_name = serializers.CharField(source='medicine.name', read_only=True)
+    price_per_unit = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True, source='medicine.price_per_unit'
+    )
+    total_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True, source='get_total_price')
+
+    class Meta:
+        model = PrescriptionItem
+        fields = [
+            'id', 'medicine', 'medicine_name', 'price_per_unit', 'quantity', 'dosage_instructions',
+            'duration_days', 'status', 'dispensed_date', 'total_price',
+        ]
+
+
 class PrescriptionSerializer(serializers.ModelSerializer):
     patient_name = serializers.CharField(source='patient.name', read_only=True)
     patient_contact = serializers.CharField(source='patient.contact', read_only=True)
@@ -342,6 +341,11 @@ class PrescriptionSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class PrescriptionCompactSerializer(PrescriptionSerializer):
+    """PrescriptionSerializer with compact items (?compact=true)"""
+    items = PrescriptionItemCompactSerializer(many=True, read_only=True)
+
+
 class PrescriptionCreateSerializer(serializers.Serializer):
     """Serializer for creating prescriptions with medicines"""
     patient_id = serializers.IntegerField()
@@ -1,3 +1,49 @@
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal
+
+from .bed_index import room_deleted, room_saved, rooms_updated
+from .delta_sync import TRACKED_MODELS, record_deletion
+from .models import Admission, Prescription, Room
+from .realtime import admission_changed, prescription_changed, room_changed
+from .rollups import ROLLUP_RECEIVERS
+from .stats_counters import COUNTER_SOURCES, after_write, before_write, recount_after_bulk_update, release_claims
+
+# Sent after a queryset update() that bypasses save()/post_save, e.g. the bulk
+# archive/restore/update endpoints. Receivers get sender=<model class>,
+# pks=<list of affected primary keys> and fields=<list of updated field names>.
+bulk_updated = Signal()
+
+# Tombstones for ?updated_since= delta sync
+for tracked_model in TRACKED_MODELS:
+    post_delete.connect(record_deletion, sender=tracked_model, dispatch_uid=f'delta_sync_{tracked_model.__name__}')
+
+# Dashboard counters (see stats_counters.py)
+for source in COUNTER_SOURCES:
+    uid = f'stat_counters_{source.__name__}'
+    pre_save.connect(before_write, sender=source, dispatch_uid=f'{uid}_pre_save')
+    pre_delete.connect(before_write, sender=source, dispatch_uid=f'{uid}_pre_delete')
+    post_save.connect(after_write, sender=source, dispatch_uid=f'{uid}_post_save')
+    post_delete.connect(after_write, sender=source, dispatch_uid=f'{uid}_post_delete')
+bulk_updated.connect(recount_after_bulk_update, dispatch_uid='stat_counters_bulk_updated')
+request_finished.connect(release_claims, dispatch_uid='stat_counters_release_claims')
+
+# Keep the current day of the daily rollups live (see rollups.py)
+for rollup_source, rollup_receiver in ROLLUP_RECEIVERS.items():
+    post_save.connect(rollup_receiver, sender=rollup_source, dispatch_uid=f'rollups_{rollup_source.__name__}_post_save')
+    post_delete.connect(rollup_receiver, sender=rollup_source, dispatch_uid=f'rollups_{rollup_source.__name__}_post_delete')
+
+# Live dashboard push (see realtime.py)
+for push_source, push_receiver in ((Prescription, prescription_changed), (Admission, admission_changed), (Room, room_changed)):
+    post_save.connect(push_receiver, sender=push_source, dispatch_uid=f'realtime_{push_source.__name__}_post_save')
+    post_delete.connect(push_receiver, sender=push_source, dispatch_uid=f'realtime_{push_source.__name__}_post_delete')
+
+# Per-worker free bed index (see bed_index.py)
+post_save.connect(room_saved, sender=Room, dispatch_uid='bed_index_post_save')
+post_delete.connect(room_deleted, sender=Room, dispatch_uid='bed_index_post_delete')
+bulk_updated.connect(rooms_updated, sender=Room, dispatch_uid='bed_index_bulk_updated')
+
+
 # SIGNALS DISABLED - Profile creation is now handled explicitly in ViewSets
 # to avoid duplicate creation issues and to allow custom field values (specialty, department, etc.)
 #
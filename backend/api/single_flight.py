@@ -0,0 +1,149 @@
+"""
+Request coalescing ("single-flight") for expensive aggregate endpoints.
+
+    @single_flight()
+    def dashboard_stats(request): ...
+
+Concurrent identical requests (same view, path, query string and conditional
+headers) in one worker wait for the first one and share its result instead of
+running the same aggregates in parallel. With shared=True (or
+SINGLE_FLIGHT_SHARED in settings) a cache lock extends this across workers:
+the lock holder publishes its result to the cache for a couple of seconds and
+other workers poll for it.
+"""
+import hashlib
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+KEY_PREFIX = 'single-flight'
+WAIT_SECONDS = 30
+SHARED_RESULT_SECONDS = 2
+POLL_SECONDS = 0.05
+
+_lock = threading.Lock()
+_in_flight = {}
+_stats = defaultdict(lambda: {'executed': 0, 'coalesced': 0, 'shared': 0})
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _record(name, outcome):
+    with _lock:
+        _stats[name][outcome] += 1
+
+
+def single_flight_stats():
+    """{view name: {executed, coalesced, shared}} for this process"""
+    with _lock:
+        return {name: dict(counts) for name, counts in sorted(_stats.items())}
+
+
+def _flight_key(name, request):
+    parts = [
+        name,
+        request.path,
+        sorted(request.query_params.lists()),
+        request.headers.get('If-None-Match', ''),
+        request.headers.get('If-Modified-Since', ''),
+    ]
+    return hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def _freeze(response):
+    """Picklable, thread-safe snapshot of a view's response"""
+    headers = dict(response.items())
+    if isinstance(response, Response):
+        return ('drf', response.data, response.status_code, headers)
+    return ('http', response.content, response.status_code, headers)
+
+
+def _thaw(frozen):
+    kind, body, status_code, headers = frozen
+    if kind == 'drf':
+        headers.pop('Content-Type', None)  # set again by the renderer
+        return Response(body, status=status_code, headers=headers)
+    response = HttpResponse(body, status=status_code)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def _compute_shared(key, compute):
+    """Across workers: run compute() under a cache lock, or wait for the holder's result"""
+    lock_key, result_key = f'{KEY_PREFIX}:lock:{key}', f'{KEY_PREFIX}:result:{key}'
+    deadline = time.monotonic() + WAIT_SECONDS
+    while True:
+        if cache.add(lock_key, 1, WAIT_SECONDS):
+            try:
+                frozen = compute()
+                cache.set(result_key, frozen, SHARED_RESULT_SECONDS)
+                return frozen, False
+            finally:
+                cache.delete(lock_key)
+        frozen = cache.get(result_key)
+        if frozen is not None:
+            return frozen, True
+        if time.monotonic() > deadline:
+            return compute(), False
+        time.sleep(POLL_SECONDS)
+
+
+def single_flight(shared=None):
+    """Decorator for GET @api_view functions (apply below @api_view/@permission_classes)"""
+
+    def decorator(view):
+        name = view.__qualname__
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+
+            key = _flight_key(name, request)
+            with _lock:
+                flight = _in_flight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _in_flight[key] = _Flight()
+
+            if not leader:
+                if flight.done.wait(WAIT_SECONDS):
+                    _record(name, 'coalesced')
+                    if flight.error is not None:
+                        raise flight.error
+                    return _thaw(flight.result)
+                # The leader is stuck; don't hold this request hostage
+                return view(request, *args, **kwargs)
+
+            try:
+                compute = lambda: _freeze(view(request, *args, **kwargs))  # noqa: E731
+                use_shared = getattr(settings, 'SINGLE_FLIGHT_SHARED', False) if shared is None else shared
+                if use_shared:
+                    flight.result, from_other_worker = _compute_shared(key, compute)
+                else:
+                    flight.result, from_other_worker = compute(), False
+                _record(name, 'shared' if from_other_worker else 'executed')
+            except Exception as e:
+                flight.error = e
+                raise
+            finally:
+                with _lock:
+                    _in_flight.pop(key, None)
+                flight.done.set()
+            return _thaw(flight.result)
+
+        return wrapper
+
+    return decorator
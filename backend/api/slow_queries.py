@@ -0,0 +1,213 @@
+"""
+Slow-query log with EXPLAIN capture.
+
+The request metrics middleware installs a SlowQueryWatcher as a database
+execute wrapper for every request, sync or async; it hands each query slower
+than SLOW_QUERY_THRESHOLD_MS to capture(). Each capture records
+the SQL, its parameters, the route and the innermost project stack frame that
+issued it (view, serializer, queryset helper, ...). A background thread then
+runs EXPLAIN for SELECTs on its own database connection, so the request is
+never delayed, and writes the finished entry to the 'api.slow_queries'
+logger (a rotating file, see LOGGING in settings).
+
+The last SLOW_QUERY_BUFFER_SIZE entries stay in memory; top_offenders()
+groups them by SQL fingerprint for GET /api/slow-queries/.
+"""
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+from collections import deque
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IGNORED_FILES = (os.path.abspath(__file__), os.path.join(PROJECT_DIR, 'api', 'metrics.py'))
+MAX_PARAMS_LENGTH = 500
+EXPLAIN_QUEUE_SIZE = 100
+
+_lock = threading.Lock()
+_buffer = deque(maxlen=getattr(settings, 'SLOW_QUERY_BUFFER_SIZE', 500))
+_explain_queue = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+_worker = None
+
+
+def threshold_seconds():
+    return getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 200) / 1000
+
+
+# -------------------------------
+# Fingerprints
+# -------------------------------
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """SQL with literals and IN-lists collapsed, so the same query shape groups together"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+# -------------------------------
+# Capture
+# -------------------------------
+def _caller():
+    """'path/to/file.py:123 in function' of the innermost project frame outside Django/DRF"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PROJECT_DIR) and filename not in IGNORED_FILES:
+            return f'{os.path.relpath(filename, PROJECT_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return None
+
+
+def _params(params, many):
+    if many:
+        params = f'<{len(params)} parameter sets>'
+    text = repr(params)
+    return text if len(text) <= MAX_PARAMS_LENGTH else text[:MAX_PARAMS_LENGTH] + '...'
+
+
+class SlowQueryWatcher:
+    """connection.execute_wrapper hook capturing the queries of one request slower than threshold"""
+    __slots__ = ('threshold', 'route')
+
+    def __init__(self, threshold, route=None):
+        self.threshold = threshold
+        # Called on capture only: the URL is resolved after the wrapper is installed
+        self.route = route
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - start
+            if elapsed >= self.threshold:
+                capture(sql, params, many, elapsed, context['connection'].alias,
+                        self.route() if self.route is not None else None)
+
+
+def capture(sql, params, many, duration, alias='default', route=None):
+    """Record a slow query and queue its EXPLAIN; called from the request thread"""
+    entry = {
+        'fingerprint': fingerprint(sql),
+        'sql': sql,
+        'params': _params(params, many),
+        'duration_ms': round(duration * 1000, 3),
+        'route': route,
+        'caller': _caller(),
+        'captured_at': timezone.now().isoformat(),
+        'explain': None,
+    }
+    with _lock:
+        _buffer.append(entry)
+
+    explainable = (
+        not many
+        and getattr(settings, 'SLOW_QUERY_EXPLAIN', True)
+        and sql.lstrip()[:6].upper() in ('SELECT', 'WITH')
+    )
+    if explainable:
+        _start_worker()
+        try:
+            _explain_queue.put_nowait((entry, alias, sql, params))
+            return
+        except queue.Full:
+            entry['explain'] = 'skipped: EXPLAIN queue full'
+    _log(entry)
+
+
+def _start_worker():
+    global _worker
+    if _worker is not None:
+        return
+    with _lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_explain_loop, name='slow-query-explain', daemon=True)
+            _worker.start()
+
+
+def _explain(alias, sql, params):
+    # This thread has its own connection, outside the request's transaction
+    connection = connections[alias]
+    prefix = connection.ops.explain_query_prefix()
+    with connection.cursor() as cursor:
+        cursor.execute(f'{prefix} {sql}', params)
+        return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+
+def _explain_loop():
+    while True:
+        entry, alias, sql, params = _explain_queue.get()
+        try:
+            entry['explain'] = _explain(alias, sql, params)
+        except Exception as e:
+            entry['explain'] = f'failed: {e}'
+        finally:
+            connections.close_all()
+        _log(entry)
+
+
+def _log(entry):
+    logger.warning(json.dumps(entry, default=str))
+
+
+# -------------------------------
+# Reporting
+# -------------------------------
+def recent(limit=None):
+    with _lock:
+        entries = list(_buffer)
+    entries.reverse()
+    return entries[:limit] if limit else entries
+
+
+def clear():
+    with _lock:
+        _buffer.clear()
+
+
+def top_offenders(limit=20, order='total'):
+    """Buffered slow queries grouped by fingerprint, worst first"""
+    groups = {}
+    for entry in reversed(recent()):
+        group = groups.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'routes': set(),
+            'callers': set(),
+        })
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+        group['routes'].add(entry['route'])
+        group['callers'].add(entry['caller'])
+        # The newest sample of each shape, with its plan
+        group['latest'] = entry
+
+    sort_key = {'total': 'total_ms', 'max': 'max_ms', 'count': 'count'}[order]
+    result = sorted(groups.values(), key=lambda g: g[sort_key], reverse=True)[:limit]
+    for group in result:
+        group['total_ms'] = round(group['total_ms'], 3)
+        group['mean_ms'] = round(group['total_ms'] / group['count'], 3)
+        group['routes'] = sorted(r for r in group['routes'] if r)
+        group['callers'] = sorted(c for c in group['callers'] if c)
+    return result
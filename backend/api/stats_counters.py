@@ -0,0 +1,231 @@
+"""
+Dashboard counters kept in the StatCounter table.
+
+Every counter is "rows of <model> matching <condition>". Save/delete hooks on
+the source models work out which counted rows an event can touch (the row
+itself, or the patient an admission/prediction belongs to), check their
+membership before and after the write in one query, and apply the difference
+with an F() update inside the same transaction.
+
+Queryset updates and bulk_create bypass those hooks, so the bulk_updated
+signal recounts the affected counters instead, and reconcile_counters() (the
+reconcile_stats_counters management command) recounts everything with one
+conditional-aggregation query per table as a periodic safety net.
+"""
+import threading
+from collections import defaultdict
+
+from django.db.models import BooleanField, Case, Count, Exists, F, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from .models import Admission, Doctor, Nurse, Patient, Payment, PredictionRecord, StatCounter
+from .realtime import publish_on_commit
+
+
+def _currently_admitted():
+    return Exists(Admission.objects.filter(patient=OuterRef('pk'), status='admitted'))
+
+
+def _high_risk():
+    return Exists(PredictionRecord.objects.filter(patient=OuterRef('pk'), risk_level=1))
+
+
+# key -> counted model, condition (None = every row) and {source model: field holding the counted pk}
+COUNTERS = {
+    'patients_all': {
+        'model': Patient, 'condition': None, 'sources': {Patient: 'pk'},
+    },
+    'patients_active': {
+        'model': Patient, 'condition': Q(is_archived=False), 'sources': {Patient: 'pk'},
+    },
+    'patients_archived': {
+        'model': Patient, 'condition': Q(is_archived=True), 'sources': {Patient: 'pk'},
+    },
+    'patients_insured': {
+        'model': Patient, 'condition': Q(is_archived=False, insurance_status=True), 'sources': {Patient: 'pk'},
+    },
+    'patients_handicapped': {
+        'model': Patient, 'condition': Q(is_archived=False, handicapped=True), 'sources': {Patient: 'pk'},
+    },
+    'patients_currently_admitted': {
+        'model': Patient, 'condition': Q(_currently_admitted()),
+        'sources': {Patient: 'pk', Admission: 'patient_id'},
+    },
+    'patients_outpatients': {
+        'model': Patient, 'condition': Q(is_archived=False) & ~Q(_currently_admitted()),
+        'sources': {Patient: 'pk', Admission: 'patient_id'},
+    },
+    'patients_high_risk': {
+        'model': Patient, 'condition': Q(_high_risk()),
+        'sources': {Patient: 'pk', PredictionRecord: 'patient_id'},
+    },
+    'doctors_all': {
+        'model': Doctor, 'condition': None, 'sources': {Doctor: 'pk'},
+    },
+    'nurses_all': {
+        'model': Nurse, 'condition': None, 'sources': {Nurse: 'pk'},
+    },
+    'payments_all': {
+        'model': Payment, 'condition': None, 'sources': {Payment: 'pk'},
+    },
+    'admissions_active': {
+        'model': Admission, 'condition': Q(status='admitted'), 'sources': {Admission: 'pk'},
+    },
+}
+
+# Models whose save/delete hooks maintain the counters (connected in signals.py)
+COUNTER_SOURCES = tuple({source for spec in COUNTERS.values() for source in spec['sources']})
+
+# (key, counted pk) pairs whose "before" state is held by an in-flight write.
+# A cascade or queryset delete sends every pre_delete before any post_delete,
+# so only the first event touching a counted row may account for it.
+_local = threading.local()
+
+
+def _claimed():
+    if not hasattr(_local, 'claimed'):
+        _local.claimed = set()
+    return _local.claimed
+
+
+def release_claims(**kwargs):
+    """Drop claims leaked by a write that raised between its pre and post hooks"""
+    _local.claimed = set()
+
+
+def _groups_for(source):
+    """[(counted model, field holding the counted pk, [keys])] affected by a write to source"""
+    groups = defaultdict(list)
+    for key, spec in COUNTERS.items():
+        attname = spec['sources'].get(source)
+        if attname:
+            groups[(spec['model'], attname)].append(key)
+    return [(model, attname, keys) for (model, attname), keys in groups.items()]
+
+
+def _as_boolean(condition):
+    if condition is None:
+        return Value(True, output_field=BooleanField())
+    return Case(When(condition, then=Value(True)), default=Value(False), output_field=BooleanField())
+
+
+def _membership(model, ids, keys):
+    """{counted pk: set of keys whose condition it matches}, one query"""
+    if not ids:
+        return {}
+    annotations = {f'_counter_{i}': _as_boolean(COUNTERS[key]['condition']) for i, key in enumerate(keys)}
+    rows = model.objects.filter(pk__in=ids).annotate(**annotations).values_list('pk', *annotations)
+    return {pk: {key for key, matched in zip(keys, flags) if matched} for pk, *flags in rows}
+
+
+def _affected_ids(instance, attname):
+    """Counted pks this instance points at now and, for an existing row, in the database"""
+    if attname == 'pk':
+        return {instance.pk} if instance.pk is not None else set()
+    ids = {getattr(instance, attname)}
+    if instance.pk is not None:
+        ids.update(type(instance)._base_manager.filter(pk=instance.pk).values_list(attname, flat=True))
+    ids.discard(None)
+    return ids
+
+
+def before_write(sender, instance, **kwargs):
+    """pre_save/pre_delete: remember which counters the affected rows are in"""
+    claimed = _claimed()
+    claims = {}
+    for model, attname, keys in _groups_for(sender):
+        ids = {pk for pk in _affected_ids(instance, attname) if any((key, pk) not in claimed for key in keys)}
+        membership = _membership(model, ids, keys)
+        for pk in ids:
+            for key in keys:
+                if (key, pk) not in claimed:
+                    claimed.add((key, pk))
+                    claims[(key, pk)] = (model, key in membership.get(pk, ()))
+    instance._stat_counter_claims = claims
+
+
+def after_write(sender, instance, created=False, **kwargs):
+    """post_save/post_delete: apply the membership difference to each counter"""
+    claims = instance.__dict__.pop('_stat_counter_claims', {})
+    if created:
+        # A new counted row was in no counter before the insert
+        for model, attname, keys in _groups_for(sender):
+            if attname == 'pk':
+                for key in keys:
+                    claims.setdefault((key, instance.pk), (model, False))
+    if not claims:
+        return
+
+    by_model = defaultdict(lambda: (set(), set()))
+    for (key, pk), (model, _) in claims.items():
+        by_model[model][0].add(pk)
+        by_model[model][1].add(key)
+    after = {model: _membership(model, ids, sorted(keys)) for model, (ids, keys) in by_model.items()}
+
+    deltas = defaultdict(int)
+    claimed = _claimed()
+    for (key, pk), (model, was_member) in claims.items():
+        deltas[key] += (key in after[model].get(pk, ())) - was_member
+        claimed.discard((key, pk))
+
+    changed = {key: delta for key, delta in deltas.items() if delta}
+    for key, delta in changed.items():
+        StatCounter.objects.filter(key=key).update(value=F('value') + delta)
+    if changed:
+        publish_on_commit('counters', {'event': 'delta', 'deltas': changed})
+
+
+def count_all(keys=None):
+    """Count the given counters (default all) with one conditional-aggregation query per table"""
+    keys = list(COUNTERS) if keys is None else list(keys)
+    per_model = defaultdict(dict)
+    for key in keys:
+        condition = COUNTERS[key]['condition']
+        per_model[COUNTERS[key]['model']][key] = Count('pk', filter=condition) if condition is not None else Count('pk')
+
+    values = {}
+    for model, aggregates in per_model.items():
+        values.update(model.objects.aggregate(**aggregates))
+    return values
+
+
+def _store(values):
+    """Write exact counts, returning {key: (stored, actual)} for the keys that had drifted"""
+    stored = dict(StatCounter.objects.filter(key__in=values).values_list('key', 'value'))
+    now = timezone.now()
+    StatCounter.objects.bulk_create(
+        [StatCounter(key=key, value=value, reconciled_at=now) for key, value in values.items()],
+        update_conflicts=True,
+        unique_fields=['key'],
+        update_fields=['value', 'reconciled_at'],
+    )
+    drifted = {key: (stored.get(key), value) for key, value in values.items() if stored.get(key) != value}
+    if drifted:
+        publish_on_commit('counters', {'event': 'reset', 'values': {key: value for key, (_, value) in drifted.items()}})
+    return drifted
+
+
+def reconcile_counters(keys=None):
+    """Recount counters (default all) and store the exact values. Returns the drifted keys"""
+    return _store(count_all(keys))
+
+
+def read_counters(keys):
+    """
+    {key: value} from the counters table in one query. Missing counters (fresh
+    database) are counted and stored on the spot.
+    """
+    values = dict(StatCounter.objects.filter(key__in=keys).values_list('key', 'value'))
+    missing = [key for key in keys if key not in values]
+    if missing:
+        counted = count_all(missing)
+        _store(counted)
+        values.update(counted)
+    return values
+
+
+def recount_after_bulk_update(sender, **kwargs):
+    """bulk_updated receiver: recount the counters fed by the updated model"""
+    keys = [key for key, spec in COUNTERS.items() if sender in spec['sources']]
+    if keys:
+        reconcile_counters(keys)
@@ -1,3 +1,101 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import User
+from .renderers import FastJSONRenderer
+from .sample_data import PREFIX, null_relations, projection_cases, seed
+from .stats_counters import reconcile_counters
+
+# Queries per request, whatever the number of rows (see check_query_budget.py)
+QUERY_BUDGETS = {
+    '/api/users/': 1,
+    '/api/patients/': 2,
+    '/api/doctors/': 1,
+    '/api/nurses/': 1,
+    '/api/pharmacy-staff/': 1,
+    '/api/appointments/': 2,
+    '/api/appointments/active/': 2,
+    '/api/admissions/': 2,
+    '/api/payments/': 3,
+    '/api/predictions/': 1,
+    '/api/procedures/': 1,
+    '/api/rooms/': 1,
+    '/api/rooms/availability/': 3,
+    '/api/schedules/': 2,
+    '/api/schedules/weekly/?start_date=2030-01-01': 2,
+    '/api/shift-swaps/': 1,
+    '/api/unavailability-requests/': 1,
+    '/api/medicines/': 2,
+    '/api/prescriptions/': 2,
+    '/api/prescriptions/pending/': 2,
+    '/api/prescriptions/pending/?compact=true': 2,
+    '/api/prescription-items/': 1,
+    '/api/dashboard/admin/': 6,
+}
+# Requested as the first seeded user with that role
+ROLE_QUERY_BUDGETS = {
+    ('doctor', '/api/dashboard/doctor/'): 10,
+    ('nurse', '/api/dashboard/nurse/'): 6,
+    ('pharmacy_staff', '/api/dashboard/pharmacy/'): 7,
+}
+
+
+class ProjectionParityTests(TestCase):
+    """The serializer-free read path must render the same bytes as the DRF serializers"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(5, 1)
+        null_relations()
+
+    def test_projections_match_serializers(self):
+        renderer = FastJSONRenderer()
+        for label, queryset, serializer_class, projection in projection_cases():
+            with self.subTest(label):
+                self.assertTrue(queryset.exists())
+                self.assertEqual(
+                    renderer.render(projection.serialize(queryset.all())),
+                    renderer.render(serializer_class(queryset.all(), many=True).data),
+                )
+
+
+# The response cache would answer without queries, dashboard widgets on pool
+# threads would not see the test transaction, and the bed index only follows
+# committed changes unless it reloads
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+    DASHBOARD_WORKERS=1,
+    BED_INDEX_RECONCILE_SECONDS=0,
+)
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username=f'{PREFIX}_admin', role='admin', is_staff=True, is_superuser=True)
+        seed(5, 1)
+
+    def setUp(self):
+        # Store the dashboard counters, so that the first read doesn't count them
+        reconcile_counters()
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def assert_budgets(self):
+        requests = [(self.client_for(self.admin), url, budget) for url, budget in QUERY_BUDGETS.items()]
+        for (role, url), budget in ROLE_QUERY_BUDGETS.items():
+            requests.append((self.client_for(User.objects.get(username=f'{PREFIX}1_{role}_0')), url, budget))
+        for client, url, budget in requests:
+            with self.subTest(url):
+                with self.assertNumQueries(budget):
+                    response = client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_query_budgets(self):
+        self.assert_budgets()
+
+    def test_query_budgets_do_not_grow_with_rows(self):
+        for round_number in range(2, 6):
+            seed(5, round_number)
+        self.assert_budgets()
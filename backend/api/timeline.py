@@ -0,0 +1,103 @@
+"""
+Patient timeline: admissions, appointments, prescriptions, payments and
+predictions merged into one chronological stream.
+
+Every source starts from its querysets.py base (select_related/prefetch_related),
+so a page costs the same fixed number of queries however long the patient's
+history is.
+"""
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import querysets
+from .serializers import (
+    AdmissionSerializer, AppointmentSerializer, PaymentSerializer,
+    PredictionRecordSerializer, PrescriptionSerializer
+)
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+EVENT_TYPES = ('admission', 'appointment', 'prescription', 'payment', 'prediction')
+
+
+def _sources(patient):
+    """(event type, date field, queryset, serializer) for each history source"""
+    return [
+        ('admission', 'admission_date', querysets.admissions().filter(patient=patient), AdmissionSerializer),
+        ('appointment', 'appointment_date', querysets.appointments().filter(patient=patient), AppointmentSerializer),
+        ('prescription', 'prescribed_date', querysets.prescriptions().filter(patient=patient), PrescriptionSerializer),
+        ('payment', 'payment_date', querysets.payments().filter(patient=patient), PaymentSerializer),
+        ('prediction', 'prediction_date', querysets.predictions().filter(patient=patient), PredictionRecordSerializer),
+    ]
+
+
+def format_cursor(date, event_type, event_id):
+    return f'{date.isoformat()}|{event_type}|{event_id}'
+
+
+def parse_cursor(value):
+    """(aware datetime, event type, id) from a next_cursor string, or None if malformed"""
+    parts = value.replace(' ', '+').split('|')
+    if len(parts) != 3 or parts[1] not in EVENT_TYPES or not parts[2].isdigit():
+        return None
+    date = parse_datetime(parts[0])
+    if date is None:
+        return None
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date, parts[1], int(parts[2])
+
+
+def _older_than_cursor(date_field, event_type, cursor):
+    """Events of one source that sort after the cursor event (date, type, id descending)"""
+    date, cursor_type, cursor_id = cursor
+    older = Q(**{f'{date_field}__lt': date})
+    # Events at the cursor's exact time are ordered by type, then id
+    if event_type < cursor_type:
+        older |= Q(**{date_field: date})
+    elif event_type == cursor_type:
+        older |= Q(**{date_field: date, 'id__lt': cursor_id})
+    return older
+
+
+def build_timeline(patient, before=None, limit=DEFAULT_LIMIT, cursor=None):
+    """
+    Return {'events': [...], 'next_cursor': ..., 'next_before': ...} newest first.
+    Pass next_cursor back as ?cursor= to fetch the following page; events
+    sharing a timestamp are ordered by (type, id), so none is skipped between
+    pages. before (a datetime) only keeps events strictly older than it.
+    """
+    limit = max(1, min(limit, MAX_LIMIT))
+    candidates = []
+
+    for event_type, date_field, queryset, serializer_class in _sources(patient):
+        if before is not None:
+            queryset = queryset.filter(**{f'{date_field}__lt': before})
+        if cursor is not None:
+            queryset = queryset.filter(_older_than_cursor(date_field, event_type, cursor))
+        # Each source can contribute at most `limit` events to this page
+        for obj in queryset.order_by(f'-{date_field}', '-id')[:limit + 1]:
+            candidates.append((getattr(obj, date_field), event_type, obj, serializer_class))
+
+    candidates.sort(key=lambda c: (c[0], c[1], c[2].id), reverse=True)
+    page = candidates[:limit]
+    has_more = len(candidates) > limit
+
+    events = [
+        {
+            'type': event_type,
+            'date': date,
+            'id': obj.id,
+            'data': serializer_class(obj).data,
+        }
+        for date, event_type, obj, serializer_class in page
+    ]
+
+    last = page[-1] if has_more and page else None
+    return {
+        'events': events,
+        'next_cursor': format_cursor(last[0], last[1], last[2].id) if last else None,
+        # Timestamp only: events sharing it with the last one are skipped by ?before=
+        'next_before': last[0] if last else None,
+    }
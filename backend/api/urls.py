@@ -5,7 +5,9 @@ from .views import (
     UserViewSet, PatientViewSet, DoctorViewSet, NurseViewSet,
     AppointmentViewSet, AdmissionViewSet, PaymentViewSet, PredictionRecordViewSet,
     ProcedureViewSet, RoomViewSet, ScheduleViewSet,
-    predict_patient, login_user, dashboard_stats, patient_stats, create_payment_with_calculation,
+    predict_patient, login_user, dashboard_stats, patient_stats, create_payment_with_calculation, export_data,
+    role_dashboard, export_prediction_features, rollup_report, response_cache_stats, slow_query_log,
+    request_profiles, request_profile_detail, batch_requests,
     CustomTokenObtainPairView, UserRegistrationView, LogoutView,
     PasswordChangeView, PasswordResetRequestView, PasswordResetConfirmView, CurrentUserView,
     PharmacyStaffViewSet, MedicineViewSet, PrescriptionViewSet, PrescriptionItemViewSet,
@@ -16,6 +18,8 @@ from .schedule_views import (
     get_weekly_schedule, bulk_create_schedules, night_shift_rotation_suggestion,
     check_appointment_coverage, my_schedule
 )
+from .realtime import event_stream
+from .metrics import metrics_endpoint
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
@@ -53,8 +57,19 @@ urlpatterns = [
     # Custom endpoints
     path('predict/<int:patient_id>/', predict_patient, name='predict-patient'),
     path('dashboard-stats/', dashboard_stats, name='dashboard-stats'),
+    path('dashboard/<str:role>/', role_dashboard, name='role-dashboard'),
     path('patient-stats/', patient_stats, name='patient-stats'),
     path('create-payment/', create_payment_with_calculation, name='create-payment'),
+    path('exports/<str:resource>/', export_data, name='export-data'),
+    path('analytics/predictions/', export_prediction_features, name='export-prediction-features'),
+    path('rollups/<str:metric>/', rollup_report, name='rollup-report'),
+    path('events/', event_stream, name='event-stream'),
+    path('cache-stats/', response_cache_stats, name='response-cache-stats'),
+    path('metrics/', metrics_endpoint, name='metrics'),
+    path('slow-queries/', slow_query_log, name='slow-query-log'),
+    path('profiles/', request_profiles, name='request-profiles'),
+    path('profiles/<str:profile_id>/', request_profile_detail, name='request-profile-detail'),
+    path('batch/', batch_requests, name='batch'),
 
     # Schedule management endpoints
     path('schedules/weekly/', get_weekly_schedule, name='weekly-schedule'),
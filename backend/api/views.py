@@ -1,10 +1,11 @@
-from django.http import JsonResponse
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.utils import timezone
 from django.db import models
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from rest_framework import viewsets, status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -22,11 +23,22 @@ from .serializers import (
     AppointmentSerializer, AdmissionSerializer, PaymentSerializer, PredictionRecordSerializer,
     ProcedureSerializer, RoomSerializer, ScheduleSerializer, UserRegistrationSerializer, PasswordChangeSerializer,
     PasswordResetRequestSerializer, PasswordResetConfirmSerializer, ShiftSwapRequestSerializer, UnavailabilityRequestSerializer,
-    PharmacyStaffSerializer, MedicineSerializer, PrescriptionSerializer, PrescriptionItemSerializer, PrescriptionCreateSerializer
+    PharmacyStaffSerializer, MedicineSerializer, PrescriptionSerializer, PrescriptionItemSerializer, PrescriptionCreateSerializer,
+    PrescriptionCompactSerializer
 )
 from .permissions import (
     IsAdminUser, IsAdminOrReadOnly, IsAdminOrDoctor, IsAdminOrNurse, IsAdminDoctorOrNurse
 )
+from .bed_index import bed_index
+from .bulk_actions import BulkActionsMixin
+from .conditional import ConditionalGetMixin
+from . import beds, dashboards, metrics, projections, querysets
+# Same interface as django.http.JsonResponse, encoded with orjson when available
+from .renderers import FastJsonResponse as JsonResponse
+from .delta_sync import DeltaSyncMixin
+from .response_cache import cache_response
+from .single_flight import single_flight
+from .streaming import StreamingListMixin
 
 
 # -------------------------------
@@ -243,10 +255,20 @@ class UserViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAdminUser]
 
 
-class PatientViewSet(viewsets.ModelViewSet):
+class PatientViewSet(StreamingListMixin, ConditionalGetMixin, DeltaSyncMixin, BulkActionsMixin, viewsets.ModelViewSet):
     queryset = Patient.objects.all()
     serializer_class = PatientSerializer
     permission_classes = [IsAdminDoctorOrNurse]
+    bulk_filter_fields = {
+        'gender': 'gender',
+        'insurance_status': 'insurance_status',
+        'handicapped': 'handicapped',
+        'age_min': 'age__gte',
+        'age_max': 'age__lte',
+        'created_before': 'created_at__lt',
+        'updated_before': 'updated_at__lt',
+    }
+    bulk_update_fields = ('insurance_status', 'handicapped')
 
     def get_queryset(self):
         """
@@ -386,11 +408,107 @@ class PatientViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(appointable_patients, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'], url_path='timeline')
+    def timeline(self, request, pk=None):
+        """
+        Get a patient's full history as one chronological stream (newest first)
+        GET /api/patients/{id}/timeline/?limit=50&cursor=<next_cursor>
+        GET /api/patients/{id}/timeline/?before=<ISO datetime> - only events older than that
+        Combines admissions, appointments, prescriptions, payments and predictions.
+        Use next_cursor from the response as ?cursor= to load the next page.
+        """
+        from django.utils.dateparse import parse_datetime
+        from .timeline import build_timeline, parse_cursor, DEFAULT_LIMIT
+
+        # Archived patients keep their history, so don't use the filtered queryset
+        try:
+            patient = Patient.objects.get(pk=pk)
+        except Patient.DoesNotExist:
+            return Response({
+                'status': 'error',
+                'message': 'Patient not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        before = request.query_params.get('before')
+        if before:
+            before = parse_datetime(before.replace(' ', '+'))
+            if before is None:
+                return Response({
+                    'status': 'error',
+                    'message': 'before must be an ISO datetime'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(before):
+                before = timezone.make_aware(before)
+
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            cursor = parse_cursor(cursor)
+            if cursor is None:
+                return Response({
+                    'status': 'error',
+                    'message': 'cursor must be a next_cursor value from a previous page'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            limit = DEFAULT_LIMIT
+
+        data = build_timeline(patient, before=before or None, limit=limit, cursor=cursor or None)
+        return Response({
+            'patient_id': patient.id,
+            'patient_name': patient.name,
+            **data
+        })
+
+    @action(detail=False, methods=['post'], url_path='import',
+            permission_classes=[IsAdminUser], parser_classes=[MultiPartParser, FormParser])
+    def import_patients(self, request):
+        """
+        Bulk import patients from a CSV or NDJSON file (multipart field "file")
+        POST /api/patients/import/?file_format=csv|ndjson&chunk_size=1000
+        Rows are validated and upserted in chunks; existing NHS numbers are updated.
+        Returns a per-row error report.
+        """
+        from .patient_import import detect_format, import_patients, DEFAULT_CHUNK_SIZE
+
+        uploaded_file = request.FILES.get('file')
+        if not uploaded_file:
+            return Response(
+                {'status': 'error', 'message': 'file is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        file_format = detect_format(uploaded_file, request.query_params.get('file_format'))
+        try:
+            chunk_size = int(request.query_params.get('chunk_size', DEFAULT_CHUNK_SIZE))
+            report = import_patients(uploaded_file, file_format, chunk_size=chunk_size)
+        except ValueError as e:
+            return Response(
+                {'status': 'error', 'message': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-class DoctorViewSet(viewsets.ModelViewSet):
-    queryset = Doctor.objects.all()
+        return Response({
+            'status': 'success' if not report['failed'] else 'partial',
+            **report
+        }, status=status.HTTP_200_OK)
+
+
+class DoctorViewSet(BulkActionsMixin, viewsets.ModelViewSet):
+    queryset = querysets.doctors()
     serializer_class = DoctorSerializer
     permission_classes = [IsAdminOrReadOnly]
+    bulk_filter_fields = {'specialty': 'specialty'}
+    bulk_update_fields = ('specialty',)
+
+    @cache_response(Doctor, User)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response(Doctor, User)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     def create(self, request, *args, **kwargs):
         """
@@ -479,8 +597,8 @@ class DoctorViewSet(viewsets.ModelViewSet):
         """Filter out archived doctors by default, unless archived=true parameter"""
         show_archived = self.request.query_params.get('archived', 'false')
         if show_archived.lower() in ['true', '1']:
-            return Doctor.objects.filter(is_archived=True)
-        return Doctor.objects.filter(is_archived=False)
+            return querysets.doctors().filter(is_archived=True)
+        return querysets.doctors().filter(is_archived=False)
 
     @action(detail=True, methods=['post'])
     def archive(self, request, pk=None):
@@ -512,10 +630,12 @@ class DoctorViewSet(viewsets.ModelViewSet):
         }, status=status.HTTP_200_OK)
 
 
-class NurseViewSet(viewsets.ModelViewSet):
-    queryset = Nurse.objects.all()
+class NurseViewSet(BulkActionsMixin, viewsets.ModelViewSet):
+    queryset = querysets.nurses()
     serializer_class = NurseSerializer
     permission_classes = [IsAdminOrReadOnly]
+    bulk_filter_fields = {'department': 'department'}
+    bulk_update_fields = ('department',)
 
     def create(self, request, *args, **kwargs):
         """
@@ -602,8 +722,8 @@ class NurseViewSet(viewsets.ModelViewSet):
         """Filter out archived nurses by default, unless archived=true parameter"""
         show_archived = self.request.query_params.get('archived', 'false')
         if show_archived.lower() in ['true', '1']:
-            return Nurse.objects.filter(is_archived=True)
-        return Nurse.objects.filter(is_archived=False)
+            return querysets.nurses().filter(is_archived=True)
+        return querysets.nurses().filter(is_archived=False)
 
     @action(detail=True, methods=['post'])
     def archive(self, request, pk=None):
@@ -635,8 +755,8 @@ class NurseViewSet(viewsets.ModelViewSet):
         }, status=status.HTTP_200_OK)
 
 
-class AppointmentViewSet(viewsets.ModelViewSet):
-    queryset = Appointment.objects.all()
+class AppointmentViewSet(StreamingListMixin, DeltaSyncMixin, viewsets.ModelViewSet):
+    queryset = querysets.appointments()
     serializer_class = AppointmentSerializer
     permission_classes = [IsAdminDoctorOrNurse]
 
@@ -677,9 +797,9 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         Get all active (non-completed) appointments
         GET /api/appointments/active/
         """
-        active = self.queryset.exclude(status__in=['completed', 'cancelled', 'no_show'])
-        serializer = self.get_serializer(active, many=True)
-        return Response(serializer.data)
+        active = self.get_queryset().exclude(status__in=['completed', 'cancelled', 'no_show'])
+        # Same output as AppointmentSerializer, read straight from .values()
+        return Response(projections.APPOINTMENTS.serialize(active))
 
     @action(detail=False, methods=['get'], url_path='completed')
     def completed_appointments(self, request):
@@ -687,13 +807,13 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         Get all completed appointments (archive) - includes completed and no-show
         GET /api/appointments/completed/
         """
-        completed = self.queryset.filter(status__in=['completed', 'no_show'])
+        completed = self.get_queryset().filter(status__in=['completed', 'no_show'])
         serializer = self.get_serializer(completed, many=True)
         return Response(serializer.data)
 
 
-class AdmissionViewSet(viewsets.ModelViewSet):
-    queryset = Admission.objects.all()
+class AdmissionViewSet(StreamingListMixin, DeltaSyncMixin, viewsets.ModelViewSet):
+    queryset = querysets.admissions()
     serializer_class = AdmissionSerializer
     permission_classes = [IsAdminDoctorOrNurse]
 
@@ -702,44 +822,50 @@ class AdmissionViewSet(viewsets.ModelViewSet):
         """
         Assign a room to an admission
         POST /api/admissions/{id}/assign_room/
-        Body: {"room_id": 1}
+        Body: {"room_id": 1} - a given room
+        Body: {"room_type": "ICU"} - the best room of that type with a free bed
         """
         admission = self.get_object()
         room_id = request.data.get('room_id')
+        room_type = request.data.get('room_type')
 
-        if not room_id:
+        if not room_id and not room_type:
             return Response(
-                {'status': 'error', 'message': 'room_id is required'},
+                {'status': 'error', 'message': 'room_id or room_type is required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            room = Room.objects.get(pk=room_id)
-        except Room.DoesNotExist:
-            return Response(
-                {'status': 'error', 'message': 'Room not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
-
-        # Check if room has space
-        if not room.has_space():
-            return Response(
-                {'status': 'error', 'message': f'Room {room.room_number} is full ({room.occupied_beds}/{room.bed_capacity} beds occupied)'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Release old room if exists and was occupied
-        if admission.room and admission.status == 'admitted':
-            admission.room.release_bed()
-
-        # Assign new room
-        admission.room = room
-
-        # Occupy bed if status is admitted
-        if admission.status == 'admitted':
-            room.occupy_bed()
+        with transaction.atomic():
+            if room_id:
+                try:
+                    room = Room.objects.get(pk=room_id)
+                except Room.DoesNotExist:
+                    return Response(
+                        {'status': 'error', 'message': 'Room not found'},
+                        status=status.HTTP_404_NOT_FOUND
+                    )
+                # Takes the bed in the new room, then gives back the old one
+                try:
+                    beds.move_admission(admission.room, admission.status, room, admission.status)
+                except beds.RoomFull as e:
+                    return Response({'status': 'error', 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            else:
+                old_room = admission.room
+                if beds.holds_bed(admission.status):
+                    room = beds.reserve_bed(room_type)
+                    if room is not None and old_room is not None:
+                        beds.release_bed(old_room)
+                else:
+                    # No bed is taken until the patient is admitted
+                    room = beds.find_room(room_type)
+                if room is None:
+                    return Response(
+                        {'status': 'error', 'message': f'No free bed in {room_type} rooms'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
 
-        admission.save()
+            admission.room = room
+            admission.save()
 
         return Response({
             'status': 'success',
@@ -748,29 +874,85 @@ class AdmissionViewSet(viewsets.ModelViewSet):
         }, status=status.HTTP_200_OK)
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
-    queryset = Payment.objects.all()
+class PaymentViewSet(StreamingListMixin, DeltaSyncMixin, viewsets.ModelViewSet):
+    queryset = querysets.payments()
     serializer_class = PaymentSerializer
     permission_classes = [IsAdminUser]
 
 
-class PredictionRecordViewSet(viewsets.ModelViewSet):
-    queryset = PredictionRecord.objects.all()
+class PredictionRecordViewSet(StreamingListMixin, viewsets.ModelViewSet):
+    queryset = querysets.predictions()
     serializer_class = PredictionRecordSerializer
     permission_classes = [IsAdminDoctorOrNurse]
 
+    def get_queryset(self):
+        """
+        Filter predictions by patient, risk level, or latest per patient
+        Examples:
+        /api/predictions/?patient=1
+        /api/predictions/?risk_level=1
+        /api/predictions/?latest=true - only each patient's most recent prediction
+        """
+        queryset = querysets.predictions()
+
+        patient_id = self.request.query_params.get('patient', None)
+        if patient_id:
+            queryset = queryset.filter(patient_id=patient_id)
+
+        risk_level = self.request.query_params.get('risk_level', None)
+        if risk_level in ['0', '1']:
+            queryset = queryset.filter(risk_level=risk_level)
+
+        latest = self.request.query_params.get('latest', 'false')
+        if latest.lower() in ['true', '1']:
+            queryset = querysets.latest_predictions(queryset)
+
+        return queryset
+
 
 class ProcedureViewSet(viewsets.ModelViewSet):
     queryset = Procedure.objects.all()
     serializer_class = ProcedureSerializer
     permission_classes = [IsAdminOrReadOnly]
 
+    @cache_response(Procedure)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response(Procedure)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
 
 class RoomViewSet(viewsets.ModelViewSet):
     queryset = Room.objects.all()
     serializer_class = RoomSerializer
     permission_classes = [IsAdminDoctorOrNurse]
 
+    @cache_response(Room)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response(Room)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    def availability(self, request):
+        """
+        Free beds from the worker's bed index (bed_index.py), without reading the rooms table
+        GET /api/rooms/availability/ - occupancy per room type and the next room with a free bed
+        GET /api/rooms/availability/?room_type=ICU - free beds and the next free room of one type
+        """
+        room_type = request.query_params.get('room_type') or None
+        next_free = bed_index.next_free(room_type)
+        return Response({
+            'room_type': room_type,
+            'free_beds': bed_index.free_beds(room_type),
+            'next_free': next_free.as_dict() if next_free is not None else None,
+            'summary': bed_index.summary(),
+        })
+
     def get_queryset(self):
         """
         Filter rooms by availability
@@ -787,10 +969,12 @@ class RoomViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class ScheduleViewSet(viewsets.ModelViewSet):
-    queryset = Schedule.objects.all()
+class ScheduleViewSet(StreamingListMixin, ConditionalGetMixin, DeltaSyncMixin, viewsets.ModelViewSet):
+    queryset = querysets.schedules()
     serializer_class = ScheduleSerializer
     permission_classes = [IsAdminDoctorOrNurse]
+    # user_name, user_full_name and user_role come from the user row
+    conditional_related_models = (User,)
 
     def get_queryset(self):
         """
@@ -801,7 +985,7 @@ class ScheduleViewSet(viewsets.ModelViewSet):
         /api/schedules/?start_date=2025-10-01&end_date=2025-10-31
         /api/schedules/?is_available=true
         """
-        queryset = Schedule.objects.all()
+        queryset = querysets.schedules()
 
         # Filter by user (doctor or nurse)
         user_id = self.request.query_params.get('user', None)
@@ -874,22 +1058,53 @@ def login_user(request):
 # -------------------------------
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@single_flight()
 def dashboard_stats(request):
     """
     Return dashboard statistics
     """
-    stats = {
-        'total_patients': Patient.objects.count(),
-        'total_doctors': Doctor.objects.count(),
-        'total_nurses': Nurse.objects.count(),
-        'active_admissions': Admission.objects.filter(status='admitted').count(),
-        'today_appointments': Appointment.objects.filter(
-            appointment_date__date=timezone.now().date()
-        ).count(),
-        'total_payments': Payment.objects.count(),
-        'high_risk_patients': PredictionRecord.objects.filter(risk_level=1).values('patient').distinct().count(),
-    }
-    return JsonResponse(stats)
+    return JsonResponse(dashboards.hospital_stats())
+
+
+# -------------------------------
+# Role Dashboard endpoint
+# -------------------------------
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cache_response(
+    *dashboards.DEPENDENCIES, timeout=settings.DASHBOARD_CACHE_SECONDS,
+    vary=lambda request: (request.user.pk, timezone.localdate()),
+)
+def role_dashboard(request, role):
+    """
+    Every widget of a role dashboard for the signed-in user in one response
+    GET /api/dashboard/<admin|doctor|nurse|pharmacy>/?widgets=<name>,<name>
+    Returns {"role", "profile_id", "widgets": {...}, "timings_ms": {widget: ms}, "total_ms"},
+    plus "errors": {widget: message} when a widget failed (such responses are not cached)
+    """
+    if role not in dashboards.DASHBOARD_ROLES:
+        return Response(
+            {'error': f"Unknown dashboard '{role}'. Use one of: {', '.join(dashboards.DASHBOARD_ROLES)}"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    if not dashboards.can_view(request.user, role):
+        return Response({'error': f'The {role} dashboard is not available to your role'},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        names = dashboards.parse_widgets(role, request.query_params.get('widgets'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    profile = dashboards.get_profile(role, request.user)
+    if role in dashboards.PROFILE_MODELS and profile is None:
+        return Response({'error': f'No {role} profile found for this user'}, status=status.HTTP_404_NOT_FOUND)
+    payload = dashboards.build_dashboard(role, request.user, profile, names)
+    response = Response(payload)
+    if 'errors' in payload:
+        # Don't serve a partly failed dashboard from the cache (see cache_response)
+        response['Cache-Control'] = 'no-store'
+    return response
 
 
 # -------------------------------
@@ -897,40 +1112,275 @@ def dashboard_stats(request):
 # -------------------------------
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@single_flight()
 def patient_stats(request):
     """
     Return patient registry statistics
     """
-    # Get currently admitted patients
-    currently_admitted = Admission.objects.filter(
-        status='admitted'
-    ).values_list('patient_id', flat=True).distinct()
-
-    # Get high-risk patients (latest prediction)
-    high_risk_patients = PredictionRecord.objects.filter(
-        risk_level=1
-    ).values('patient').distinct().count()
-
-    # Get patients with recent predictions (last 30 days)
     from datetime import timedelta
+    from .stats_counters import read_counters
+
+    counters = read_counters([
+        'patients_active', 'patients_currently_admitted', 'patients_outpatients', 'patients_insured',
+        'patients_handicapped', 'patients_high_risk', 'patients_archived',
+    ])
+
+    # Patients with recent predictions (last 30 days) - a sliding window, so counted
     thirty_days_ago = timezone.now() - timedelta(days=30)
     recent_predictions = PredictionRecord.objects.filter(
         prediction_date__gte=thirty_days_ago
     ).values('patient').distinct().count()
 
     stats = {
-        'total_patients': Patient.objects.filter(is_archived=False).count(),
-        'currently_admitted': len(currently_admitted),
-        'outpatients': Patient.objects.filter(is_archived=False).exclude(id__in=currently_admitted).count(),
-        'insured_patients': Patient.objects.filter(is_archived=False, insurance_status=True).count(),
-        'handicapped_patients': Patient.objects.filter(is_archived=False, handicapped=True).count(),
-        'high_risk_patients': high_risk_patients,
+        'total_patients': counters['patients_active'],
+        'currently_admitted': counters['patients_currently_admitted'],
+        'outpatients': counters['patients_outpatients'],
+        'insured_patients': counters['patients_insured'],
+        'handicapped_patients': counters['patients_handicapped'],
+        'high_risk_patients': counters['patients_high_risk'],
         'recent_predictions': recent_predictions,
-        'archived_patients': Patient.objects.filter(is_archived=True).count(),
+        'archived_patients': counters['patients_archived'],
     }
     return JsonResponse(stats)
 
 
+# -------------------------------
+# Response Cache Stats endpoint
+# -------------------------------
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def response_cache_stats(request):
+    """
+    Hit/miss counts of the response cache and coalesced request counts
+    for this worker process
+    GET /api/cache-stats/
+    """
+    from django.conf import settings
+    from .response_cache import cache_stats
+    from .single_flight import single_flight_stats
+
+    return Response({
+        'backend': settings.CACHES['default']['BACKEND'],
+        'views': cache_stats(),
+        'single_flight': single_flight_stats(),
+    })
+
+
+# -------------------------------
+# Slow Query Log endpoint
+# -------------------------------
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def slow_query_log(request):
+    """
+    Slow queries captured by this worker, grouped by SQL fingerprint
+    GET /api/slow-queries/?limit=20&order=total|max|count
+    GET /api/slow-queries/?recent=true - individual captures, newest first
+    DELETE /api/slow-queries/ - clear the buffer
+    """
+    from django.conf import settings
+    from . import slow_queries
+
+    if request.method == 'DELETE':
+        slow_queries.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    try:
+        limit = int(request.query_params.get('limit', 20))
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    order = request.query_params.get('order', 'total')
+    if order not in ('total', 'max', 'count'):
+        return Response({'error': 'order must be total, max or count'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.query_params.get('recent', 'false').lower() in ['true', '1']:
+        results = slow_queries.recent(limit)
+    else:
+        results = slow_queries.top_offenders(limit, order)
+    return Response({
+        'threshold_ms': settings.SLOW_QUERY_THRESHOLD_MS,
+        'results': results,
+    })
+
+
+# -------------------------------
+# Request Profiles endpoints
+# -------------------------------
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def request_profiles(request):
+    """
+    Saved request profiles, newest first
+    GET /api/profiles/
+    Profile any request by sending it as an admin with "X-Profile: 1" or ?profile=1
+    """
+    from .profiling import list_profiles
+    return Response({'profiles': list_profiles()})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def request_profile_detail(request, profile_id):
+    """
+    Top functions of one saved profile
+    GET /api/profiles/<profile_id>/
+    GET /api/profiles/<profile_id>/?download=true - the raw cProfile file (pstats, snakeviz)
+    """
+    from django.http import FileResponse
+    from .profiling import profile_path, read_profile
+
+    if request.query_params.get('download', 'false').lower() in ['true', '1']:
+        path = profile_path(profile_id)
+        if path is None:
+            return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=f'{profile_id}.prof')
+
+    summary = read_profile(profile_id)
+    if summary is None:
+        return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'id': profile_id, 'summary': summary})
+
+
+# -------------------------------
+# Batch endpoint
+# -------------------------------
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def batch_requests(request):
+    """
+    Run several API calls in one round trip
+    POST /api/batch/
+    Body: {"requests": [{"id": "rooms", "method": "GET", "path": "/api/rooms/"}, ...], "parallel": true}
+    Returns {"responses": [{"id", "status", "body"}, ...]} in request order; with
+    parallel, consecutive GETs run concurrently and writes run alone, in order
+    """
+    from django.http import HttpResponse
+    from .batch import encode_results, parse_requests, run_batch
+
+    try:
+        subs = parse_requests(request.data)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    parallel = str(request.data.get('parallel', 'false')).lower() in ['true', '1']
+    results = run_batch(request, subs, parallel=parallel)
+    return HttpResponse(encode_results(subs, results), content_type='application/json')
+
+
+# -------------------------------
+# Rollup Reports endpoint
+# -------------------------------
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def rollup_report(request, metric):
+    """
+    Time series read from the daily rollup tables
+    GET /api/rollups/<admissions|occupancy|appointments|revenue>/
+        ?start_date=YYYY-MM-DD&end_date=YYYY-MM-DD (inclusive, default last 30 days)
+        &interval=day|week|month
+        &group_by=true (split by room_type / doctor / method)
+        &room_type=ICU | &doctor=1 | &method=Cash
+    """
+    from datetime import timedelta
+    from django.utils.dateparse import parse_date
+    from .rollups import REPORTS, report
+
+    if metric not in REPORTS:
+        return JsonResponse({'error': f"Unknown report '{metric}'. Use one of: {', '.join(REPORTS)}"}, status=404)
+
+    today = timezone.localdate()
+    dates = {'start_date': today - timedelta(days=29), 'end_date': today}
+    for param in dates:
+        value = request.query_params.get(param)
+        if value:
+            dates[param] = parse_date(value)
+            if dates[param] is None:
+                return JsonResponse({'error': f"Invalid {param} '{value}', use YYYY-MM-DD"}, status=400)
+
+    interval = request.query_params.get('interval', 'day')
+    group_by = request.query_params.get('group_by', '').lower() in ['true', '1']
+    dimension = REPORTS[metric]['dimension']
+    try:
+        results = report(
+            metric, dates['start_date'], dates['end_date'], interval=interval, group_by=group_by,
+            dimension_value=request.query_params.get(dimension),
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return Response({
+        'metric': metric,
+        'interval': interval,
+        'start_date': dates['start_date'],
+        'end_date': dates['end_date'],
+        'results': results,
+    })
+
+
+# -------------------------------
+# Streaming Data Export endpoint
+# -------------------------------
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_data(request, resource):
+    """
+    Stream a full table export as CSV or NDJSON
+    GET /api/exports/<patients|admissions|appointments|payments>/?file_format=csv
+    Optional filters: start_date, end_date (YYYY-MM-DD) plus per-table filters
+    such as status, patient, doctor, payment_type, archived
+    """
+    from django.http import StreamingHttpResponse
+    from .exports import stream_export
+
+    file_format = request.query_params.get('file_format', 'csv').lower()
+    try:
+        content, content_type = stream_export(resource, file_format, request.query_params)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    extension = 'csv' if file_format == 'csv' else 'ndjson'
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{resource}.{extension}"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_prediction_features(request):
+    """
+    Export prediction records with the 70 model features and admission outcomes
+    GET /api/analytics/predictions/?file_format=parquet|arrow&start_date=YYYY-MM-DD&end_date=YYYY-MM-DD
+    Returns a single Parquet or Arrow IPC file (end_date is exclusive)
+    """
+    import tempfile
+    from django.http import FileResponse
+    from django.utils.dateparse import parse_date
+    from .columnar_export import FORMATS, prediction_queryset, write_file
+
+    file_format = request.query_params.get('file_format', 'parquet').lower()
+    if file_format not in FORMATS:
+        return JsonResponse({'error': f"Unsupported format '{file_format}'. Use one of: {', '.join(FORMATS)}"}, status=400)
+
+    dates = {}
+    for param in ('start_date', 'end_date'):
+        value = request.query_params.get(param)
+        if value:
+            dates[param] = parse_date(value)
+            if dates[param] is None:
+                return JsonResponse({'error': f"Invalid {param} '{value}', use YYYY-MM-DD"}, status=400)
+
+    output = tempfile.TemporaryFile()
+    try:
+        write_file(output, prediction_queryset(**dates), file_format)
+    except RuntimeError as e:
+        output.close()
+        return JsonResponse({'error': str(e)}, status=500)
+    output.seek(0)
+
+    extension = 'parquet' if file_format == 'parquet' else 'arrow'
+    return FileResponse(output, as_attachment=True, filename=f'predictions.{extension}')
+
+
 # -------------------------------
 # Payment Calculation endpoint
 # -------------------------------
@@ -984,12 +1434,13 @@ def create_payment_with_calculation(request):
                 procedures = admission.procedures.all()
 
             # Calculate payment
-            calc = calculate_payment(
-                patient=patient,
-                payment_type='inpatient',
-                admission=admission,
-                selected_procedures=procedures
-            )
+            with metrics.stage('payment_calculation'):
+                calc = calculate_payment(
+                    patient=patient,
+                    payment_type='inpatient',
+                    admission=admission,
+                    selected_procedures=procedures
+                )
 
             # Create payment record
             payment = Payment.objects.create(
@@ -1021,12 +1472,13 @@ def create_payment_with_calculation(request):
                 procedures = list(appointment_procedures)
 
             # Calculate payment
-            calc = calculate_payment(
-                patient=patient,
-                payment_type='outpatient',
-                appointments=appointments,
-                selected_procedures=procedures
-            )
+            with metrics.stage('payment_calculation'):
+                calc = calculate_payment(
+                    patient=patient,
+                    payment_type='outpatient',
+                    appointments=appointments,
+                    selected_procedures=procedures
+                )
 
             # Create payment record
             payment = Payment.objects.create(
@@ -1085,6 +1537,7 @@ def predict_patient(request, patient_id):
     """
     try:
         from .ml_model import predict_readmission
+        from .features import patient_feature_row
         import pandas as pd
         import numpy as np
         
@@ -1096,84 +1549,14 @@ def predict_patient(request, patient_id):
         predicted_by = User.objects.get(id=user_id) if user_id else None
         
         # Build feature dictionary in EXACT order as training model (70 features)
-        patient_data = {
-            'num_lab_procedures': [patient.num_lab_procedures or 0],
-            'num_medications': [patient.num_medications or 0],
-            'time_in_hospital': [patient.time_in_hospital or 0],
-            'number_inpatient': [patient.number_inpatient or 0],
-            'num_procedures': [patient.num_procedures or 0],
-            'discharge_disposition_id': [patient.discharge_disposition_id or 0],
-            'number_diagnoses': [patient.number_diagnoses or 0],
-            'admission_type_id': [patient.admission_type_id or 0],
-            'admission_source_id': [patient.admission_source_id or 0],
-            'gender_Male': [int(patient.gender_Male)],
-            'number_outpatient': [patient.number_outpatient or 0],
-            'number_emergency': [patient.number_emergency or 0],
-            'race_Caucasian': [int(patient.race_Caucasian)],
-            'age_[70-80)': [int(patient.age_70_80)],
-            'age_[60-70)': [int(patient.age_60_70)],
-            'insulin_Steady': [int(patient.insulin_Steady)],
-            'change_No': [int(patient.change_No)],
-            'age_[80-90)': [int(patient.age_80_90)],
-            'insulin_No': [int(patient.insulin_No)],
-            'age_[50-60)': [int(patient.age_50_60)],
-            'metformin_Steady': [int(patient.metformin_Steady)],
-            'metformin_No': [int(patient.metformin_No)],
-            'diabetesMed_Yes': [int(patient.diabetesMed_Yes)],
-            'glipizide_No': [int(patient.glipizide_No)],
-            'age_[40-50)': [int(patient.age_40_50)],
-            'insulin_Up': [int(patient.insulin_Up)],
-            'diag_2_276': [int(patient.diag_2_276)],
-            'A1Cresult_>8': [int(patient.A1Cresult_gt8)],
-            'glyburide_No': [int(patient.glyburide_No)],
-            'glipizide_Steady': [int(patient.glipizide_Steady)],
-            'diag_3_250': [int(patient.diag_3_250)],
-            'diag_1_428': [int(patient.diag_1_428)],
-            'diag_2_428': [int(patient.diag_2_428)],
-            'glyburide_Steady': [int(patient.glyburide_Steady)],
-            'diag_3_276': [int(patient.diag_3_276)],
-            'diag_2_427': [int(patient.diag_2_427)],
-            'diag_3_428': [int(patient.diag_3_428)],
-            'diag_3_401': [int(patient.diag_3_401)],
-            'diag_3_427': [int(patient.diag_3_427)],
-            'A1Cresult_Norm': [int(patient.A1Cresult_Norm)],
-            'pioglitazone_No': [int(patient.pioglitazone_No)],
-            'pioglitazone_Steady': [int(patient.pioglitazone_Steady)],
-            'rosiglitazone_No': [int(patient.rosiglitazone_No)],
-            'diag_1_414': [int(patient.diag_1_414)],
-            'rosiglitazone_Steady': [int(patient.rosiglitazone_Steady)],
-            'diag_2_496': [int(patient.diag_2_496)],
-            'diag_3_414': [int(patient.diag_3_414)],
-            'diag_3_496': [int(patient.diag_3_496)],
-            'diag_2_599': [int(patient.diag_2_599)],
-            'age_[30-40)': [int(patient.age_30_40)],
-            'diag_1_410': [int(patient.diag_1_410)],
-            'diag_2_403': [int(patient.diag_2_403)],
-            'glimepiride_No': [int(patient.glimepiride_No)],
-            'diag_2_250': [int(patient.diag_2_250)],
-            'diag_1_486': [int(patient.diag_1_486)],
-            'diag_3_585': [int(patient.diag_3_585)],
-            'glimepiride_Steady': [int(patient.glimepiride_Steady)],
-            'diag_3_403': [int(patient.diag_3_403)],
-            'age_[90-100)': [int(patient.age_90_100)],
-            'diag_1_786': [int(patient.diag_1_786)],
-            'diag_3_599': [int(patient.diag_3_599)],
-            'diag_1_491': [int(patient.diag_1_491)],
-            'diag_1_427': [int(patient.diag_1_427)],
-            'diag_2_707': [int(patient.diag_2_707)],
-            'diag_1_276': [int(patient.diag_1_276)],
-            'diag_2_411': [int(patient.diag_2_411)],
-            'diag_1_584': [int(patient.diag_1_584)],
-            'diag_2_585': [int(patient.diag_2_585)],
-            'max_glu_serum_Norm': [int(patient.max_glu_serum_Norm)],
-            'diag_2_425': [int(patient.diag_2_425)],
-        }
+        patient_data = patient_feature_row(patient)
 
         # Create DataFrame with columns in correct order
         features_df = pd.DataFrame(patient_data)
         
         # Get prediction
-        risk = predict_readmission(features_df)
+        with metrics.stage('ml'):
+            risk = predict_readmission(features_df)
         
         # Convert numpy types to Python native types
         if isinstance(risk, np.generic):
@@ -1204,10 +1587,12 @@ def predict_patient(request, patient_id):
 # -------------------------------
 # Pharmacy Module ViewSets
 # -------------------------------
-class PharmacyStaffViewSet(viewsets.ModelViewSet):
-    queryset = PharmacyStaff.objects.all()
+class PharmacyStaffViewSet(BulkActionsMixin, viewsets.ModelViewSet):
+    queryset = querysets.pharmacy_staff()
     serializer_class = PharmacyStaffSerializer
     permission_classes = [IsAdminOrReadOnly]
+    bulk_filter_fields = {'shift': 'shift'}
+    bulk_update_fields = ('shift',)
 
     def create(self, request, *args, **kwargs):
         """
@@ -1300,8 +1685,8 @@ class PharmacyStaffViewSet(viewsets.ModelViewSet):
         """Filter out archived pharmacy staff by default, unless archived=true parameter"""
         show_archived = self.request.query_params.get('archived', 'false')
         if show_archived.lower() in ['true', '1']:
-            return PharmacyStaff.objects.filter(is_archived=True)
-        return PharmacyStaff.objects.filter(is_archived=False)
+            return querysets.pharmacy_staff().filter(is_archived=True)
+        return querysets.pharmacy_staff().filter(is_archived=False)
 
     @action(detail=True, methods=['post'])
     def archive(self, request, pk=None):
@@ -1333,11 +1718,19 @@ class PharmacyStaffViewSet(viewsets.ModelViewSet):
         }, status=status.HTTP_200_OK)
 
 
-class MedicineViewSet(viewsets.ModelViewSet):
+class MedicineViewSet(StreamingListMixin, ConditionalGetMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = Medicine.objects.all()
     serializer_class = MedicineSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    @cache_response(Medicine)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response(Medicine)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def get_queryset(self):
         """
         Allow filtering by category, active status, and low stock
@@ -1370,11 +1763,17 @@ class MedicineViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class PrescriptionViewSet(viewsets.ModelViewSet):
-    queryset = Prescription.objects.all()
+class PrescriptionViewSet(StreamingListMixin, DeltaSyncMixin, viewsets.ModelViewSet):
+    queryset = querysets.prescriptions()
     serializer_class = PrescriptionSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_serializer_class(self):
+        # ?compact=true: items carry only medicine name and price
+        if self.request.method == 'GET':
+            return _prescription_serializer_class(self.request)
+        return super().get_serializer_class()
+
     def get_queryset(self):
         """
         Allow filtering by patient, doctor, status, and date
@@ -1384,7 +1783,7 @@ class PrescriptionViewSet(viewsets.ModelViewSet):
         /api/prescriptions/?status=pending
         /api/prescriptions/?date=2025-10-13
         """
-        queryset = Prescription.objects.all()
+        queryset = querysets.prescriptions()
 
         # Filter by patient
         patient_id = self.request.query_params.get('patient', None)
@@ -1409,8 +1808,8 @@ class PrescriptionViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class PrescriptionItemViewSet(viewsets.ModelViewSet):
-    queryset = PrescriptionItem.objects.all()
+class PrescriptionItemViewSet(StreamingListMixin, viewsets.ModelViewSet):
+    queryset = querysets.prescription_items()
     serializer_class = PrescriptionItemSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -1544,23 +1943,31 @@ def dispense_prescription_item(request, item_id):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def _prescription_serializer_class(request):
+    compact = request.query_params.get('compact', 'false')
+    return PrescriptionCompactSerializer if compact.lower() in ['true', '1'] else PrescriptionSerializer
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def pending_prescriptions(request):
     """
     Get all pending prescriptions for pharmacy
     GET /api/prescriptions/pending/
+    GET /api/prescriptions/pending/?compact=true - items carry only medicine name and price
     """
     try:
-        prescriptions = Prescription.objects.filter(
+        prescriptions = querysets.prescriptions().filter(
             status__in=['pending', 'partially_dispensed']
         ).order_by('-prescribed_date')
 
-        serializer = PrescriptionSerializer(prescriptions, many=True)
+        # Same output as the prescription serializers, read straight from .values()
+        compact = _prescription_serializer_class(request) is PrescriptionCompactSerializer
+        data = (projections.PRESCRIPTIONS_COMPACT if compact else projections.PRESCRIPTIONS).serialize(prescriptions)
         return JsonResponse({
             'success': True,
-            'count': prescriptions.count(),
-            'prescriptions': serializer.data
+            'count': len(data),
+            'prescriptions': data
         })
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
@@ -1572,17 +1979,18 @@ def patient_prescription_history(request, patient_id):
     """
     Get prescription history for a patient
     GET /api/patients/<patient_id>/prescriptions/
+    GET /api/patients/<patient_id>/prescriptions/?compact=true - items carry only medicine name and price
     """
     try:
         patient = Patient.objects.get(id=patient_id)
-        prescriptions = Prescription.objects.filter(patient=patient).order_by('-prescribed_date')
+        prescriptions = querysets.prescriptions().filter(patient=patient).order_by('-prescribed_date')
 
-        serializer = PrescriptionSerializer(prescriptions, many=True)
+        data = _prescription_serializer_class(request)(prescriptions, many=True).data
         return JsonResponse({
             'success': True,
             'patient': patient.name,
-            'count': prescriptions.count(),
-            'prescriptions': serializer.data
+            'count': len(data),
+            'prescriptions': data
         })
     except Patient.DoesNotExist:
         return JsonResponse({'error': 'Patient not found'}, status=404)
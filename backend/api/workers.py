@@ -0,0 +1,43 @@
+"""
+Process-wide thread pools for independent database reads.
+
+    results = workers.map_in_pool('dashboard', 4, build_widget, widgets)
+
+Pools are created on first use and kept for the life of the process, so
+their threads keep their own database connections between requests (see
+CONN_MAX_AGE) instead of connecting for every request. Each task is wrapped
+like a request: connections that are broken or past their age are closed
+before and after it.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+
+_lock = threading.Lock()
+_pools = {}
+
+
+def get_pool(name, max_workers):
+    with _lock:
+        pool = _pools.get((name, max_workers))
+        if pool is None:
+            pool = _pools[(name, max_workers)] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=name
+            )
+        return pool
+
+
+def _run(func, args):
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+def map_in_pool(name, max_workers, func, items):
+    """[func(*item) for item in items], run on the named pool; results keep the order of items"""
+    pool = get_pool(name, max_workers)
+    futures = [pool.submit(_run, func, item) for item in items]
+    return [future.result() for future in futures]
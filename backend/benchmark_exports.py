@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Benchmark for the streaming exports (api/exports.py).
+
+Seeds benchmark patients until the table holds at least --rows rows, then
+consumes the export stream and prints resident memory every --every rows.
+RSS should stay flat for the whole run.
+
+Usage:
+    python benchmark_exports.py --rows 1000000 --format csv
+    python benchmark_exports.py --cleanup
+"""
+import argparse
+import os
+import resource
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from api.models import Patient
+from api.exports import stream_export
+
+BENCH_PREFIX = 'Export Bench'
+SEED_BATCH = 5000
+
+
+def current_rss_mb():
+    """Current resident set size in MB (falls back to peak RSS off Linux)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def seed(rows):
+    existing = Patient.objects.count()
+    missing = rows - existing
+    if missing <= 0:
+        print(f"Table already has {existing} patients, no seeding needed")
+        return
+
+    print(f"Seeding {missing} benchmark patients...")
+    created = 0
+    while created < missing:
+        size = min(SEED_BATCH, missing - created)
+        Patient.objects.bulk_create([
+            Patient(
+                name=f"{BENCH_PREFIX} {created + i}",
+                age=20 + (created + i) % 80,
+                gender='male' if i % 2 else 'female',
+                contact=f"07{created + i:09d}",
+            )
+            for i in range(size)
+        ])
+        created += size
+        if created % 100000 < SEED_BATCH:
+            print(f"  {created}/{missing}")
+
+
+def run(file_format, every):
+    content, _ = stream_export('patients', file_format, {})
+
+    start = time.perf_counter()
+    start_rss = current_rss_mb()
+    rows = 0
+    total_bytes = 0
+    next_report = every
+
+    print(f"{'rows':>10} {'rss_mb':>8} {'elapsed_s':>10}")
+    print(f"{0:>10} {start_rss:>8.1f} {0:>10.2f}")
+
+    for chunk in content:
+        total_bytes += len(chunk)
+        rows += chunk.count('\n')
+        if rows >= next_report:
+            print(f"{rows:>10} {current_rss_mb():>8.1f} {time.perf_counter() - start:>10.2f}")
+            next_report += every
+
+    elapsed = time.perf_counter() - start
+    print(f"\nExported {rows} lines ({total_bytes / 1024 / 1024:.1f} MB) in {elapsed:.2f}s")
+    print(f"RSS start {start_rss:.1f} MB, end {current_rss_mb():.1f} MB")
+
+
+def cleanup():
+    deleted, _ = Patient.objects.filter(name__startswith=BENCH_PREFIX).delete()
+    print(f"Deleted {deleted} benchmark rows")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv')
+    parser.add_argument('--every', type=int, default=100000)
+    parser.add_argument('--cleanup', action='store_true', help='Delete benchmark rows and exit')
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+    else:
+        seed(args.rows)
+        run(args.format, args.every)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Benchmark for the JSON encoders (api/renderers.py).
+
+Builds two payloads of --rows rows each:
+- "drf": serializer output (strings, ints, nested lists), as DRF viewsets render
+- "raw": Python values (Decimal money, timezone-aware datetimes, dates), as the
+  JsonResponse function views build them
+
+Each payload is encoded with the stdlib path (DRF JSONRenderer / Django
+JsonResponse) and with the fast path. The script reports the best time of
+--repeat runs and checks that both paths decode to the same data.
+
+Usage:
+    python benchmark_json.py
+    python benchmark_json.py --rows 10000 --repeat 10
+"""
+import argparse
+import json
+import os
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.http import JsonResponse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer, FastJsonResponse, backend
+
+
+def drf_payload(rows):
+    """Shaped like AppointmentSerializer/PrescriptionSerializer output"""
+    now = timezone.localtime()
+    return [
+        {
+            'id': i,
+            'patient': i % 500,
+            'patient_name': f'Patient {i % 500} é',
+            'doctor': i % 40,
+            'doctor_name': f'dr_{i % 40}',
+            'appointment_date': (now - timedelta(minutes=i)).isoformat(),
+            'status': ('scheduled', 'completed', 'cancelled')[i % 3],
+            'reason': 'Follow-up visit',
+            'procedures': [i % 7, i % 11],
+            'total_cost': f'{(i % 300) * 1.25:.2f}',
+            'is_archived': False,
+        }
+        for i in range(rows)
+    ]
+
+
+def raw_payload(rows):
+    """Shaped like the dicts the JsonResponse views assemble"""
+    now = timezone.now()
+    return {
+        'success': True,
+        'count': rows,
+        'payments': [
+            {
+                'id': i,
+                'patient': f'Patient {i % 500}',
+                'amount': Decimal(i % 300) * Decimal('1.25'),
+                'paid_at': now - timedelta(minutes=i),
+                'due': (now - timedelta(days=i % 30)).date(),
+                'procedures': [i % 7, i % 11],
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+def best_of(repeat, func):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def compare(label, repeat, slow, fast):
+    slow_time, slow_bytes = best_of(repeat, slow)
+    fast_time, fast_bytes = best_of(repeat, fast)
+    same = json.loads(slow_bytes) == json.loads(fast_bytes)
+    print(f'{label:<28} stdlib {slow_time * 1000:8.1f} ms   fast {fast_time * 1000:8.1f} ms   '
+          f'x{slow_time / fast_time:5.1f}   {len(fast_bytes) / 1024:8.0f} KiB   {"same" if same else "DIFFERENT"}')
+    return same
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'Fast path backend: {backend()}, {args.rows} rows, best of {args.repeat}\n')
+    drf_rows, raw = drf_payload(args.rows), raw_payload(args.rows)
+    results = [
+        compare('DRF renderer (serialized)', args.repeat,
+                lambda: JSONRenderer().render(drf_rows), lambda: FastJSONRenderer().render(drf_rows)),
+        compare('JsonResponse (Decimal/dt)', args.repeat,
+                lambda: JsonResponse(raw).content, lambda: FastJsonResponse(raw).content),
+    ]
+    if not all(results):
+        raise SystemExit('Fast and stdlib output differ')
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Benchmark for streamed list responses (?stream=1, api/streaming.py).
+
+Seeds --rows rows per resource, then requests each list endpoint twice: once
+normally and once with ?stream=1. For each request it reports the
+time-to-first-byte, the total time and the peak Python memory (tracemalloc)
+while the body is produced (streamed chunks are spooled to a temporary file,
+as a client would receive them). It also checks that both bodies decode to the
+same list. Everything runs inside a transaction that is rolled back. Exits
+with status 1 if any streamed body differs.
+
+Usage:
+    python benchmark_streaming.py
+    python benchmark_streaming.py --rows 5000 --gzip
+"""
+import argparse
+import gzip
+import json
+import tempfile
+import time
+import tracemalloc
+
+from check_query_budget import Rollback  # sets up Django
+
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from api.models import User
+from api.sample_data import seed
+
+ENDPOINTS = [
+    '/api/patients/',
+    '/api/appointments/',
+    '/api/admissions/',
+    '/api/payments/',
+    '/api/prescriptions/',
+]
+
+
+def fetch(client, url, headers):
+    """(first byte seconds, total seconds, peak bytes, body bytes)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(url, **headers)
+    if response.streaming:
+        # Spool chunks to disk as a client would send them on, so that only
+        # the server's working memory is measured
+        spool = tempfile.TemporaryFile()
+        content = iter(response.streaming_content)
+        spool.write(next(content))
+        first_byte = time.perf_counter() - start
+        for chunk in content:
+            spool.write(chunk)
+    else:
+        # The whole body is built before anything can be sent
+        body = response.content
+        first_byte = time.perf_counter() - start
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if response.streaming:
+        spool.seek(0)
+        body = spool.read()
+        spool.close()
+    if response.get('Content-Encoding') == 'gzip':
+        body = gzip.decompress(body)
+    return first_byte, total, peak, body
+
+
+def run(rows, use_gzip):
+    admin = User.objects.create(username='bstream_admin', role='admin', is_staff=True, is_superuser=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    for round_number in range(1, 11):
+        seed(rows // 10, round_number)
+
+    headers = {'HTTP_ACCEPT_ENCODING': 'gzip'} if use_gzip else {}
+    same = True
+    print(f"{'endpoint':<22} {'mode':<8} {'first byte':>11} {'total':>10} {'peak memory':>12}")
+    for url in ENDPOINTS:
+        results = {}
+        for mode, query in (('list', ''), ('stream', '?stream=1')):
+            first_byte, total, peak, body = fetch(client, url + query, headers)
+            results[mode] = json.loads(body)
+            print(f'{url:<22} {mode:<8} {first_byte * 1000:>8.1f} ms {total * 1000:>7.1f} ms '
+                  f'{peak / 1024 / 1024:>9.1f} MiB')
+        if results['list'] != results['stream']:
+            same = False
+            print(f'{url}: streamed body DIFFERS')
+    return same
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000, help='rows per resource')
+    parser.add_argument('--gzip', action='store_true', help='send Accept-Encoding: gzip')
+    args = parser.parse_args()
+
+    same = False
+    with override_settings(
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        ALLOWED_HOSTS=['testserver'],
+        DEBUG=False,  # connection.queries would keep every statement
+    ):
+        try:
+            with transaction.atomic():
+                same = run(args.rows, args.gzip)
+                raise Rollback
+        except Rollback:
+            pass
+    if not same:
+        raise SystemExit('Streamed and normal list bodies differ')
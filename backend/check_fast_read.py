@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Parity check and benchmark for the serializer-free read path (api/projections.py).
+
+Seeds --rows rows per resource, including rows with NULL relations. Then,
+for each hot endpoint, it renders the list through the DRF serializer and
+through its Projection, requires the two outputs to be byte-identical, and
+times both. Everything runs inside a transaction that is rolled back. Exits
+with status 1 if any output differs. The parity itself is also asserted by
+api/tests.py, which python manage.py test runs.
+
+Usage:
+    python check_fast_read.py
+    python check_fast_read.py --rows 2000 --repeat 5
+"""
+import argparse
+import time
+
+from check_query_budget import Rollback  # sets up Django
+
+from django.db import transaction
+
+from api.renderers import FastJSONRenderer
+from api.sample_data import null_relations, projection_cases, seed
+
+
+def best_of(repeat, func):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(rows, repeat):
+    seed(rows, 1)
+    null_relations()
+
+    renderer = FastJSONRenderer()
+    identical = True
+    print(f"{'endpoint':<32} {'rows':>6} {'serializer':>12} {'projection':>12} {'speedup':>8}")
+    for label, queryset, serializer_class, projection in projection_cases():
+        slow_time, slow = best_of(repeat, lambda: renderer.render(serializer_class(queryset.all(), many=True).data))
+        fast_time, fast = best_of(repeat, lambda: renderer.render(projection.serialize(queryset.all())))
+        same = slow == fast
+        identical &= same
+        print(f'{label:<32} {queryset.count():>6} {slow_time * 1000:>9.1f} ms {fast_time * 1000:>9.1f} ms '
+              f'{slow_time / fast_time:>7.1f}x  {"identical" if same else "DIFFERENT"}')
+    return identical
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    identical = False
+    try:
+        with transaction.atomic():
+            identical = run(args.rows, args.repeat)
+            raise Rollback
+    except Rollback:
+        pass
+    if not identical:
+        raise SystemExit('Projection output differs from the serializer')
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Query-budget check for the list endpoints.
+
+Seeds N rows of every resource, counts the SQL queries each GET endpoint
+makes, grows the data to 10N and counts again. Every endpoint must make the
+same number of queries at both sizes; an N+1 (a query per row) shows up as a
+difference. Everything runs inside a transaction that is rolled back, so the
+database is left untouched. Exits with status 1 if any endpoint fails.
+The exact per-endpoint budgets are asserted in api/tests.py.
+
+Usage:
+    python check_query_budget.py
+    python check_query_budget.py --rows 20 --verbose
+"""
+import argparse
+import os
+import sys
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from api.models import User
+from api.sample_data import PREFIX, seed
+from api.stats_counters import reconcile_counters
+
+ENDPOINTS = [
+    '/api/users/',
+    '/api/patients/',
+    '/api/doctors/',
+    '/api/nurses/',
+    '/api/pharmacy-staff/',
+    '/api/appointments/',
+    '/api/appointments/active/',
+    '/api/admissions/',
+    '/api/payments/',
+    '/api/predictions/',
+    '/api/procedures/',
+    '/api/rooms/',
+    '/api/rooms/availability/',
+    '/api/schedules/',
+    '/api/schedules/weekly/?start_date=2030-01-01',
+    '/api/shift-swaps/',
+    '/api/unavailability-requests/',
+    '/api/medicines/',
+    '/api/prescriptions/',
+    '/api/prescriptions/pending/',
+    '/api/prescriptions/pending/?compact=true',
+    '/api/prescription-items/',
+    '/api/dashboard/admin/',
+]
+# Requested as the first seeded user with that role
+ROLE_ENDPOINTS = [
+    ('doctor', '/api/dashboard/doctor/'),
+    ('nurse', '/api/dashboard/nurse/'),
+    ('pharmacy_staff', '/api/dashboard/pharmacy/'),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+def measure(clients):
+    counts = {}
+    for role, url in [('admin', url) for url in ENDPOINTS] + ROLE_ENDPOINTS:
+        with CaptureQueriesContext(connection) as queries:
+            response = clients[role].get(url)
+        if response.status_code != 200:
+            raise SystemExit(f'{url} returned {response.status_code}')
+        counts[url] = len(queries)
+    return counts
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def run(rows, verbose):
+    # On a fresh database the first read_counters() call counts and stores the
+    # missing dashboard counters; store them up front so that only the steady
+    # state is measured (the save hooks keep them current while seeding)
+    reconcile_counters()
+    admin = User.objects.create(username=f'{PREFIX}_admin', role='admin', is_staff=True, is_superuser=True)
+
+    seed(rows, 1)
+    clients = {'admin': client_for(admin)}
+    for role, _ in ROLE_ENDPOINTS:
+        clients[role] = client_for(User.objects.get(username=f'{PREFIX}1_{role}_0'))
+    small = measure(clients)
+    for round_number in range(2, 11):
+        seed(rows, round_number)
+    large = measure(clients)
+
+    failed = []
+    print(f"{'endpoint':<48} {rows:>6} rows {rows * 10:>6} rows")
+    for url in small:
+        ok = small[url] == large[url]
+        if not ok:
+            failed.append(url)
+        if verbose or not ok:
+            print(f"{url:<48} {small[url]:>11} {large[url]:>11}  {'ok' if ok else 'GROWS WITH ROWS'}")
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10, help='N (rows per resource in the small run)')
+    parser.add_argument('--verbose', action='store_true', help='Print every endpoint, not only failures')
+    args = parser.parse_args()
+
+    failed = []
+    # The response cache would hide the queries being counted, dashboard
+    # widgets on pool threads would neither be counted nor see the seeded rows,
+    # and the bed index only follows committed changes unless it reloads
+    with override_settings(
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        ALLOWED_HOSTS=['testserver'],
+        DASHBOARD_WORKERS=1,
+        BED_INDEX_RECONCILE_SECONDS=0,
+    ):
+        try:
+            with transaction.atomic():
+                failed = run(args.rows, args.verbose)
+                raise Rollback
+        except Rollback:
+            pass
+
+    if failed:
+        print(f'\n{len(failed)} endpoint(s) exceed their query budget')
+        sys.exit(1)
+    print(f'\nAll {len(ENDPOINTS) + len(ROLE_ENDPOINTS)} endpoints keep a constant query count')
@@ -2,6 +2,9 @@
 ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP goes to Django; WebSocket connections to /ws/events/ get the live
+dashboard push channel (api/realtime.py). Run with an ASGI server, e.g.
+``uvicorn core.asgi:application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -13,4 +16,16 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from api.realtime import websocket_application  # noqa: E402  (needs the app registry loaded)
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        if scope['path'].rstrip('/') == '/ws/events':
+            await websocket_application(scope, receive, send)
+        else:
+            await send({'type': 'websocket.close', 'code': 4404})
+        return
+    await django_application(scope, receive, send)
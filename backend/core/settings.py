@@ -35,11 +35,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Moved to top
+    'api.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.profiling.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -71,6 +73,78 @@ DATABASES = {
     )
 }
 
+# -------------------------
+# Cache (response cache, see api/response_cache.py)
+# CACHE_URL: locmem:// (default, per process), file:///var/tmp/hms-cache,
+# or redis://localhost:6379/0 (any Redis-compatible server, needs `pip install redis`)
+# -------------------------
+def _cache_config(url):
+    scheme, _, location = url.partition('://')
+    if scheme == 'file':
+        return {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+    if scheme in ('redis', 'rediss'):
+        return {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': url}
+    return {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': location or 'hms'}
+
+
+CACHES = {
+    'default': _cache_config(os.environ.get('CACHE_URL', 'locmem://')),
+}
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+# Coalesce identical aggregate requests across workers too (needs a shared cache, e.g. Redis)
+SINGLE_FLIGHT_SHARED = os.environ.get('SINGLE_FLIGHT_SHARED', 'false').lower() in ('true', '1')
+
+# Per-request metrics, scraped from /api/metrics/ with "Authorization: Bearer <METRICS_TOKEN>"
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS_ENABLED', 'true').lower() in ('true', '1')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Slow-query log (api/slow_queries.py): queries over the threshold are EXPLAINed
+# in the background and listed at /api/slow-queries/; 0 turns it off
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', 'true').lower() in ('true', '1')
+SLOW_QUERY_BUFFER_SIZE = int(os.environ.get('SLOW_QUERY_BUFFER_SIZE', 500))
+SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG', str(BASE_DIR / 'slow_queries.log'))
+
+# Profiles of requests sent by admins with "X-Profile: 1" (api/profiling.py)
+PROFILE_DIR = os.environ.get('PROFILE_DIR', str(BASE_DIR / 'profiles'))
+
+# POST /api/batch/ (api/batch.py): sub-requests per batch, threads for parallel GETs
+BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 4))
+
+# /api/dashboard/<role>/ (api/dashboards.py): widget threads (1 = run inline) and per-user cache lifetime
+DASHBOARD_WORKERS = int(os.environ.get('DASHBOARD_WORKERS', 4))
+DASHBOARD_CACHE_SECONDS = int(os.environ.get('DASHBOARD_CACHE_SECONDS', 15))
+
+# ?updated_since= delta sync (api/delta_sync.py): the server_time handed back lags the clock by this
+# much, to cover rows stamped before but committed after a sync read; set it above the longest transaction
+DELTA_SYNC_OVERLAP_SECONDS = int(os.environ.get('DELTA_SYNC_OVERLAP_SECONDS', 30))
+
+# Free bed index (api/bed_index.py): reload from the rooms table when older than this, to
+# pick up other workers' changes (0 = on every read)
+BED_INDEX_RECONCILE_SECONDS = int(os.environ.get('BED_INDEX_RECONCILE_SECONDS', 60))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'slow_query_file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,  # the file is only created once something is logged
+        },
+    },
+    'loggers': {
+        'api.slow_queries': {
+            'handlers': ['slow_query_file'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 # Password validation (default)
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -114,7 +188,13 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
+# 'orjson' (used when installed) or 'stdlib' for API JSON encoding, see api/renderers.py
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'orjson')
 
 # -------------------------
 # JWT Settings
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""
+Concurrency stress test for bed allocation (api/beds.py).
+
+Creates --rooms test rooms (STRESS-*) of a few room types and capacities,
+then --threads threads, each with its own database connection, admit
+patients at the same time until every bed is taken: more admissions are
+attempted than there are beds. Then the same threads discharge all of them
+again. After each phase it checks every room against the number of
+admissions that succeeded: no room may hold more patients than beds
+(over-allocation), lose an increment, or disagree with its is_available
+flag. It reports the throughput of each phase and deletes the test rooms
+at the end. Exits with status 1 if any check fails.
+
+--naive runs the same load against the old read-increment-save() code
+for comparison.
+
+Unlike the other checks the rooms must be committed, since every thread
+works on its own connection; point it at a PostgreSQL/MySQL database for
+realistic contention (SQLite serializes writers).
+
+Usage:
+    python stress_bed_allocation.py
+    python stress_bed_allocation.py --threads 32 --rooms 50 --naive
+"""
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.db import connection
+from django.test.utils import override_settings
+
+from api import beds
+from api.models import Room
+
+PREFIX = 'STRESS-'
+# Room types of their own, so that reserve_bed() only finds the test rooms
+ROOM_TYPES = [f'{PREFIX}General', f'{PREFIX}ICU', f'{PREFIX}Private']
+CAPACITIES = [1, 2, 4, 6]
+# Admissions attempted per bed
+OVERBOOKING = 1.5
+
+
+def naive_occupy(room_id):
+    """Room.occupy_bed() as it was: read, check, increment and save()"""
+    room = Room.objects.get(pk=room_id)
+    if room.occupied_beds < room.bed_capacity:
+        room.occupied_beds += 1
+        if room.occupied_beds >= room.bed_capacity:
+            room.is_available = False
+        room.save()
+        return True
+    return False
+
+
+def naive_release(room_id):
+    room = Room.objects.get(pk=room_id)
+    if room.occupied_beds > 0:
+        room.occupied_beds -= 1
+        room.is_available = True
+        room.save()
+        return True
+    return False
+
+
+def create_rooms(count):
+    rng = random.Random(count)
+    Room.objects.bulk_create([
+        Room(room_number=f'{PREFIX}{index}', room_type=ROOM_TYPES[index % len(ROOM_TYPES)],
+             bed_capacity=rng.choice(CAPACITIES))
+        for index in range(count)
+    ])
+    return list(Room.objects.filter(room_number__startswith=PREFIX))
+
+
+def run_phase(threads, func, tasks):
+    """(results, seconds, errors): func(task) for every task, on threads threads"""
+    errors = Counter()
+
+    def call(task):
+        try:
+            return func(task)
+        except Exception as e:
+            errors[type(e).__name__] += 1
+            return None
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(call, tasks))
+    return results, time.perf_counter() - start, errors
+
+
+def check_rooms(rooms, expected):
+    """Problems found comparing the rooms with the expected occupied beds per room id"""
+    problems = []
+    for room in Room.objects.filter(pk__in=[room.pk for room in rooms]).order_by('pk'):
+        if room.occupied_beds > room.bed_capacity:
+            problems.append(f'{room.room_number}: over-allocated, {room.occupied_beds}/{room.bed_capacity}')
+        if room.occupied_beds != expected.get(room.pk, 0):
+            problems.append(f'{room.room_number}: {room.occupied_beds} beds occupied, '
+                            f'{expected.get(room.pk, 0)} admissions succeeded')
+        if room.is_available != (room.occupied_beds < room.bed_capacity):
+            problems.append(f'{room.room_number}: is_available={room.is_available} '
+                            f'at {room.occupied_beds}/{room.bed_capacity}')
+    return problems
+
+
+def report(phase, attempts, succeeded, seconds, errors, problems):
+    print(f'{phase:<10} {attempts:>6} attempts {succeeded:>6} succeeded {seconds * 1000:>9.1f} ms '
+          f'{attempts / seconds:>9.0f} ops/s')
+    for name, count in errors.items():
+        print(f'  {count} x {name}')
+    for problem in problems[:20]:
+        print(f'  {problem}')
+    if len(problems) > 20:
+        print(f'  ... {len(problems) - 20} more')
+
+
+def run(threads, room_count, naive):
+    rooms = create_rooms(room_count)
+    total_beds = sum(room.bed_capacity for room in rooms)
+    print(f'{room_count} rooms, {total_beds} beds, {threads} threads, '
+          f"{'naive read-modify-save' if naive else 'conditional UPDATE'}")
+
+    if naive:
+        # The old flow: the client picks a room that looked free and occupies it
+        by_type = {}
+        for room in rooms:
+            by_type.setdefault(room.room_type, []).append(room.pk)
+
+        def admit(room_type):
+            room_id = random.choice(by_type[room_type])
+            return room_id if naive_occupy(room_id) else None
+
+        def discharge(room_id):
+            return naive_release(room_id)
+    else:
+        def admit(room_type):
+            room = beds.reserve_bed(room_type)
+            return room.pk if room is not None else None
+
+        def discharge(room_id):
+            return beds.release_bed(Room.objects.get(pk=room_id))
+
+    demands = [ROOM_TYPES[index % len(ROOM_TYPES)] for index in range(int(total_beds * OVERBOOKING))]
+    random.shuffle(demands)
+    admitted, seconds, errors = run_phase(threads, admit, demands)
+    admitted = [room_id for room_id in admitted if room_id is not None]
+    problems = check_rooms(rooms, Counter(admitted))
+    report('admit', len(demands), len(admitted), seconds, errors, problems)
+    failed = bool(problems)
+
+    released, seconds, errors = run_phase(threads, discharge, admitted)
+    remaining = Counter(admitted)
+    remaining.subtract(room_id for room_id, done in zip(admitted, released) if done)
+    problems = check_rooms(rooms, remaining)
+    report('discharge', len(admitted), sum(1 for done in released if done), seconds, errors, problems)
+    return not (failed or problems)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16, help='concurrent admissions')
+    parser.add_argument('--rooms', type=int, default=30, help='test rooms to create')
+    parser.add_argument('--naive', action='store_true', help='use the old read-increment-save() updates')
+    args = parser.parse_args()
+
+    Room.objects.filter(room_number__startswith=PREFIX).delete()
+    ok = False
+    with override_settings(
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        DEBUG=False,
+    ):
+        try:
+            ok = run(args.threads, args.rooms, args.naive)
+        finally:
+            Room.objects.filter(room_number__startswith=PREFIX).delete()
+    if not ok:
+        raise SystemExit('Bed allocation checks failed')
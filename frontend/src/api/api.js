@@ -369,6 +369,8 @@ export const roomAPI = {
     return apiRequest(`/rooms/${queryString ? `?${queryString}` : ''}`);
   },
   getById: (id) => apiRequest(`/rooms/${id}/`),
+  // Free beds per room type and the next free room: { free_beds, next_free, summary }
+  getAvailability: (roomType) => apiRequest(`/rooms/availability/${roomType ? `?room_type=${encodeURIComponent(roomType)}` : ''}`),
   create: (data) => apiRequest('/rooms/', {
     method: 'POST',
     body: JSON.stringify(data)
@@ -387,7 +389,11 @@ export const roomAPI = {
 // ============================================
 
 export const dashboardAPI = {
-  getStats: () => apiRequest('/dashboard-stats/')
+  getStats: () => apiRequest('/dashboard-stats/'),
+  // role: admin | doctor | nurse | pharmacy; widgets: names to compute (default: every widget)
+  getForRole: (role, widgets) => apiRequest(
+    `/dashboard/${role}/${widgets ? `?widgets=${widgets.join(',')}` : ''}`
+  )
 };
 
 // ============================================
@@ -625,3 +631,31 @@ export const pharmacyStaffAPI = {
     method: 'POST'
   })
 };
+
+// ============================================
+// Batch API
+// ============================================
+
+// requests: [{ id, method, path: '/api/...', body }]; resolves to { [id]: { status, body } }
+export const batchAPI = {
+  run: async (requests, { parallel = true } = {}) => {
+    const data = await apiRequest('/batch/', {
+      method: 'POST',
+      body: JSON.stringify({ requests, parallel })
+    });
+    return Object.fromEntries(data.responses.map(({ id, status, body }) => [id, { status, body }]));
+  },
+  // paths: { name: '/api/...' }; GETs them in one round trip and resolves to
+  // { name: body }, rejecting with the body of the first failed one
+  get: async (paths) => {
+    const responses = await batchAPI.run(
+      Object.entries(paths).map(([id, path]) => ({ id, method: 'GET', path })),
+      { parallel: true }
+    );
+    const failed = Object.values(responses).find(({ status }) => status >= 400);
+    if (failed) {
+      throw failed.body;
+    }
+    return Object.fromEntries(Object.entries(responses).map(([id, { body }]) => [id, body]));
+  }
+};
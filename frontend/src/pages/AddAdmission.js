@@ -2,14 +2,17 @@ import React, { useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
 import Navbar from "../components/Navbar";
 import Sidebar from "../components/Sidebar";
-import { patientAPI, doctorAPI, nurseAPI, roomAPI, admissionAPI, scheduleAPI } from "../api/api";
+import { admissionAPI, batchAPI, roomAPI, scheduleAPI } from "../api/api";
 
 const AddAdmission = () => {
   const navigate = useNavigate();
   const [patients, setPatients] = useState([]);
   const [doctors, setDoctors] = useState([]);
   const [nurses, setNurses] = useState([]);
-  const [rooms, setRooms] = useState([]);
+  // Free beds per room type, from the bed index (GET /api/rooms/availability/)
+  const [bedAvailability, setBedAvailability] = useState(null);
+  const [roomType, setRoomType] = useState("");
+  const [nextRoom, setNextRoom] = useState(null);
   const [formData, setFormData] = useState({
     patient: "",
     doctor: "",
@@ -26,16 +29,40 @@ const AddAdmission = () => {
   const [currentlyWorkingNurses, setCurrentlyWorkingNurses] = useState([]);
 
   useEffect(() => {
-    fetchPatients();
-    fetchDoctors();
-    fetchNurses();
-    fetchRooms();
-    checkCurrentlyWorking();
+    fetchInitialData();
   }, []);
 
-  const checkCurrentlyWorking = async () => {
+  const fetchInitialData = async () => {
+    const today = new Date().toISOString().split("T")[0];
+    try {
+      // Every list the form needs in one round trip; a failed one stays empty
+      const responses = await batchAPI.run([
+        // Only patients who can be admitted (no active admissions)
+        { id: "patients", method: "GET", path: "/api/patients/admittable/" },
+        { id: "doctors", method: "GET", path: "/api/doctors/" },
+        { id: "nurses", method: "GET", path: "/api/nurses/" },
+        { id: "beds", method: "GET", path: "/api/rooms/availability/" },
+        { id: "schedules", method: "GET", path: `/api/schedules/?start_date=${today}&end_date=${today}` },
+      ], { parallel: true });
+      const list = (id) => {
+        const { status, body } = responses[id];
+        if (status >= 400) {
+          console.error(`Error fetching ${id}:`, body);
+        }
+        return status < 400 && Array.isArray(body) ? body : [];
+      };
+      setPatients(list("patients"));
+      setDoctors(list("doctors"));
+      setNurses(list("nurses"));
+      setBedAvailability(responses.beds.status < 400 ? responses.beds.body : null);
+      checkCurrentlyWorking(today, list("schedules"));
+    } catch (error) {
+      console.error("Error fetching admission form data:", error);
+    }
+  };
+
+  const checkCurrentlyWorking = (today, todaySchedules) => {
     try {
-      const today = new Date().toISOString().split("T")[0];
       const now = new Date();
       const currentTime = `${String(now.getHours()).padStart(2, "0")}:${String(
         now.getMinutes()
@@ -44,9 +71,6 @@ const AddAdmission = () => {
       console.log("Today's date:", today);
       console.log("Current time:", currentTime);
 
-      // Fetch schedules for today
-      const todaySchedules = await scheduleAPI.getByDateRange(today, today);
-
       console.log("Today's schedules:", todaySchedules);
 
       if (!Array.isArray(todaySchedules)) {
@@ -119,45 +143,21 @@ const AddAdmission = () => {
     }
   };
 
-  const fetchPatients = async () => {
-    try {
-      // Only fetch patients who can be admitted (no active admissions)
-      const data = await patientAPI.getAdmittable();
-      setPatients(Array.isArray(data) ? data : []);
-    } catch (error) {
-      console.error("Error fetching patients:", error);
-      setPatients([]);
+  const handleRoomTypeChange = async (e) => {
+    const { value } = e.target;
+    setRoomType(value);
+    setNextRoom(null);
+    setFormData((prev) => ({ ...prev, room: "" }));
+    if (!value) {
+      return;
     }
-  };
-
-  const fetchDoctors = async () => {
     try {
-      const data = await doctorAPI.getAll();
-      setDoctors(Array.isArray(data) ? data : []);
+      // The room the server would fill first: fewest free beds, then room number
+      const data = await roomAPI.getAvailability(value);
+      setNextRoom(data.next_free);
+      setFormData((prev) => ({ ...prev, room: data.next_free ? data.next_free.id : "" }));
     } catch (error) {
-      console.error("Error fetching doctors:", error);
-      setDoctors([]);
-    }
-  };
-
-  const fetchNurses = async () => {
-    try {
-      const data = await nurseAPI.getAll();
-      setNurses(Array.isArray(data) ? data : []);
-    } catch (error) {
-      console.error("Error fetching nurses:", error);
-      setNurses([]);
-    }
-  };
-
-  const fetchRooms = async () => {
-    try {
-      // Fetch only available rooms (with free beds)
-      const data = await roomAPI.getAll({ available: 'true' });
-      setRooms(Array.isArray(data) ? data : []);
-    } catch (error) {
-      console.error("Error fetching rooms:", error);
-      setRooms([]);
+      console.error("Error fetching room availability:", error);
     }
   };
 
@@ -458,21 +458,28 @@ const AddAdmission = () => {
               <div style={styles.inputGroup}>
                 <label style={styles.label}>Assign Room (Optional)</label>
                 <select
-                  name="room"
-                  value={formData.room}
-                  onChange={handleChange}
+                  name="room_type"
+                  value={roomType}
+                  onChange={handleRoomTypeChange}
                   style={styles.input}
                 >
                   <option value="">-- Skip Room Assignment (assign later) --</option>
-                  {rooms.map((room) => (
-                    <option key={room.id} value={room.id}>
-                      Room {room.room_number} ({room.room_type}) -{" "}
-                      {room.bed_capacity - room.occupied_beds} beds available
+                  {(bedAvailability?.summary.by_room_type || []).map((row) => (
+                    <option key={row.room_type} value={row.room_type} disabled={row.free === 0}>
+                      {row.room_type} - {row.free} of {row.beds} beds free
                     </option>
                   ))}
                 </select>
+                {roomType && (
+                  <small style={{ ...styles.hint, display: "block", marginBottom: "0.25rem" }}>
+                    {nextRoom
+                      ? `🛏️ Room ${nextRoom.room_number} will be assigned (${nextRoom.free_beds} of ${nextRoom.bed_capacity} beds free)`
+                      : "No free bed left in this room type"}
+                  </small>
+                )}
                 <small style={styles.hint}>
-                  💡 Room can be assigned later after doctor's examination. Only rooms with free beds are shown.
+                  💡 Room can be assigned later after doctor's examination. Pick a room type: the room with the
+                  fewest free beds is filled first.
                 </small>
               </div>
 
@@ -1,10 +1,13 @@
 import React, { useState, useEffect } from "react";
 import Navbar from "../components/Navbar";
 import Sidebar from "../components/Sidebar";
+import { useAuth } from "../context/AuthContext";
 import { dashboardAPI } from "../api/api";
 
 const Dashboard = () => {
+  const { user } = useAuth();
   const [stats, setStats] = useState(null);
+  const [beds, setBeds] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -13,8 +16,15 @@ const Dashboard = () => {
 
   const fetchStats = async () => {
     try {
-      const data = await dashboardAPI.getStats();
-      setStats(data);
+      if (user?.role === "admin") {
+        // Hospital counters and bed occupancy in one request
+        const data = await dashboardAPI.getForRole("admin", ["stats", "beds"]);
+        setStats(data.widgets.stats);
+        setBeds(data.widgets.beds);
+      } else {
+        // Fallback page of other roles, which can't open the admin dashboard
+        setStats(await dashboardAPI.getStats());
+      }
     } catch (error) {
       console.error("Error fetching stats:", error);
       setStats(null);
@@ -104,6 +114,37 @@ const Dashboard = () => {
             ))}
           </div>
 
+          {beds && (
+            <div style={{ ...styles.infoSection, marginBottom: "2rem" }}>
+              <h3 style={styles.infoTitle}>
+                Bed Occupancy: {beds.occupied_beds}/{beds.total_beds} beds,{" "}
+                {beds.available_rooms} of {beds.total_rooms} rooms with a free bed
+              </h3>
+              <table style={styles.table}>
+                <thead>
+                  <tr>
+                    <th style={styles.th}>Room Type</th>
+                    <th style={styles.th}>Rooms</th>
+                    <th style={styles.th}>Beds</th>
+                    <th style={styles.th}>Occupied</th>
+                    <th style={styles.th}>Free</th>
+                  </tr>
+                </thead>
+                <tbody>
+                  {beds.by_room_type.map((row) => (
+                    <tr key={row.room_type}>
+                      <td style={styles.td}>{row.room_type}</td>
+                      <td style={styles.td}>{row.rooms}</td>
+                      <td style={styles.td}>{row.beds}</td>
+                      <td style={styles.td}>{row.occupied}</td>
+                      <td style={styles.td}>{row.free}</td>
+                    </tr>
+                  ))}
+                </tbody>
+              </table>
+            </div>
+          )}
+
           <div style={styles.infoSection}>
             <h3 style={styles.infoTitle}>Quick Actions</h3>
             <div style={styles.actionGrid}>
@@ -209,6 +250,22 @@ const styles = {
     marginTop: 0,
     marginBottom: "1.5rem",
   },
+  table: {
+    width: "100%",
+    borderCollapse: "collapse",
+  },
+  th: {
+    textAlign: "left",
+    padding: "0.75rem",
+    borderBottom: "2px solid #e2e8f0",
+    color: "#475569",
+    fontSize: "0.9rem",
+  },
+  td: {
+    padding: "0.75rem",
+    borderBottom: "1px solid #f1f5f9",
+    color: "#334155",
+  },
   actionGrid: {
     display: "grid",
     gridTemplateColumns: "repeat(auto-fit, minmax(200px, 1fr))",
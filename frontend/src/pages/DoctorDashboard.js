@@ -2,7 +2,7 @@ import React, { useState, useEffect } from "react";
 import Navbar from "../components/Navbar";
 import Sidebar from "../components/Sidebar";
 import { useAuth } from "../context/AuthContext";
-import { doctorAPI, admissionAPI, appointmentAPI } from "../api/api";
+import { dashboardAPI } from "../api/api";
 
 const DoctorDashboard = () => {
   const { user } = useAuth();
@@ -16,42 +16,10 @@ const DoctorDashboard = () => {
 
   const fetchDoctorData = async () => {
     try {
-      // First, get the doctor ID for this user
-      const doctors = await doctorAPI.getAll();
-      const myDoctor = Array.isArray(doctors)
-        ? doctors.find((d) => d.user?.id === user.id)
-        : null;
-
-      if (myDoctor) {
-        setDoctorId(myDoctor.id);
-
-        // Fetch admissions for this doctor
-        const allAdmissions = await admissionAPI.getAll();
-        const myAdmissions = Array.isArray(allAdmissions)
-          ? allAdmissions.filter((a) => a.doctor === myDoctor.id)
-          : [];
-
-        // Fetch appointments for this doctor
-        const allAppointments = await appointmentAPI.getAll();
-        const myAppointments = Array.isArray(allAppointments)
-          ? allAppointments.filter((a) => a.doctor === myDoctor.id)
-          : [];
-
-        // Get unique patients
-        const patientIds = [...new Set(myAdmissions.map((a) => a.patient))];
-
-        setStats({
-          total_patients: patientIds.length,
-          active_admissions: myAdmissions.filter((a) => a.status === "admitted")
-            .length,
-          total_appointments: myAppointments.length,
-          today_appointments: myAppointments.filter((a) => {
-            const appointmentDate = new Date(a.appointment_date);
-            const today = new Date();
-            return appointmentDate.toDateString() === today.toDateString();
-          }).length,
-        });
-      }
+      // Only the stats widget: the page shows no lists
+      const data = await dashboardAPI.getForRole("doctor", ["stats"]);
+      setDoctorId(data.profile_id);
+      setStats(data.widgets.stats);
     } catch (error) {
       console.error("Error fetching doctor data:", error);
       setStats(null);
@@ -3,7 +3,7 @@ import { useParams, useNavigate, useLocation } from "react-router-dom";
 import { useAuth } from "../context/AuthContext";
 import Navbar from "../components/Navbar";
 import Sidebar from "../components/Sidebar";
-import { admissionAPI, appointmentAPI, patientAPI, procedureAPI, paymentAPI, medicineAPI, prescriptionAPI, doctorAPI } from "../api/api";
+import { admissionAPI, batchAPI, patientAPI, paymentAPI, prescriptionAPI } from "../api/api";
 
 const ExaminePatient = () => {
   const { id } = useParams(); // Can be admission ID or appointment ID
@@ -35,17 +35,24 @@ const ExaminePatient = () => {
 
   const fetchData = async () => {
     try {
+      // The record, reference lists and this doctor's profile in one round trip
+      const data = await batchAPI.get({
+        ...(isFromAppointment
+          ? { appointment: `/api/appointments/${id}/`, admissions: "/api/admissions/" }
+          : { admission: `/api/admissions/${id}/` }),
+        procedures: "/api/procedures/",
+        medicines: "/api/medicines/?is_active=true",
+        doctors: "/api/doctors/",
+      });
       let patientId;
 
       if (isFromAppointment) {
-        // Fetch appointment data
-        const appointmentData = await appointmentAPI.getById(id);
+        const appointmentData = data.appointment;
         setAppointment(appointmentData);
         patientId = appointmentData.patient;
 
         // Check if there's an existing admission for this patient
-        const admissions = await admissionAPI.getAll();
-        const existingAdmission = admissions.find(
+        const existingAdmission = data.admissions.find(
           adm => adm.patient === patientId && (adm.status === 'pending' || adm.status === 'admitted')
         );
         if (existingAdmission) {
@@ -64,8 +71,8 @@ const ExaminePatient = () => {
           });
         }
       } else {
-        // Fetch admission data (existing flow)
-        const admissionData = await admissionAPI.getById(id);
+        // Admission data (existing flow)
+        const admissionData = data.admission;
         setAdmission(admissionData);
         patientId = admissionData.patient;
 
@@ -76,26 +83,19 @@ const ExaminePatient = () => {
         });
       }
 
-      // Fetch patient
-      const patientData = await patientAPI.getById(patientId);
-      setPatient(patientData);
-
-      // Fetch procedures
-      const proceduresData = await procedureAPI.getAll();
-      setProcedures(Array.isArray(proceduresData) ? proceduresData : []);
-
-      // Fetch medicines
-      const medicinesData = await medicineAPI.getActive();
-      setMedicines(Array.isArray(medicinesData) ? medicinesData : []);
+      setProcedures(Array.isArray(data.procedures) ? data.procedures : []);
+      setMedicines(Array.isArray(data.medicines) ? data.medicines : []);
 
-      // Fetch doctor ID
-      const doctors = await doctorAPI.getAll();
-      const myDoctor = Array.isArray(doctors)
-        ? doctors.find((d) => d.user?.id === user.id)
+      const myDoctor = Array.isArray(data.doctors)
+        ? data.doctors.find((d) => d.user?.id === user.id)
         : null;
       if (myDoctor) {
         setDoctorId(myDoctor.id);
       }
+
+      // The patient id comes from the record above
+      const patientData = await patientAPI.getById(patientId);
+      setPatient(patientData);
     } catch (error) {
       console.error("Error fetching data:", error);
       setError("Failed to load patient data");
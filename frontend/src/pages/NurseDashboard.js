@@ -2,7 +2,7 @@ import React, { useState, useEffect } from "react";
 import Navbar from "../components/Navbar";
 import Sidebar from "../components/Sidebar";
 import { useAuth } from "../context/AuthContext";
-import { nurseAPI, admissionAPI } from "../api/api";
+import { dashboardAPI } from "../api/api";
 
 const NurseDashboard = () => {
   const { user } = useAuth();
@@ -16,33 +16,10 @@ const NurseDashboard = () => {
 
   const fetchNurseData = async () => {
     try {
-      // First, get the nurse ID for this user
-      const nurses = await nurseAPI.getAll();
-      const myNurse = Array.isArray(nurses)
-        ? nurses.find((n) => n.user?.id === user.id)
-        : null;
-
-      if (myNurse) {
-        setNurseId(myNurse.id);
-
-        // Fetch admissions for this nurse
-        const allAdmissions = await admissionAPI.getAll();
-        const myAdmissions = Array.isArray(allAdmissions)
-          ? allAdmissions.filter((a) => a.nurse === myNurse.id)
-          : [];
-
-        // Get unique patients
-        const patientIds = [...new Set(myAdmissions.map((a) => a.patient))];
-
-        setStats({
-          total_patients: patientIds.length,
-          active_admissions: myAdmissions.filter((a) => a.status === "admitted")
-            .length,
-          total_admissions: myAdmissions.length,
-          discharged: myAdmissions.filter((a) => a.status === "discharged")
-            .length,
-        });
-      }
+      // Only the stats widget: the page shows no lists
+      const data = await dashboardAPI.getForRole("nurse", ["stats"]);
+      setNurseId(data.profile_id);
+      setStats(data.widgets.stats);
     } catch (error) {
       console.error("Error fetching nurse data:", error);
       setStats(null);
@@ -1,11 +1,9 @@
 import React, { useState, useEffect } from "react";
 import Navbar from "../components/Navbar";
 import Sidebar from "../components/Sidebar";
-import { useAuth } from "../context/AuthContext";
-import { pharmacyStaffAPI, prescriptionAPI, medicineAPI } from "../api/api";
+import { dashboardAPI, prescriptionAPI } from "../api/api";
 
 const PharmacyDashboard = () => {
-  const { user } = useAuth();
   const [pendingPrescriptions, setPendingPrescriptions] = useState([]);
   const [recentlyDispensed, setRecentlyDispensed] = useState([]);
   const [lowStockMedicines, setLowStockMedicines] = useState([]);
@@ -14,65 +12,29 @@ const PharmacyDashboard = () => {
   const [pharmacyStaffId, setPharmacyStaffId] = useState(null);
 
   useEffect(() => {
-    fetchPharmacyStaffId();
-    fetchPendingPrescriptions();
-    fetchRecentlyDispensed();
-    fetchLowStockMedicines();
+    fetchDashboard();
   }, []);
 
-  const fetchPharmacyStaffId = async () => {
+  const fetchDashboard = async () => {
+    // Profile, pending and recently dispensed prescriptions and low stock
+    // medicines in one request instead of four
     try {
-      const data = await pharmacyStaffAPI.getAll();
-      const myStaff = Array.isArray(data)
-        ? data.find((s) => s.user?.id === user.id)
-        : null;
-      if (myStaff) {
-        setPharmacyStaffId(myStaff.id);
-      }
+      const data = await dashboardAPI.getForRole("pharmacy", [
+        "pending_prescriptions",
+        "recently_dispensed",
+        "low_stock_medicines",
+      ]);
+      setPharmacyStaffId(data.profile_id);
+      setPendingPrescriptions(data.widgets.pending_prescriptions || []);
+      setRecentlyDispensed(data.widgets.recently_dispensed || []);
+      setLowStockMedicines(data.widgets.low_stock_medicines || []);
     } catch (error) {
-      console.error("Error fetching pharmacy staff:", error);
-    }
-  };
-
-  const fetchPendingPrescriptions = async () => {
-    try {
-      const data = await prescriptionAPI.getPending();
-      if (data.success) {
-        setPendingPrescriptions(data.prescriptions);
-      }
-    } catch (error) {
-      console.error("Error fetching prescriptions:", error);
+      console.error("Error fetching pharmacy dashboard:", error);
     } finally {
       setLoading(false);
     }
   };
 
-  const fetchRecentlyDispensed = async () => {
-    try {
-      const data = await prescriptionAPI.getDispensed();
-      const dispensedArray = Array.isArray(data) ? data : [];
-      // Sort by dispensed_date descending and take last 10
-      const sorted = dispensedArray
-        .sort((a, b) => new Date(b.dispensed_date) - new Date(a.dispensed_date))
-        .slice(0, 10);
-      setRecentlyDispensed(sorted);
-    } catch (error) {
-      console.error("Error fetching recently dispensed:", error);
-      setRecentlyDispensed([]);
-    }
-  };
-
-  const fetchLowStockMedicines = async () => {
-    try {
-      const data = await medicineAPI.getLowStock();
-      const medicinesArray = Array.isArray(data) ? data : [];
-      setLowStockMedicines(medicinesArray);
-    } catch (error) {
-      console.error("Error fetching low stock medicines:", error);
-      setLowStockMedicines([]);
-    }
-  };
-
   const handleDispenseItem = async (itemId) => {
     if (!pharmacyStaffId) {
       alert("Pharmacy staff profile not found");
@@ -83,9 +45,7 @@ const PharmacyDashboard = () => {
       const data = await prescriptionAPI.dispenseItem(itemId, pharmacyStaffId);
       if (data.success) {
         alert("✓ Medicine dispensed successfully!");
-        fetchPendingPrescriptions();
-        fetchRecentlyDispensed(); // Refresh recently dispensed list
-        fetchLowStockMedicines(); // Refresh low stock (in case stock changed)
+        fetchDashboard(); // Refresh the lists and stock levels
         setSelectedPrescription(null);
       } else {
         alert(data.error || "Failed to dispense medicine");